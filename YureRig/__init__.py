@@ -1,5 +1,3 @@
-import bpy
-
 __all__ = ["auto_load", "operators", "panel_ui", "preferences", "property_group"]
 from . import auto_load, operators, panel_ui, preferences, property_group
 
@@ -7,7 +5,7 @@ bl_info = {
     "name": "YureRig",
     "author": "Orito Itsuki",
     "description": 'Create rig for "Yuremono"',
-    "blender": (2, 93, 0),
+    "blender": (3, 0, 0),
     "version": (1, 1, 4),
     "location": "VIEW_3D > <<Addon Tab>>",
     "warning": "",
@@ -21,7 +19,6 @@ auto_load.init()
 def register():
     auto_load.register()
     property_group.register_props()
-    panel_ui.update_panel(None, bpy.context)
 
 
 def unregister():
@@ -0,0 +1,166 @@
+from typing import Dict, List, Sequence, Tuple
+
+import bpy
+import numpy as np
+
+# Fitting the rigid bodies and goals of a chain to the skin they move. For the
+# DEF bone of every body, the vertices of the meshes deformed by the armature
+# with at least the fit weight in the vertex group of that bone are put into
+# the frame of the body, with the Y axis along the bone and the Z axis along
+# the Z axis of the bone, centered on the middle of the bone. The box keeps
+# the bone length minus the gap along Y and gets twice the largest distance
+# of those vertices from the bone along X and Z, so a thin hair strand gets
+# a thin box and a wide skirt panel a wide one.
+#
+# Positions are read in bulk with `foreach_get` and the fit is vectorized over
+# all vertices and bones. Blender has no bulk accessor for vertex group
+# weights, so those are read in a single pass over the weighted vertices.
+
+# Smallest fitted size, keeping the boxes of sparse groups from collapsing
+MIN_SIZE = 0.001
+
+
+def deformed_meshes(armature: bpy.types.Object) -> List[bpy.types.Object]:
+    """
+    Mesh objects with an Armature modifier deforming them by `armature`.
+    """
+
+    return [
+        obj
+        for obj in bpy.data.objects
+        if obj.type == "MESH"
+        and any(m.type == "ARMATURE" and m.object == armature for m in obj.modifiers)
+    ]
+
+
+def read_weights(
+    mesh: bpy.types.Mesh, groups: Dict[int, int], min_weight: float
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Vertex indices and body indices of the weights of at least `min_weight`
+    in the vertex groups `groups`, which maps vertex group indices of the
+    object to body indices.
+    """
+
+    vertex_indices: List[int] = []
+    body_indices: List[int] = []
+    for vertex in mesh.vertices:
+        for element in vertex.groups:
+            body = groups.get(element.group)
+            if body is not None and element.weight >= min_weight:
+                vertex_indices.append(vertex.index)
+                body_indices.append(body)
+    return (
+        np.array(vertex_indices, dtype=np.int64),
+        np.array(body_indices, dtype=np.int64),
+    )
+
+
+def fit_sizes(
+    armature: bpy.types.Object,
+    names: Sequence[str],
+    group_names: Sequence[Sequence[str]],
+    min_weight: float,
+) -> Dict[str, Tuple[float, float]]:
+    """
+    Fitted (size X, size Z) of the bodies of the bones `names` of `armature`,
+    keyed by bone name. The weights are read from the first vertex group of
+    `group_names` found on each mesh. Bones without any weighted vertex are
+    left out.
+    """
+
+    bones = [armature.data.bones[name] for name in names]
+    n = len(bones)
+    if n == 0:
+        return {}
+    heads = np.array([b.head_local for b in bones], dtype=np.float64).reshape(n, 3)
+    tails = np.array([b.tail_local for b in bones], dtype=np.float64).reshape(n, 3)
+    z_axes = np.array(
+        [b.matrix_local.col[2].to_3d() for b in bones], dtype=np.float64
+    ).reshape(n, 3)
+    y = tails - heads
+    y /= np.linalg.norm(y, axis=1, keepdims=True)
+    z = z_axes / np.linalg.norm(z_axes, axis=1, keepdims=True)
+    x = np.cross(y, z)
+    x /= np.linalg.norm(x, axis=1, keepdims=True)
+    # Rows are the X and Z axes of the bodies
+    axes = np.stack((x, z), axis=1)
+    centers = (heads + tails) / 2
+
+    extents = np.zeros((n, 2))
+    found = np.zeros(n, dtype=bool)
+    armature_inverse = np.array(armature.matrix_world.inverted(), dtype=np.float64)
+    for obj in deformed_meshes(armature):
+        groups: Dict[int, int] = {}
+        for body, candidates in enumerate(group_names):
+            for group_name in candidates:
+                group = obj.vertex_groups.get(group_name)
+                if group is not None:
+                    groups[group.index] = body
+                    break
+        if len(groups) == 0:
+            continue
+        mesh = obj.data
+        vertex_indices, body_indices = read_weights(mesh, groups, min_weight)
+        if len(vertex_indices) == 0:
+            continue
+
+        co = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+        mesh.vertices.foreach_get("co", co)
+        matrix = armature_inverse @ np.array(obj.matrix_world, dtype=np.float64)
+        positions = co.reshape(-1, 3)[vertex_indices] @ matrix[:3, :3].T
+        positions += matrix[:3, 3]
+
+        offsets = positions - centers[body_indices]
+        distances = np.abs(np.einsum("ij,ikj->ik", offsets, axes[body_indices]))
+        order = np.argsort(body_indices, kind="stable")
+        sorted_bodies = body_indices[order]
+        starts = np.flatnonzero(np.r_[True, sorted_bodies[1:] != sorted_bodies[:-1]])
+        bodies = sorted_bodies[starts]
+        maxima = np.maximum.reduceat(distances[order], starts, axis=0)
+        extents[bodies] = np.maximum(extents[bodies], maxima)
+        found[bodies] = True
+
+    sizes = np.maximum(extents * 2, MIN_SIZE)
+    return {
+        name: (float(sizes[i, 0]), float(sizes[i, 1]))
+        for i, name in enumerate(names)
+        if found[i]
+    }
+
+
+def fit_chain_sizes(
+    armature: bpy.types.Object, base_names: Sequence[str], min_weight: float
+) -> Dict[str, Tuple[float, float]]:
+    """
+    Fitted (size X, size Z) of the rigid bodies of set up bones, keyed by the
+    bone names without prefix.
+    """
+
+    names = [b for b in base_names if f"DEF_YURERIG_{b}" in armature.data.bones]
+    sizes = fit_sizes(
+        armature,
+        [f"DEF_YURERIG_{b}" for b in names],
+        [(f"DEF_YURERIG_{b}",) for b in names],
+        min_weight,
+    )
+    return {name[12:]: size for name, size in sizes.items()}
+
+
+def fit_selected_sizes(
+    armature: bpy.types.Object, names: Sequence[str], min_weight: float
+) -> Dict[str, Tuple[float, float]]:
+    """
+    Fitted (size X, size Z) of the rigid bodies of bones about to be set up,
+    keyed by the bone names without prefix. The vertex groups of the bones
+    are renamed with the bones by the setup, so both names are looked up.
+    """
+
+    bases = [n[12:] if n.startswith("DEF_YURERIG_") else n for n in names]
+    sizes = fit_sizes(
+        armature,
+        names,
+        [(name, f"DEF_YURERIG_{base}") for name, base in zip(names, bases)],
+        min_weight,
+    )
+    return {base: sizes[name] for name, base in zip(names, bases) if name in sizes}
@@ -0,0 +1,220 @@
+import json
+import os
+import struct
+import sys
+from array import array
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# On-disk layout of a baked YureRig cache file (`.yrc`).
+#
+#   MAGIC                       8 bytes
+#   version                     uint32 little endian
+#   header size                 uint32 little endian
+#   header                      utf-8 JSON, padded with spaces to DATA_ALIGNMENT
+#   data                        float32 little endian, frames x bones x CHANNELS
+#
+# The header stores the armature name, the rig hash, the frame range and the
+# bone names in data order. Every frame has the same size and the data is
+# aligned, so the whole data block maps directly to a numpy array.
+
+MAGIC = b"YURERIG\0"
+VERSION = 1
+CHANNELS = 4
+DATA_ALIGNMENT = 64
+FILE_EXTENSION = ".yrc"
+
+_PREAMBLE = struct.Struct("<8sII")
+
+
+class BakeCacheError(Exception):
+    """
+    Raised when a cache file is missing, corrupted or does not match the rig.
+    """
+
+
+class BakeCacheHeader:
+    """
+    Header of a baked cache file.
+    """
+
+    __slots__ = ("armature", "rig_hash", "frame_start", "frame_end", "bones")
+
+    def __init__(
+        self,
+        armature: str,
+        rig_hash: str,
+        frame_start: int,
+        frame_end: int,
+        bones: List[str],
+    ):
+        self.armature = armature
+        self.rig_hash = rig_hash
+        self.frame_start = frame_start
+        self.frame_end = frame_end
+        self.bones = bones
+
+    @property
+    def frame_count(self) -> int:
+        return self.frame_end - self.frame_start + 1
+
+    @property
+    def frame_size(self) -> int:
+        """
+        Size of a frame in bytes.
+        """
+
+        return len(self.bones) * CHANNELS * 4
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "armature": self.armature,
+            "hash": self.rig_hash,
+            "frame_start": self.frame_start,
+            "frame_end": self.frame_end,
+            "bones": self.bones,
+            "channels": CHANNELS,
+            "dtype": "<f4",
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "BakeCacheHeader":
+        if data.get("channels") != CHANNELS or data.get("dtype") != "<f4":
+            raise BakeCacheError("Unsupported cache data layout")
+        return cls(
+            str(data["armature"]),
+            str(data["hash"]),
+            int(data["frame_start"]),
+            int(data["frame_end"]),
+            [str(b) for b in data["bones"]],
+        )
+
+
+def _encode_header(header: BakeCacheHeader) -> bytes:
+    encoded = json.dumps(header.to_dict(), separators=(",", ":")).encode("utf-8")
+    size = _PREAMBLE.size + len(encoded)
+    padding = -size % DATA_ALIGNMENT
+    return encoded + b" " * padding
+
+
+def _to_little_endian(values: "array[float]") -> bytes:
+    if sys.byteorder != "little":
+        values = array("f", values)
+        values.byteswap()
+    return values.tobytes()
+
+
+class BakeCacheWriter:
+    """
+    Write a baked cache file frame by frame.
+    Frames must be written in order, from `frame_start` to `frame_end`.
+    """
+
+    def __init__(self, path: str, header: BakeCacheHeader):
+        self.path = path
+        self.header = header
+        self.frames_written = 0
+        self.file: Optional[BinaryIO] = None
+
+    def __enter__(self) -> "BakeCacheWriter":
+        encoded = _encode_header(self.header)
+        self.file = open(self.path + ".tmp", "wb")
+        self.file.write(_PREAMBLE.pack(MAGIC, VERSION, len(encoded)))
+        self.file.write(encoded)
+        return self
+
+    def write_frame(self, values: "array[float]") -> None:
+        """
+        Write next frame.
+        `values` is a flat float array of `len(bones) * CHANNELS` items.
+        """
+
+        assert self.file is not None
+        if len(values) != len(self.header.bones) * CHANNELS:
+            raise BakeCacheError("Frame size does not match the bone count")
+        self.file.write(_to_little_endian(values))
+        self.frames_written += 1
+
+    def __exit__(self, exc_type: Any, exc: Any, traceback: Any) -> None:
+        assert self.file is not None
+        self.file.close()
+        self.file = None
+        if exc_type is None and self.frames_written == self.header.frame_count:
+            os.replace(self.path + ".tmp", self.path)
+        else:
+            os.remove(self.path + ".tmp")
+            if exc_type is None:
+                raise BakeCacheError(
+                    f"Expected {self.header.frame_count} frames, "
+                    + f"got {self.frames_written}"
+                )
+
+
+def read_header(file: BinaryIO) -> Tuple[BakeCacheHeader, int]:
+    """
+    Read the header of a cache file.
+    Return the header and the byte offset of the first frame.
+    """
+
+    preamble = file.read(_PREAMBLE.size)
+    if len(preamble) != _PREAMBLE.size:
+        raise BakeCacheError("Truncated cache file")
+    magic, version, header_size = _PREAMBLE.unpack(preamble)
+    if magic != MAGIC:
+        raise BakeCacheError("Not a YureRig cache file")
+    if version != VERSION:
+        raise BakeCacheError(f"Unsupported cache version {version}")
+    try:
+        data = json.loads(file.read(header_size).decode("utf-8"))
+    except ValueError as e:
+        raise BakeCacheError("Corrupted cache header") from e
+    return BakeCacheHeader.from_dict(data), _PREAMBLE.size + header_size
+
+
+class BakeCacheReader:
+    """
+    Read-only random access to a baked cache file.
+    The frames are memory-mapped, so reading a frame is a view into the page
+    cache and does not depend on the frame that was read before.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as file:
+            self.header, self.data_offset = read_header(file)
+            file.seek(0, 2)
+            size = file.tell()
+        header = self.header
+        expected = self.data_offset + header.frame_count * header.frame_size
+        if size != expected:
+            raise BakeCacheError("Cache file size does not match its header")
+        self.frames: Optional[np.memmap] = np.memmap(
+            path,
+            dtype="<f4",
+            mode="r",
+            offset=self.data_offset,
+            shape=(header.frame_count, len(header.bones), CHANNELS),
+        )
+
+    def read_frame(self, frame: int) -> np.ndarray:
+        """
+        Read `frame`, clamped to the cached frame range.
+        Return a read-only `bones x CHANNELS` array.
+        """
+
+        assert self.frames is not None
+        header = self.header
+        frame = min(max(frame, header.frame_start), header.frame_end)
+        values: np.ndarray = self.frames[frame - header.frame_start]
+        return values
+
+    def close(self) -> None:
+        # The mapping is released once no frame view refers to it anymore.
+        self.frames = None
+
+    def __enter__(self) -> "BakeCacheReader":
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, traceback: Any) -> None:
+        self.close()
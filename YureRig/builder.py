@@ -0,0 +1,2235 @@
+import math
+import re
+from typing import Dict, Iterator, List, Optional, Pattern, Sequence, Set, Tuple
+
+import bpy
+import numpy as np
+from mathutils import Matrix, Vector
+
+from . import autofit, instrument, jobs
+from .chains import (
+    DEF_BLEND_CONSTRAINT_NAME,
+    DEF_CONNECT_PROPERTY,
+    DEF_PARENT_PROPERTY,
+    JOINTS_PROPERTY,
+    KINEMATIC_RESET_CONSTRAINT_NAME,
+    Chain,
+    body_joints,
+    bone_slider_index,
+    find_chain,
+    get_chains,
+    get_root_object,
+    register_joint,
+    set_chain_bones,
+    slider_bone_name,
+    slider_bone_pattern,
+    slider_root_bone_name,
+    slider_root_bone_pattern,
+)
+from .lod import LOD_PROPERTY
+from .planner import (
+    BOX_CORNERS,
+    BOX_FACES,
+    CTRL_LAYER,
+    PHYS_LAYER,
+    RigPlan,
+    SelectedBones,
+    SetupSettings,
+    mirror_plan,
+    plan,
+)
+
+# (joint attribute, scene property) pairs copied by `set_joint_properties`
+JOINT_PROPERTIES = (
+    ("use_limit_ang_x", "rigidbody_joint_use_angular_limit_x"),
+    ("limit_ang_x_lower", "rigidbody_joint_angular_limit_lower_x"),
+    ("limit_ang_x_upper", "rigidbody_joint_angular_limit_upper_x"),
+    ("use_limit_ang_y", "rigidbody_joint_use_angular_limit_y"),
+    ("limit_ang_y_lower", "rigidbody_joint_angular_limit_lower_y"),
+    ("limit_ang_y_upper", "rigidbody_joint_angular_limit_upper_y"),
+    ("use_limit_ang_z", "rigidbody_joint_use_angular_limit_z"),
+    ("limit_ang_z_lower", "rigidbody_joint_angular_limit_lower_z"),
+    ("limit_ang_z_upper", "rigidbody_joint_angular_limit_upper_z"),
+    ("use_limit_lin_x", "rigidbody_joint_use_linear_limit_x"),
+    ("limit_lin_x_lower", "rigidbody_joint_linear_limit_lower_x"),
+    ("limit_lin_x_upper", "rigidbody_joint_linear_limit_upper_x"),
+    ("use_limit_lin_y", "rigidbody_joint_use_linear_limit_y"),
+    ("limit_lin_y_lower", "rigidbody_joint_linear_limit_lower_y"),
+    ("limit_lin_y_upper", "rigidbody_joint_linear_limit_upper_y"),
+    ("use_limit_lin_z", "rigidbody_joint_use_linear_limit_z"),
+    ("limit_lin_z_lower", "rigidbody_joint_linear_limit_lower_z"),
+    ("limit_lin_z_upper", "rigidbody_joint_linear_limit_upper_z"),
+    ("use_spring_ang_x", "rigidbody_joint_use_angular_spring_x"),
+    ("spring_stiffness_ang_x", "rigidbody_joint_angular_spring_stiffness_x"),
+    ("spring_damping_ang_x", "rigidbody_joint_angular_spring_damping_x"),
+    ("use_spring_ang_y", "rigidbody_joint_use_angular_spring_y"),
+    ("spring_stiffness_ang_y", "rigidbody_joint_angular_spring_stiffness_y"),
+    ("spring_damping_ang_y", "rigidbody_joint_angular_spring_damping_y"),
+    ("use_spring_ang_z", "rigidbody_joint_use_angular_spring_z"),
+    ("spring_stiffness_ang_z", "rigidbody_joint_angular_spring_stiffness_z"),
+    ("spring_damping_ang_z", "rigidbody_joint_angular_spring_damping_z"),
+    ("use_spring_x", "rigidbody_joint_use_linear_spring_x"),
+    ("spring_stiffness_x", "rigidbody_joint_linear_spring_stiffness_x"),
+    ("spring_damping_x", "rigidbody_joint_linear_spring_damping_x"),
+    ("use_spring_y", "rigidbody_joint_use_linear_spring_y"),
+    ("spring_stiffness_y", "rigidbody_joint_linear_spring_stiffness_y"),
+    ("spring_damping_y", "rigidbody_joint_linear_spring_damping_y"),
+    ("use_spring_z", "rigidbody_joint_use_linear_spring_z"),
+    ("spring_stiffness_z", "rigidbody_joint_linear_spring_stiffness_z"),
+    ("spring_damping_z", "rigidbody_joint_linear_spring_damping_z"),
+)
+
+
+def set_joint_properties(joint: bpy.types.RigidBodyConstraint) -> None:
+    props = bpy.context.scene.yurerig
+    instrument.assign(
+        joint, **{attr: getattr(props, prop) for attr, prop in JOINT_PROPERTIES}
+    )
+
+
+def set_mode(mode: str) -> None:
+    with instrument.phase("mode_switch"):
+        bpy.ops.object.mode_set(mode=mode)
+
+
+# Unit shapes
+#################################################
+# Bones share one unit sized custom shape object per kind and size it with
+# `custom_shape_scale_xyz` and `custom_shape_translation` on top of the bone
+# length, so no mesh is built per bone.
+
+UNIT_SHAPE_NAMES = {
+    "CONTROLLER": "UNIT_YURERIG_Controller_BoneShape_YURERIG",
+    "PHYS_BONE": "UNIT_YURERIG_PhysBone_BoneShape_YURERIG",
+    "SLIDER": "UNIT_YURERIG_Slider_BoneShape_YURERIG",
+    "SLIDER_ROOT": "UNIT_YURERIG_SliderRoot_BoneShape_YURERIG",
+}
+
+
+def make_unit_slider_root(name: str) -> bpy.types.Object:
+    """
+    Slider frame with FK/PHYS labels for a slider size of 1.
+    Needs OBJECT mode.
+    """
+
+    deco_phys_curve = bpy.data.curves.new(type="FONT", name="DECO_YURERIG_PHYS")
+    deco_phys_curve.align_x = "CENTER"
+    deco_phys_curve.align_y = "TOP"
+    deco_phys_curve.size = 1 / 6
+    deco_phys = bpy.data.objects.new("DECO_YURERIG_PHYS", object_data=deco_phys_curve)
+    deco_phys.data.body = "PHYS"
+    deco_phys.location = Vector((0, 0, 4 / 6))
+    deco_phys.rotation_euler = Vector((math.radians(90), 0, 0))
+
+    deco_fk_curve = bpy.data.curves.new(type="FONT", name="DECO_YURERIG_FK")
+    deco_fk_curve.align_x = "CENTER"
+    deco_fk_curve.align_y = "TOP"
+    deco_fk_curve.size = 1 / 6
+    deco_fk = bpy.data.objects.new("DECO_YURERIG_FK", object_data=deco_fk_curve)
+    deco_fk.data.body = "FK"
+    deco_fk.location = Vector((0, 0, -1 / 6))
+    deco_fk.rotation_euler = Vector((math.radians(90), 0, 0))
+
+    for deco in (deco_phys, deco_fk):
+        bpy.context.scene.collection.objects.link(deco)
+        for o in bpy.context.view_layer.objects:
+            o.select_set(o == deco)
+        bpy.context.view_layer.objects.active = deco
+        bpy.ops.object.convert(target="MESH")
+
+    slider_gap = 1 / 6
+    slider_body = 1 / 6 * 2
+    verts: List[Vector] = []
+    for i in range(7):
+        theta = math.radians(i * 30)
+        verts.append(
+            Vector((math.cos(theta) * slider_gap, 0, -math.sin(theta) * slider_gap))
+        )
+    for i in range(7):
+        theta = math.radians(i * 30)
+        verts.append(
+            Vector(
+                (
+                    math.cos(theta) * slider_gap,
+                    0,
+                    slider_body + math.sin(theta) * slider_gap,
+                )
+            )
+        )
+
+    faces = [[0, 1, 2, 3, 4, 5, 6, 13, 12, 11, 10, 9, 8, 7]]
+    mesh = bpy.data.meshes.new(name)
+    mesh.from_pydata(verts, [], faces)
+    mesh.update(calc_edges=True)
+    obj = bpy.data.objects.new(name, object_data=mesh)
+    obj.display_type = "WIRE"
+    bpy.context.scene.yurerig.controllers_collection.objects.link(obj)
+
+    bpy.context.scene.collection.objects.link(obj)
+    for o in bpy.context.view_layer.objects:
+        o.select_set(o == obj or o == deco_fk or o == deco_phys)
+    bpy.context.view_layer.objects.active = obj
+    bpy.ops.object.join(
+        {"active_object": obj, "selected_objects": [obj, deco_fk, deco_phys]}
+    )
+    bpy.context.scene.collection.objects.unlink(obj)
+
+    return obj
+
+
+def make_unit_slider_obj(name: str) -> bpy.types.Object:
+    """
+    Slider knob of radius 1.
+    """
+
+    verts: List[Vector] = []
+    for i in range(12):
+        theta = math.radians(i * 30)
+        verts.append(Vector((math.cos(theta), 0, -math.sin(theta))))
+
+    faces = [[0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11]]
+    mesh = bpy.data.meshes.new(name)
+    mesh.from_pydata(verts, [], faces)
+    mesh.update(calc_edges=True)
+    obj = bpy.data.objects.new(name, object_data=mesh)
+    obj.display_type = "WIRE"
+    bpy.context.scene.yurerig.controllers_collection.objects.link(obj)
+    return obj
+
+
+def make_unit_controller_object(name: str) -> bpy.types.Object:
+    """
+    Hexagonal prism of radius 1 from y = 0 to y = 1.
+    """
+
+    verts: List[Vector] = []
+    for i in range(6):
+        theta = math.radians(i * 60)
+        verts.append(Vector((math.cos(theta), 0, math.sin(theta))))
+        verts.append(Vector((math.cos(theta), 1, math.sin(theta))))
+    faces = [
+        [0, 1, 3, 2],
+        [2, 3, 5, 4],
+        [4, 5, 7, 6],
+        [6, 7, 9, 8],
+        [8, 9, 11, 10],
+        [10, 11, 1, 0],
+        [0, 2, 4, 6, 8, 10],
+        [1, 3, 5, 7, 9, 11],
+    ]
+    mesh = bpy.data.meshes.new(name)
+    mesh.from_pydata(verts, [], faces)
+    mesh.update(calc_edges=True)
+    obj = bpy.data.objects.new(name, object_data=mesh)
+    obj.display_type = "WIRE"
+    bpy.context.scene.yurerig.controllers_collection.objects.link(obj)
+    return obj
+
+
+def make_unit_phys_bone_object(name: str) -> bpy.types.Object:
+    """
+    Box of size 1 from y = 0 to y = 1.
+    """
+
+    verts: List[Vector] = []
+    verts.append(Vector((0.5, 0, 0.5)))
+    verts.append(Vector((0.5, 0, -0.5)))
+    verts.append(Vector((-0.5, 0, 0.5)))
+    verts.append(Vector((-0.5, 0, -0.5)))
+    verts.append(Vector((0.5, 1, 0.5)))
+    verts.append(Vector((0.5, 1, -0.5)))
+    verts.append(Vector((-0.5, 1, 0.5)))
+    verts.append(Vector((-0.5, 1, -0.5)))
+
+    faces = [
+        [0, 1, 3, 2],
+        [4, 5, 7, 6],
+        [0, 1, 5, 4],
+        [1, 2, 6, 5],
+        [2, 3, 7, 6],
+        [3, 0, 4, 7],
+    ]
+    mesh = bpy.data.meshes.new(name)
+    mesh.from_pydata(verts, [], faces)
+    mesh.update(calc_edges=True)
+
+    obj = bpy.data.objects.new(name, object_data=mesh)
+    obj.display_type = "WIRE"
+    bpy.context.scene.yurerig.controllers_collection.objects.link(obj)
+    return obj
+
+
+def ensure_unit_shapes(context: bpy.types.Context) -> None:
+    """
+    Make the unit shape objects missing from the file.
+    """
+
+    if bpy.data.objects.get(UNIT_SHAPE_NAMES["SLIDER_ROOT"]) is None:
+        active = context.view_layer.objects.active
+        mode = active.mode if active is not None else "OBJECT"
+        if mode != "OBJECT":
+            set_mode("OBJECT")
+        make_unit_slider_root(UNIT_SHAPE_NAMES["SLIDER_ROOT"])
+        context.view_layer.objects.active = active
+        for o in context.view_layer.objects:
+            o.select_set(o == active)
+        if mode != "OBJECT":
+            set_mode(mode)
+    if bpy.data.objects.get(UNIT_SHAPE_NAMES["SLIDER"]) is None:
+        make_unit_slider_obj(UNIT_SHAPE_NAMES["SLIDER"])
+    if bpy.data.objects.get(UNIT_SHAPE_NAMES["CONTROLLER"]) is None:
+        make_unit_controller_object(UNIT_SHAPE_NAMES["CONTROLLER"])
+    if bpy.data.objects.get(UNIT_SHAPE_NAMES["PHYS_BONE"]) is None:
+        make_unit_phys_bone_object(UNIT_SHAPE_NAMES["PHYS_BONE"])
+
+
+def shape_kind(name: str) -> Optional[str]:
+    if slider_bone_pattern.match(name):
+        return "SLIDER"
+    if slider_root_bone_pattern.match(name):
+        return "SLIDER_ROOT"
+    if name.startswith("CTRL_YURERIG_"):
+        return "CONTROLLER"
+    if name.startswith("PHYS_YURERIG_"):
+        return "PHYS_BONE"
+    return None
+
+
+def slider_size_of(pose_bone: bpy.types.PoseBone) -> float:
+    """
+    Slider size of a slider or slider root bone, from the "Max Slider Value"
+    of the slider.
+    """
+
+    match = slider_root_bone_pattern.match(pose_bone.name)
+    if match is not None:
+        pose_bone = pose_bone.id_data.pose.bones.get(
+            slider_bone_name(int(match.groups()[0])), pose_bone
+        )
+    max_slider_value = pose_bone.get("Max Slider Value")
+    if max_slider_value is None:
+        return float(bpy.context.scene.yurerig.controller_slider_size)
+    return float(max_slider_value) * 6 / 2
+
+
+def shape_transform(
+    pose_bone: bpy.types.PoseBone, kind: str
+) -> Tuple[Tuple[float, float, float], Tuple[float, float, float]]:
+    """
+    `custom_shape_scale_xyz` of `pose_bone` relative to its length, and its
+    `custom_shape_translation`, which Blender does not scale by the length.
+    """
+
+    length = pose_bone.bone.length
+    if kind == "CONTROLLER":
+        radius = bpy.context.scene.yurerig.controller_bone_radius / length
+        return (radius, 1, radius), (0, 0, 0)
+    if kind == "PHYS_BONE":
+        rigidbody_obj = bpy.data.objects.get(f"RIGIDBODY_YURERIG_{pose_bone.name[13:]}")
+        if rigidbody_obj is not None and len(rigidbody_obj.data.vertices) > 0:
+            co = [v.co for v in rigidbody_obj.data.vertices]
+            size = [
+                max(c[axis] for c in co) - min(c[axis] for c in co) for axis in range(3)
+            ]
+        else:
+            props = bpy.context.scene.yurerig
+            size = [
+                props.rigidbody_size_x,
+                length - props.rigidbody_gap,
+                props.rigidbody_size_z,
+            ]
+        return (
+            (size[0] / length, size[1] / length, size[2] / length),
+            (0, (length - size[1]) / 2, 0),
+        )
+    if kind == "SLIDER":
+        radius = slider_size_of(pose_bone) / 7.5 / length
+        return (radius, radius, radius), (0, 0, 0)
+    scale = slider_size_of(pose_bone) / length
+    return (scale, scale, scale), (0, 0, 0)
+
+
+def apply_unit_shapes(
+    armature: bpy.types.Object, names: Optional[Set[str]] = None
+) -> int:
+    """
+    Point the YureRig bones of `armature`, or only the bones `names`, to the
+    unit shapes and write their shape scales and offsets in bulk.
+    Per bone shape objects which are no longer used are removed.
+    Return the number of updated bones.
+    """
+
+    with instrument.phase("shapes"):
+        ensure_unit_shapes(bpy.context)
+        shapes = {
+            kind: bpy.data.objects[name] for kind, name in UNIT_SHAPE_NAMES.items()
+        }
+        unit_shapes = set(shapes.values())
+
+        pose_bones = armature.pose.bones
+        scales = [0.0] * (len(pose_bones) * 3)
+        translations = [0.0] * (len(pose_bones) * 3)
+        pose_bones.foreach_get("custom_shape_scale_xyz", scales)
+        pose_bones.foreach_get("custom_shape_translation", translations)
+
+        old_shapes: Set[bpy.types.Object] = set()
+        count = 0
+        for i, pose_bone in enumerate(pose_bones):
+            if names is not None and pose_bone.name not in names:
+                continue
+            kind = shape_kind(pose_bone.name)
+            if kind is None:
+                continue
+            if pose_bone.custom_shape is not shapes[kind]:
+                if pose_bone.custom_shape is not None:
+                    old_shapes.add(pose_bone.custom_shape)
+                instrument.assign(
+                    pose_bone,
+                    custom_shape=shapes[kind],
+                    use_custom_shape_bone_size=True,
+                )
+            scale, translation = shape_transform(pose_bone, kind)
+            scales[i * 3 : i * 3 + 3] = scale
+            translations[i * 3 : i * 3 + 3] = translation
+            count += 1
+
+        pose_bones.foreach_set("custom_shape_scale_xyz", scales)
+        instrument.writes()
+        pose_bones.foreach_set("custom_shape_translation", translations)
+        instrument.writes()
+
+        # An object is still used by a collection, so a user count of 1 means no
+        # bone uses it anymore
+        unused = [
+            obj
+            for obj in old_shapes
+            if obj not in unit_shapes
+            and obj.name.endswith("BoneShape_YURERIG")
+            and obj.users <= 1
+        ]
+        if len(unused) > 0:
+            bpy.data.batch_remove(unused)
+    return count
+
+
+def init_collection() -> None:
+    props = bpy.context.scene.yurerig
+    if props.root_collection is None:
+        if "YureRig" in bpy.data.collections:
+            props.root_collection = bpy.data.collections["YureRig"]
+        else:
+            props.root_collection = bpy.data.collections.new(name="YureRig")
+            bpy.context.scene.collection.children.link(props.root_collection)
+        props.root_collection.hide_viewport = True
+        props.root_collection.hide_render = True
+
+    if props.joints_collection is None:
+        if "YureRig Joints" in bpy.data.collections:
+            props.joints_collection = bpy.data.collections["YureRig Joints"]
+        else:
+            props.joints_collection = bpy.data.collections.new(name="YureRig Joints")
+            props.root_collection.children.link(props.joints_collection)
+
+    if props.rigidbodies_collection is None:
+        if "YureRig RigidBodies" in bpy.data.collections:
+            props.rigidbodies_collection = bpy.data.collections["YureRig RigidBodies"]
+        else:
+            props.rigidbodies_collection = bpy.data.collections.new(
+                name="YureRig RigidBodies"
+            )
+            props.root_collection.children.link(props.rigidbodies_collection)
+        props.rigidbodies_collection.lineart_usage = "EXCLUDE"
+        props.rigidbodies_collection.hide_viewport = True
+        props.rigidbodies_collection.hide_render = True
+
+    if props.rigidbodies_reset_goal_collection is None:
+        if "YureRig RigidBodies Reset Goal" in bpy.data.collections:
+            props.rigidbodies_reset_goal_collection = bpy.data.collections[
+                "YureRig RigidBodies Reset Goal"
+            ]
+        else:
+            props.rigidbodies_reset_goal_collection = bpy.data.collections.new(
+                name="YureRig RigidBodies Reset Goal"
+            )
+            props.root_collection.children.link(props.rigidbodies_reset_goal_collection)
+        props.rigidbodies_reset_goal_collection.lineart_usage = "EXCLUDE"
+        props.rigidbodies_reset_goal_collection.hide_viewport = True
+        props.rigidbodies_reset_goal_collection.hide_render = True
+
+    if props.controllers_collection is None:
+        if "YureRig Controller Objects" in bpy.data.collections:
+            props.controllers_collection = bpy.data.collections[
+                "YureRig Controller Objects"
+            ]
+        else:
+            props.controllers_collection = bpy.data.collections.new(
+                name="YureRig Controller Objects"
+            )
+            props.root_collection.children.link(props.controllers_collection)
+        props.controllers_collection.hide_viewport = True
+        props.controllers_collection.hide_render = True
+
+
+def make_rigidbody_reset_goal_object(
+    name: str,
+    head: Vector,
+    tail: Vector,
+    z_dir: Vector,
+    physics_influence_slider_name: str,
+    armature: bpy.types.Object,
+    rigidbody_obj: bpy.types.Object,
+) -> bpy.types.Object:
+    # The goal gets the size of its rigid body, which may be fitted to the skin
+    co = [v.co for v in rigidbody_obj.data.vertices]
+    x_size = max(c[0] for c in co) - min(c[0] for c in co)
+    z_size = max(c[2] for c in co) - min(c[2] for c in co)
+    gap = bpy.context.scene.yurerig.rigidbody_gap
+    length = (head - tail).length
+
+    verts: List[Vector] = []
+    verts.append(Vector((x_size / 2, -length / 2 + gap / 2, z_size / 2)))
+    verts.append(Vector((x_size / 2, -length / 2 + gap / 2, -z_size / 2)))
+    verts.append(Vector((-x_size / 2, -length / 2 + gap / 2, z_size / 2)))
+    verts.append(Vector((-x_size / 2, -length / 2 + gap / 2, -z_size / 2)))
+    verts.append(Vector((x_size / 2, length / 2 - gap / 2, z_size / 2)))
+    verts.append(Vector((x_size / 2, length / 2 - gap / 2, -z_size / 2)))
+    verts.append(Vector((-x_size / 2, length / 2 - gap / 2, z_size / 2)))
+    verts.append(Vector((-x_size / 2, length / 2 - gap / 2, -z_size / 2)))
+
+    faces = [
+        [0, 1, 3, 2],
+        [4, 5, 7, 6],
+        [0, 1, 5, 4],
+        [1, 2, 6, 5],
+        [2, 3, 7, 6],
+        [3, 0, 4, 7],
+    ]
+    mesh = bpy.data.meshes.new(name)
+    mesh.from_pydata(verts, [], faces)
+    mesh.update(calc_edges=True)
+
+    obj = bpy.data.objects.new(name, object_data=mesh)
+    obj.display_type = "WIRE"
+
+    bpy.context.scene.rigidbody_world.collection.objects.link(obj)
+    obj.rigid_body.type = "PASSIVE"
+    obj.rigid_body.kinematic = True
+    obj.rigid_body.collision_collections = [layer == 19 for layer in range(20)]
+
+    bpy.context.scene.rigidbody_world.constraints.objects.link(obj)
+    obj.rigid_body_constraint.type = "FIXED"
+    obj.rigid_body_constraint.object1 = obj
+    obj.rigid_body_constraint.object2 = rigidbody_obj
+    obj.rigid_body_constraint.enabled
+    constraint_enabled_driver = obj.rigid_body_constraint.driver_add("enabled")
+    constraint_enabled_driver.driver.type = "SCRIPTED"
+    var = constraint_enabled_driver.driver.variables.new()
+    var.name = "locZ"
+    var.type = "TRANSFORMS"
+    var.targets[0].id = armature
+    var.targets[0].bone_target = physics_influence_slider_name
+    var.targets[0].transform_space = "LOCAL_SPACE"
+    var.targets[0].transform_type = "LOC_Z"
+    constraint_enabled_driver.driver.expression = "locZ == 0"
+
+    obj.rotation_mode = "QUATERNION"
+    dir_y = (tail - head).normalized()
+    dir_z = z_dir.normalized()
+    dir_x = dir_y.cross(dir_z).normalized()
+    mat = Matrix.Identity(4)
+    mat.col[0] = dir_x.to_4d()
+    mat.col[1] = dir_y.to_4d()
+    mat.col[2] = dir_z.to_4d()
+    obj.matrix_world = mat
+    obj.location = (tail + head) / 2
+
+    bpy.context.scene.yurerig.rigidbodies_reset_goal_collection.objects.link(obj)
+    return obj
+
+
+def add_reset_goal_constraints(
+    obj: bpy.types.Object, armature: bpy.types.Object, ctrl_bone_name: str
+) -> None:
+    copy_location = obj.constraints.new("COPY_LOCATION")
+    copy_location.target = armature
+    copy_location.subtarget = ctrl_bone_name
+    copy_location.head_tail = 0.5
+    copy_rotation = obj.constraints.new("COPY_ROTATION")
+    copy_rotation.target = armature
+    copy_rotation.subtarget = ctrl_bone_name
+
+
+def add_kinematic_reset(
+    obj: bpy.types.Object,
+    armature: bpy.types.Object,
+    ctrl_bone_name: str,
+    physics_influence_slider_name: str,
+) -> None:
+    """
+    Pin the rigid body `obj` to the FK pose while the physics influence slider
+    is at FK, without a reset goal body and a FIXED joint.
+    The rigid body is kinematic and copies the transforms of the CTRL_YURERIG_
+    bone while the slider is at FK, and is simulated otherwise.
+    """
+
+    copy_transforms = obj.constraints.new("COPY_TRANSFORMS")
+    copy_transforms.name = KINEMATIC_RESET_CONSTRAINT_NAME
+    copy_transforms.target = armature
+    copy_transforms.subtarget = ctrl_bone_name
+    copy_transforms.head_tail = 0.5
+
+    for driver in (
+        obj.driver_add("rigid_body.kinematic"),
+        copy_transforms.driver_add("influence"),
+    ):
+        driver.driver.type = "SCRIPTED"
+        var = driver.driver.variables.new()
+        var.name = "locZ"
+        var.type = "TRANSFORMS"
+        var.targets[0].id = armature
+        var.targets[0].bone_target = physics_influence_slider_name
+        var.targets[0].transform_space = "LOCAL_SPACE"
+        var.targets[0].transform_type = "LOC_Z"
+        driver.driver.expression = "locZ == 0"
+
+
+def remove_kinematic_reset(obj: bpy.types.Object) -> None:
+    copy_transforms = obj.constraints.get(KINEMATIC_RESET_CONSTRAINT_NAME)
+    if copy_transforms is None:
+        return
+    copy_transforms.driver_remove("influence")
+    obj.constraints.remove(copy_transforms)
+    obj.driver_remove("rigid_body.kinematic")
+    obj.rigid_body.kinematic = False
+
+
+def add_slider_driver(
+    fcurve: bpy.types.FCurve,
+    armature: bpy.types.Object,
+    slider_name: str,
+    expression: str,
+    use_max: bool = False,
+) -> None:
+    """
+    Drive `fcurve` by the Z location `locZ` of the physics influence slider
+    `slider_name`, and with `use_max` by its "Max Slider Value" `maxLocZ`.
+    """
+
+    instrument.assign(fcurve.driver, type="SCRIPTED")
+    var = fcurve.driver.variables.new()
+    instrument.assign(var, name="locZ", type="TRANSFORMS")
+    instrument.assign(
+        var.targets[0],
+        id=armature,
+        bone_target=slider_name,
+        transform_space="LOCAL_SPACE",
+        transform_type="LOC_Z",
+    )
+    if use_max:
+        max_var = fcurve.driver.variables.new()
+        instrument.assign(max_var, name="maxLocZ", type="SINGLE_PROP")
+        instrument.assign(
+            max_var.targets[0],
+            id=armature,
+            data_path=f'pose.bones["{slider_name}"]["Max Slider Value"]',
+        )
+    instrument.assign(fcurve.driver, expression=expression)
+
+
+def setup_blend_constraint(
+    constraint: bpy.types.ArmatureConstraint,
+    armature: bpy.types.Object,
+    subtargets: Tuple[str, ...],
+) -> None:
+    """
+    Target the bones `subtargets` of `armature` by the ARMATURE constraint of
+    a lean DEF_YURERIG_ bone, whose weights are driven by the slider.
+    """
+
+    # Blend like the influence of a constraint rather than like skinning,
+    # which shrinks the bone half way between FK and physics
+    instrument.assign(
+        constraint, name=DEF_BLEND_CONSTRAINT_NAME, use_deform_preserve_volume=True
+    )
+    for subtarget in subtargets:
+        target = constraint.targets.new()
+        instrument.assign(target, target=armature, subtarget=subtarget)
+
+
+def add_def_constraints(
+    armature: bpy.types.Object, name: str, slider_name: str, topology: str
+) -> None:
+    """
+    Make the DEF_YURERIG_ bone of `name` follow its CTRL_YURERIG_ bone at FK
+    and its PHYS_YURERIG_ bone at physics, with the constraints of `topology`.
+    """
+
+    pose_bone = armature.pose.bones[f"DEF_YURERIG_{name}"]
+    if topology == "LEAN":
+        constraint = pose_bone.constraints.new("ARMATURE")
+        setup_blend_constraint(
+            constraint, armature, (f"PHYS_YURERIG_{name}", f"CTRL_YURERIG_{name}")
+        )
+        for k, expression in enumerate(("locZ / maxLocZ", "1 - locZ / maxLocZ")):
+            add_slider_driver(
+                constraint.driver_add(f"targets[{k}].weight"),
+                armature,
+                slider_name,
+                expression,
+                use_max=True,
+            )
+        return
+
+    for subtarget in (f"PHYS_YURERIG_{name}", f"CTRL_YURERIG_{name}"):
+        constraint = pose_bone.constraints.new("COPY_TRANSFORMS")
+        instrument.assign(constraint, target=armature, subtarget=subtarget)
+    add_slider_driver(
+        constraint.driver_add("influence"),
+        armature,
+        slider_name,
+        "1 - locZ / maxLocZ",
+        use_max=True,
+    )
+
+
+def def_constraints(
+    armature: bpy.types.Object, pose_bone: bpy.types.PoseBone
+) -> List[bpy.types.Constraint]:
+    """
+    Constraints of the DEF_YURERIG_ bone `pose_bone` following its CTRL_YURERIG_
+    and PHYS_YURERIG_ bones: two COPY_TRANSFORMS, or one ARMATURE constraint in
+    the lean topology.
+    """
+
+    name = pose_bone.name[12:]
+    subtargets = (f"CTRL_YURERIG_{name}", f"PHYS_YURERIG_{name}")
+    return [
+        constraint
+        for constraint in pose_bone.constraints
+        if (
+            constraint.type == "ARMATURE"
+            and constraint.name == DEF_BLEND_CONSTRAINT_NAME
+        )
+        or (
+            constraint.type == "COPY_TRANSFORMS"
+            and constraint.target == armature
+            and constraint.subtarget in subtargets
+        )
+    ]
+
+
+def remove_def_constraints(
+    armature: bpy.types.Object, pose_bone: bpy.types.PoseBone
+) -> None:
+    """
+    Remove the constraints of `def_constraints` and their drivers.
+    """
+
+    drivers = (
+        armature.animation_data.drivers if armature.animation_data is not None else None
+    )
+    for constraint in def_constraints(armature, pose_bone):
+        if drivers is not None:
+            path = constraint.path_from_id()
+            paths = [f"{path}.influence"]
+            if constraint.type == "ARMATURE":
+                paths += [
+                    f"{path}.targets[{k}].weight"
+                    for k in range(len(constraint.targets))
+                ]
+            for data_path in paths:
+                fcurve = drivers.find(data_path)
+                if fcurve is not None:
+                    drivers.remove(fcurve)
+        pose_bone.constraints.remove(constraint)
+
+
+def unparent_def_bone(edit_bone: bpy.types.EditBone) -> bool:
+    """
+    Detach the DEF_YURERIG_ edit bone from its parent for the lean topology,
+    whose ARMATURE constraint would add the parent transform a second time.
+    The parent is kept in custom properties of the bone for
+    `restore_def_parent`. Return False when the bone is already detached.
+    """
+
+    if DEF_PARENT_PROPERTY in edit_bone:
+        return False
+    instrument.assign_items(
+        edit_bone,
+        {
+            DEF_PARENT_PROPERTY: (
+                edit_bone.parent.name if edit_bone.parent is not None else ""
+            ),
+            DEF_CONNECT_PROPERTY: edit_bone.use_connect,
+        },
+    )
+    instrument.assign(edit_bone, use_connect=False, parent=None)
+    return True
+
+
+def restore_def_parent(edit_bones: bpy.types.ArmatureEditBones, name: str) -> None:
+    """
+    Parent the edit bone `name` back as before `unparent_def_bone`.
+    """
+
+    edit_bone = edit_bones.get(name)
+    if edit_bone is None or DEF_PARENT_PROPERTY not in edit_bone:
+        return
+    parent = edit_bones.get(edit_bone[DEF_PARENT_PROPERTY])
+    instrument.assign(
+        edit_bone,
+        parent=parent,
+        use_connect=parent is not None
+        and bool(edit_bone.get(DEF_CONNECT_PROPERTY, False)),
+    )
+    del edit_bone[DEF_PARENT_PROPERTY]
+    if DEF_CONNECT_PROPERTY in edit_bone:
+        del edit_bone[DEF_CONNECT_PROPERTY]
+
+
+def parent_to_bone(
+    obj: bpy.types.Object, armature: bpy.types.Object, bone_name: str
+) -> None:
+    """
+    Parent `obj` to the bone `bone_name` of `armature`, for the lean topology.
+    The matrix basis of `obj` is then in armature space and its world matrix
+    follows the bone from its rest pose, like the CHILD_OF constraint of a
+    root body or the COPY_LOCATION and COPY_ROTATION constraints of a goal,
+    without an object constraint to evaluate.
+    """
+
+    bone = armature.data.bones[bone_name]
+    instrument.assign(
+        obj,
+        parent=armature,
+        parent_type="BONE",
+        parent_bone=bone_name,
+        # Bone parents are placed at the bone tail
+        matrix_parent_inverse=(
+            bone.matrix_local @ Matrix.Translation((0, bone.length, 0))
+        ).inverted(),
+    )
+
+
+def clear_bone_parent(obj: bpy.types.Object) -> None:
+    """
+    Undo `parent_to_bone`, keeping the current world matrix of `obj`.
+    """
+
+    matrix_world = obj.matrix_world.copy()
+    instrument.assign(
+        obj,
+        parent=None,
+        parent_type="OBJECT",
+        parent_bone="",
+        matrix_parent_inverse=Matrix.Identity(4),
+        matrix_world=matrix_world,
+    )
+
+
+def read_selected_bones(
+    armature: bpy.types.Object,
+    selected_bones: List[bpy.types.PoseBone],
+    active_bone: bpy.types.PoseBone,
+) -> SelectedBones:
+    """
+    Read the rest data of the selected bones and the active bone for the
+    planner.
+    """
+
+    pose_bones = list(selected_bones)
+    if active_bone not in pose_bones:
+        pose_bones.append(active_bone)
+    index = {b.name: i for i, b in enumerate(pose_bones)}
+    return SelectedBones(
+        [b.name for b in pose_bones],
+        [
+            index.get(b.parent.name, -1) if b.parent is not None else -1
+            for b in pose_bones
+        ],
+        index[active_bone.name],
+        np.array([b.bone.head_local for b in pose_bones]),
+        np.array([b.bone.tail_local for b in pose_bones]),
+        np.array([b.bone.matrix_local.col[2].to_3d() for b in pose_bones]),
+        np.array([b.rotation_quaternion for b in pose_bones]),
+        [b.bone.use_connect for b in pose_bones],
+    )
+
+
+def next_slider_index(armature: bpy.types.Object, start: int = 0) -> int:
+    i = start
+    while slider_root_bone_name(i) in armature.data.bones:
+        i += 1
+    return i
+
+
+def ensure_rigidbody_world(context: bpy.types.Context) -> bpy.types.RigidBodyWorld:
+    if context.scene.rigidbody_world is None:
+        bpy.ops.rigidbody.world_add()
+    world = context.scene.rigidbody_world
+    world.enabled = True
+    if world.collection is None:
+        world.collection = bpy.data.collections.new("RigidBody Collection")
+        world.collection.use_fake_user = True
+    if world.constraints is None:
+        world.constraints = bpy.data.collections.new("RigidBody Constraint Collection")
+        world.constraints.use_fake_user = True
+    return world
+
+
+def ensure_bone_group(
+    armature: bpy.types.Object, name: str, color: Tuple[float, float, float]
+) -> bpy.types.BoneGroup:
+    group = armature.pose.bone_groups.get(name)
+    if group is None:
+        group = armature.pose.bone_groups.new(name=name)
+    group.color_set = "CUSTOM"
+    group.colors.normal = color
+    group.colors.select = color
+    group.colors.active = color
+    return group
+
+
+def unused_meshes(objects: Set[bpy.types.Object]) -> Set[bpy.types.Mesh]:
+    """
+    Meshes used by nothing but `objects`. Mirrored rigid bodies share the
+    meshes of their originals.
+    """
+
+    users: Dict[bpy.types.Mesh, int] = {}
+    for obj in objects:
+        if isinstance(obj.data, bpy.types.Mesh):
+            users[obj.data] = users.get(obj.data, 0) + 1
+    return {mesh for mesh, count in users.items() if mesh.users <= count}
+
+
+class ApplyJournal:
+    """
+    What `apply_plan_steps` changed so far, so that a cancelled setup can be
+    rolled back by `rollback_plan`.
+    """
+
+    __slots__ = (
+        "renames",
+        "bone_groups",
+        "bones",
+        "objects",
+        "def_bones",
+        "constraints",
+        "drivers",
+        "unparented",
+    )
+
+    def __init__(self) -> None:
+        # (old name, new name) of the renamed bones
+        self.renames: List[Tuple[str, str]] = []
+        self.bone_groups: List[str] = []
+        self.bones: List[str] = []
+        self.objects: List[str] = []
+        # Bone group name and hide_select of the DEF_YURERIG_ bones before setup
+        self.def_bones: Dict[str, Tuple[Optional[str], bool]] = {}
+        # (pose bone name, constraint name) of constraints added to old bones
+        self.constraints: List[Tuple[str, str]] = []
+        # Data paths of the drivers added to the armature
+        self.drivers: List[str] = []
+        # DEF_YURERIG_ bones detached from their parents by the lean topology
+        self.unparented: List[str] = []
+
+
+def apply_plan_size(rig_plans: Sequence[RigPlan]) -> int:
+    """
+    Number of work units `apply_plan_steps` yields for `rig_plans`.
+    """
+
+    return 2 + sum(
+        3 * len(rig_plan.bones)
+        + len(rig_plan.bodies)
+        + len(rig_plan.joints)
+        + len(rig_plan.def_names)
+        + len(rig_plan.constraints)
+        + len(rig_plan.drivers)
+        for rig_plan in rig_plans
+    )
+
+
+def apply_plan_steps(
+    context: bpy.types.Context,
+    armature: bpy.types.Object,
+    rig_plans: Sequence[RigPlan],
+    journal: ApplyJournal,
+) -> Iterator[int]:
+    """
+    Create the bones, rigid bodies, joints, constraints and drivers of
+    `rig_plans`, one pass per kind for all plans, so the mirrored plan of a
+    left/right pair shares the mode switches and the setup of the first plan.
+    Rigid bodies which already exist are moved to their planned place and keep
+    their constraints and drivers.
+    Yields the number of work units done after each bone, rigid body, joint,
+    constraint and driver and records the changes into `journal`.
+    Ends in POSE mode.
+    """
+
+    props = context.scene.yurerig
+    done = 0
+
+    armature.data.layers = [
+        layer == 0 or layer == CTRL_LAYER or layer == PHYS_LAYER for layer in range(32)
+    ]
+    for name in ("DEFORM_BONES", "CONTROLLER_BONES", "PHYSICS_BONES"):
+        if name not in armature.pose.bone_groups:
+            journal.bone_groups.append(name)
+    def_bone_group = ensure_bone_group(
+        armature, "DEFORM_BONES", props.deform_bone_color
+    )
+    bone_groups = {
+        "CTRL": ensure_bone_group(
+            armature, "CONTROLLER_BONES", props.controller_bone_color
+        ),
+        "PHYS": ensure_bone_group(armature, "PHYSICS_BONES", props.physics_bone_color),
+    }
+
+    set_mode("OBJECT")
+    ensure_unit_shapes(context)
+    context.view_layer.objects.active = armature
+
+    renames = [r for rig_plan in rig_plans for r in rig_plan.renames]
+    with instrument.phase("renames"):
+        for old_name, new_name in renames:
+            instrument.assign(armature.data.bones[old_name], name=new_name)
+            journal.renames.append((old_name, new_name))
+    done += 1
+    yield done
+
+    # Edit bones
+    bone_names = [name for rig_plan in rig_plans for name in rig_plan.bones.names]
+    set_mode("EDIT")
+    with instrument.phase("edit_bones"):
+        edit_bones = armature.data.edit_bones
+        for rig_plan in rig_plans:
+            bone_table = rig_plan.bones
+            heads = bone_table.heads.tolist()
+            tails = bone_table.tails.tolist()
+            z_axes = bone_table.z_axes.tolist()
+            for i, name in enumerate(bone_table.names):
+                edit_bone = edit_bones.get(name)
+                if edit_bone is None:
+                    edit_bone = edit_bones.new(name)
+                    journal.bones.append(name)
+                instrument.assign(edit_bone, head=heads[i], tail=tails[i])
+                edit_bone.align_roll(z_axes[i])
+                instrument.writes()
+                instrument.assign(
+                    edit_bone,
+                    show_wire=True,
+                    use_deform=False,
+                    hide_select=bone_table.kinds[i] in ("DECO", "PHYS"),
+                )
+                if bone_table.layers[i] >= 0:
+                    instrument.assign(
+                        edit_bone,
+                        layers=[layer == bone_table.layers[i] for layer in range(32)],
+                    )
+                done += 1
+                yield done
+        for rig_plan in rig_plans:
+            bone_table = rig_plan.bones
+            for i, name in enumerate(bone_table.names):
+                parent = bone_table.parents[i]
+                instrument.assign(
+                    edit_bones[name],
+                    parent=edit_bones[parent] if parent is not None else None,
+                    use_connect=bone_table.connects[i],
+                )
+                done += 1
+                yield done
+            if rig_plan.settings.topology == "LEAN":
+                for name in rig_plan.def_names:
+                    if unparent_def_bone(edit_bones[name]):
+                        journal.unparented.append(name)
+
+    # Rigid bodies and joints
+    set_mode("OBJECT")
+    world = ensure_rigidbody_world(context)
+    with instrument.phase("rigid_body_linking"):
+        created: Set[str] = set()
+        for rig_plan in rig_plans:
+            settings = rig_plan.settings
+            body_table = rig_plan.bodies
+            vertices = body_table.vertices().tolist()
+            matrices = body_table.matrices.tolist()
+            for i, name in enumerate(body_table.names):
+                obj = bpy.data.objects.get(name)
+                kind = body_table.kinds[i]
+                if obj is None:
+                    source = bpy.data.objects.get(rig_plan.mesh_sources.get(name, ""))
+                    with instrument.phase("meshes"):
+                        if source is not None and isinstance(
+                            source.data, bpy.types.Mesh
+                        ):
+                            mesh = source.data
+                        else:
+                            mesh = bpy.data.meshes.new(name)
+                            mesh.from_pydata(vertices[i], [], BOX_FACES)
+                            mesh.update(calc_edges=True)
+                            instrument.writes()
+                        obj = bpy.data.objects.new(name, object_data=mesh)
+                        journal.objects.append(obj.name)
+                        instrument.assign(obj, display_type="WIRE")
+                    world.collection.objects.link(obj)
+                    if kind == "ACTIVE":
+                        instrument.assign(
+                            obj.rigid_body, type="ACTIVE", mass=settings.mass
+                        )
+                    else:
+                        instrument.assign(
+                            obj.rigid_body,
+                            type="PASSIVE",
+                            kinematic=True,
+                            collision_collections=[layer == 19 for layer in range(20)],
+                        )
+                    if kind != "GOAL":
+                        instrument.assign_items(obj, {JOINTS_PROPERTY: {}})
+                    if kind == "GOAL":
+                        world.constraints.objects.link(obj)
+                        instrument.assign(
+                            obj.rigid_body_constraint,
+                            type="FIXED",
+                            object1=obj,
+                            object2=bpy.data.objects[body_table.targets[i]],
+                        )
+                        props.rigidbodies_reset_goal_collection.objects.link(obj)
+                    else:
+                        props.rigidbodies_collection.objects.link(obj)
+                    created.add(name)
+                instrument.assign(obj, rotation_mode="QUATERNION")
+                if (
+                    settings.topology == "LEAN"
+                    and kind in ("ROOT", "GOAL")
+                    and (name in created or obj.parent == armature)
+                ):
+                    parent_to_bone(obj, armature, body_table.parent_bones[i])
+                    instrument.assign(obj, matrix_basis=Matrix(matrices[i]))
+                else:
+                    instrument.assign(obj, matrix_world=Matrix(matrices[i]))
+                done += 1
+                yield done
+
+    with instrument.phase("rigid_body_linking"):
+        for rig_plan in rig_plans:
+            joint_table = rig_plan.joints
+            locations = joint_table.locations.tolist()
+            for i, name in enumerate(joint_table.names):
+                joint_obj = bpy.data.objects.new(name, None)
+                journal.objects.append(joint_obj.name)
+                instrument.assign(joint_obj, location=locations[i])
+                world.constraints.objects.link(joint_obj)
+                instrument.assign(
+                    joint_obj.rigid_body_constraint,
+                    type="GENERIC_SPRING",
+                    object1=bpy.data.objects[joint_table.object1[i]],
+                    object2=bpy.data.objects[joint_table.object2[i]],
+                )
+                set_joint_properties(joint_obj.rigid_body_constraint)
+                register_joint(joint_obj)
+                props.joints_collection.objects.link(joint_obj)
+                done += 1
+                yield done
+
+    # Pose bones
+    context.view_layer.objects.active = armature
+    set_mode("POSE")
+    with instrument.phase("pose_bones"):
+        pose_bones = armature.pose.bones
+        for rig_plan in rig_plans:
+            instrument.assign_items(
+                pose_bones[rig_plan.slider_name],
+                {"Max Slider Value": rig_plan.max_slider_value},
+            )
+            set_chain_bones(
+                armature, rig_plan.slider_index, [n[12:] for n in rig_plan.def_names]
+            )
+            instrument.writes()
+            for name in rig_plan.def_names:
+                pose_bone = pose_bones[name]
+                journal.def_bones[name] = (
+                    (
+                        pose_bone.bone_group.name
+                        if pose_bone.bone_group is not None
+                        else None
+                    ),
+                    pose_bone.bone.hide_select,
+                )
+                instrument.assign(pose_bone, bone_group=def_bone_group)
+                instrument.assign(pose_bone.bone, hide_select=True)
+                done += 1
+                yield done
+        for rig_plan in rig_plans:
+            bone_table = rig_plan.bones
+            rotations = bone_table.rotations.tolist()
+            for i, name in enumerate(bone_table.names):
+                group = bone_groups.get(bone_table.kinds[i])
+                if group is not None:
+                    instrument.assign(pose_bones[name], bone_group=group)
+                if bone_table.kinds[i] == "CTRL":
+                    instrument.assign(
+                        pose_bones[name], rotation_quaternion=rotations[i]
+                    )
+                done += 1
+                yield done
+
+    # Constraints and drivers
+    # Constraints added for each plan, indexed by the driver records of the plan
+    plan_constraints: List[List[Optional[bpy.types.Constraint]]] = []
+    with instrument.phase("constraints"):
+        new_bones = set(journal.bones)
+        for rig_plan in rig_plans:
+            constraints: List[Optional[bpy.types.Constraint]] = []
+            plan_constraints.append(constraints)
+            for record in rig_plan.constraints:
+                if record.on_bone:
+                    owner = pose_bones[record.owner]
+                elif record.owner in created:
+                    owner = bpy.data.objects[record.owner]
+                else:
+                    constraints.append(None)
+                    done += 1
+                    yield done
+                    continue
+                constraint = owner.constraints.new(record.type)
+                if record.name is not None:
+                    instrument.assign(constraint, name=record.name)
+                if record.on_bone and record.owner not in new_bones:
+                    journal.constraints.append((record.owner, constraint.name))
+                if record.type == "LIMIT_LOCATION":
+                    instrument.assign(
+                        constraint,
+                        use_max_x=True,
+                        max_x=0,
+                        use_min_x=True,
+                        min_x=0,
+                        use_max_y=True,
+                        max_y=0,
+                        use_min_y=True,
+                        min_y=0,
+                        use_max_z=True,
+                        max_z=rig_plan.max_slider_value,
+                        use_min_z=True,
+                        min_z=0,
+                        use_transform_limit=True,
+                        owner_space="LOCAL_WITH_PARENT",
+                    )
+                elif record.type == "ARMATURE":
+                    setup_blend_constraint(constraint, armature, record.subtargets)
+                elif record.target_object is not None:
+                    instrument.assign(
+                        constraint, target=bpy.data.objects[record.target_object]
+                    )
+                else:
+                    instrument.assign(
+                        constraint, target=armature, subtarget=record.subtarget
+                    )
+                if record.head_tail != 0:
+                    instrument.assign(constraint, head_tail=record.head_tail)
+                constraints.append(constraint)
+                done += 1
+                yield done
+
+    with instrument.phase("drivers"):
+        for rig_plan, constraints in zip(rig_plans, plan_constraints):
+            for driver in rig_plan.drivers:
+                done += 1
+                if driver.constraint >= 0:
+                    constraint = constraints[driver.constraint]
+                    if constraint is None:
+                        yield done
+                        continue
+                    fcurve = constraint.driver_add(driver.data_path)
+                    journal.drivers.append(fcurve.data_path)
+                elif driver.owner in created:
+                    fcurve = bpy.data.objects[driver.owner].driver_add(driver.data_path)
+                else:
+                    yield done
+                    continue
+                add_slider_driver(
+                    fcurve,
+                    armature,
+                    rig_plan.slider_name,
+                    driver.expression,
+                    driver.use_max,
+                )
+                yield done
+
+    apply_unit_shapes(armature, set(bone_names))
+
+    # Select CTRL_YURERIG_ bones
+    for b in armature.data.bones:
+        b.select = False
+    for rig_plan in rig_plans:
+        for i, name in enumerate(rig_plan.bones.names):
+            if rig_plan.bones.kinds[i] == "CTRL":
+                armature.data.bones[name].select = True
+    armature.data.bones.active = armature.data.bones[rig_plans[0].active]
+    done += 1
+    yield done
+
+
+def apply_plan(
+    context: bpy.types.Context, armature: bpy.types.Object, rig_plan: RigPlan
+) -> None:
+    """
+    Run `apply_plan_steps` to the end.
+    """
+
+    for _ in apply_plan_steps(context, armature, [rig_plan], ApplyJournal()):
+        pass
+
+
+def rollback_plan(
+    context: bpy.types.Context, armature: bpy.types.Object, journal: ApplyJournal
+) -> None:
+    """
+    Undo the changes recorded in `journal` by a cancelled `apply_plan_steps`.
+    Unit shapes and the rigid body world are kept, as other rigs may use them.
+    Ends in POSE mode.
+    """
+
+    if context.mode != "OBJECT":
+        set_mode("OBJECT")
+    context.view_layer.objects.active = armature
+
+    drivers = (
+        armature.animation_data.drivers if armature.animation_data is not None else None
+    )
+    if drivers is not None:
+        for data_path in journal.drivers:
+            fcurve = drivers.find(data_path)
+            if fcurve is not None:
+                drivers.remove(fcurve)
+    for bone_name, constraint_name in journal.constraints:
+        pose_bone = armature.pose.bones.get(bone_name)
+        constraint = pose_bone and pose_bone.constraints.get(constraint_name)
+        if constraint is not None:
+            pose_bone.constraints.remove(constraint)
+    for bone_name, (group_name, hide_select) in journal.def_bones.items():
+        pose_bone = armature.pose.bones[bone_name]
+        pose_bone.bone_group = (
+            armature.pose.bone_groups.get(group_name)
+            if group_name is not None
+            else None
+        )
+        pose_bone.bone.hide_select = hide_select
+
+    objects = {
+        bpy.data.objects[name] for name in journal.objects if name in bpy.data.objects
+    }
+    meshes = unused_meshes(objects)
+    bpy.data.batch_remove(objects | meshes)
+
+    if len(journal.bones) > 0 or len(journal.unparented) > 0:
+        set_mode("EDIT")
+        edit_bones = armature.data.edit_bones
+        for bone_name in journal.unparented:
+            restore_def_parent(edit_bones, bone_name)
+        for bone_name in journal.bones:
+            edit_bone = edit_bones.get(bone_name)
+            if edit_bone is not None:
+                edit_bones.remove(edit_bone)
+        set_mode("OBJECT")
+
+    for old_name, new_name in reversed(journal.renames):
+        armature.data.bones[new_name].name = old_name
+    for group_name in journal.bone_groups:
+        group = armature.pose.bone_groups.get(group_name)
+        if group is not None:
+            armature.pose.bone_groups.remove(group)
+
+    set_mode("POSE")
+
+
+# Largest distance between a bone of the opposite side and its mirrored plan
+MIRROR_TOLERANCE = 1e-4
+
+
+def mirror_problems(
+    armature: bpy.types.Object, rig_plan: RigPlan, mirrored: RigPlan
+) -> List[str]:
+    """
+    Return why `mirrored` can not be applied to `armature`: the opposite
+    bones must exist and lie where the mirrored plan puts them.
+    """
+
+    problems = mirrored.validate()
+    bones = armature.data.bones
+    if mirrored.active not in bones:
+        problems.append(f"{mirrored.active}: no such bone")
+    same = set(rig_plan.def_names) & set(mirrored.def_names)
+    if len(same) > 0:
+        names = ", ".join(sorted(name[12:] for name in same))
+        problems.append(f"no left or right side in the names {names}")
+        return problems
+
+    old_names = {new: old for old, new in mirrored.renames}
+    current = [old_names.get(name, name) for name in mirrored.def_names]
+    missing = [name for name in current if name not in bones]
+    if len(missing) > 0:
+        problems.append("no such bones " + ", ".join(missing))
+        return problems
+
+    # Rows of the PHYS_YURERIG_ bones are in the order of `def_names`
+    rows = [i for i, kind in enumerate(mirrored.bones.kinds) if kind == "PHYS"]
+    table = mirrored.bones
+    for k, (name, i) in enumerate(zip(current, rows)):
+        bone = bones[name]
+        offsets = (
+            bone.head_local - Vector(table.heads[i]),
+            bone.tail_local - Vector(table.tails[i]),
+            bone.matrix_local.col[2].to_3d() - Vector(table.z_axes[i]).normalized(),
+        )
+        if any(offset.length > MIRROR_TOLERANCE for offset in offsets):
+            problems.append(f"{name} is not the mirror of {rig_plan.def_names[k]}")
+    return problems
+
+
+def setup_job(
+    operator: bpy.types.Operator, context: bpy.types.Context
+) -> Optional[jobs.Job]:
+    """
+    Plan the setup of the selected bones and return the job applying it, or
+    None after reporting why the selection can not be set up.
+    """
+
+    init_collection()
+
+    armature: bpy.types.Object = context.active_object
+    props = context.scene.yurerig
+    slider_index = next_slider_index(armature)
+    bones = read_selected_bones(
+        armature, context.selected_pose_bones, context.active_pose_bone
+    )
+    settings = SetupSettings.from_props(props)
+    if props.rigidbody_auto_fit:
+        settings.fitted_sizes = autofit.fit_selected_sizes(
+            armature, bones.names, props.rigidbody_fit_weight
+        )
+    rig_plan = plan(bones, settings, slider_index)
+    problems = rig_plan.validate()
+    if len(problems) > 0:
+        operator.report({"ERROR"}, "Can not setup Yure Rig: " + ", ".join(problems))
+        return None
+    plans = [rig_plan]
+    if props.mirror_setup:
+        mirrored = mirror_plan(rig_plan, next_slider_index(armature, slider_index + 1))
+        problems = mirror_problems(armature, rig_plan, mirrored)
+        if len(problems) > 0:
+            operator.report(
+                {"ERROR"}, "Can not mirror Yure Rig: " + ", ".join(problems)
+            )
+            return None
+        plans.append(mirrored)
+
+    def finish() -> Set[str]:
+        bpy.ops.orito_itsuki.yurerig_set_rigidbody_and_joint_start_position()
+        return {"FINISHED"}
+
+    # The job outlives the operator call, so it holds the global context
+    journal = ApplyJournal()
+
+    return jobs.Job(
+        "Setup Yure Rig",
+        apply_plan_steps(bpy.context, armature, plans, journal),
+        apply_plan_size(plans),
+        lambda: rollback_plan(bpy.context, armature, journal),
+        finish,
+    )
+
+
+def setup(operator: bpy.types.Operator, context: bpy.types.Context) -> Set[str]:
+    """
+    Implementation of `YURERIG_OT_SetupOperator`.
+    """
+
+    return jobs.run(setup_job(operator, context))
+
+
+class Removal:
+    """
+    Names of what `apply_removal` deletes from a rig.
+    """
+
+    __slots__ = ("def_bones", "bones", "drivers", "objects")
+
+    def __init__(self) -> None:
+        self.def_bones: List[str] = []
+        self.bones: List[str] = []
+        # (data path, array index) of the drivers on the DEF_YURERIG_ bones
+        self.drivers: List[Tuple[str, int]] = []
+        self.objects: List[str] = []
+
+
+driver_bone_pattern = re.compile(r'^pose\.bones\["([^"]+)"\]')
+
+
+def removal_collections() -> List[Tuple[bpy.types.Collection, Pattern[str]]]:
+    props = bpy.context.scene.yurerig
+    return [
+        (props.joints_collection, re.compile(r"^JOINT_YURERIG_.+")),
+        (props.rigidbodies_collection, re.compile(r"^RIGIDBODY_YURERIG_.+")),
+        (props.rigidbodies_reset_goal_collection, re.compile(r"^GOAL_YURERIG_.+")),
+        (props.controllers_collection, re.compile(r".+BoneShape_YURERIG$")),
+    ]
+
+
+def gather_removal(armature: bpy.types.Object) -> Removal:
+    """
+    Gather the bones, drivers and objects of the Yure Rig of `armature`.
+    """
+
+    is_def_bone_pattern = re.compile(r"^DEF_YURERIG_.+")
+    is_rig_bone_pattern = re.compile(r"^(?:CTRL|PHYS|DECO)_YURERIG_.+")
+
+    removal = Removal()
+    for b in armature.pose.bones:
+        if is_def_bone_pattern.match(b.name):
+            removal.def_bones.append(b.name)
+        elif is_rig_bone_pattern.match(b.name):
+            removal.bones.append(b.name)
+
+    def_names = set(removal.def_bones)
+    if armature.animation_data is not None:
+        for d in armature.animation_data.drivers:
+            match = driver_bone_pattern.match(d.data_path)
+            if match is not None and match.groups()[0] in def_names:
+                removal.drivers.append((d.data_path, d.array_index))
+
+    for collection, pattern in removal_collections():
+        for obj in collection.objects:
+            if pattern.match(obj.name):
+                removal.objects.append(obj.name)
+    return removal
+
+
+def apply_removal(armature: bpy.types.Object, removal: Removal) -> None:
+    """
+    Delete what `gather_removal` gathered into `removal`.
+    """
+
+    props = bpy.context.scene.yurerig
+
+    set_mode("EDIT")
+
+    armature.pose.bone_groups.remove(armature.pose.bone_groups["DEFORM_BONES"])
+    armature.pose.bone_groups.remove(armature.pose.bone_groups["CONTROLLER_BONES"])
+    armature.pose.bone_groups.remove(armature.pose.bone_groups["PHYSICS_BONES"])
+
+    with instrument.phase("drivers"):
+        if armature.animation_data is not None:
+            drivers = armature.animation_data.drivers
+            for data_path, array_index in removal.drivers:
+                fcurve = drivers.find(data_path, index=array_index)
+                if fcurve is not None:
+                    drivers.remove(fcurve)
+    with instrument.phase("constraints"):
+        for name in removal.def_bones:
+            b = armature.pose.bones[name]
+            instrument.assign(b, bone_group=None)
+            remove_def_constraints(armature, b)
+
+    with instrument.phase("edit_bones"):
+        edit_bones = armature.data.edit_bones
+        for name in removal.def_bones:
+            restore_def_parent(edit_bones, name)
+        for name in removal.bones:
+            edit_bone = edit_bones.get(name)
+            if edit_bone is not None:
+                edit_bones.remove(edit_bone)
+
+    with instrument.phase("batch_remove"):
+        objects = {
+            bpy.data.objects[name]
+            for name in removal.objects
+            if name in bpy.data.objects
+        }
+        # Remove the meshes together with their objects
+        meshes = unused_meshes(objects)
+        bpy.data.batch_remove(objects | meshes)
+
+    set_mode("POSE")
+
+    for name in removal.def_bones:
+        instrument.assign(armature.pose.bones[name].bone, hide_select=False)
+
+    if len(props.joints_collection.all_objects) == 0:
+        bpy.data.collections.remove(props.joints_collection)
+
+    if len(props.rigidbodies_collection.all_objects) == 0:
+        bpy.data.collections.remove(props.rigidbodies_collection)
+
+    if len(props.rigidbodies_reset_goal_collection.all_objects) == 0:
+        bpy.data.collections.remove(props.rigidbodies_reset_goal_collection)
+
+    if len(props.controllers_collection.all_objects) == 0:
+        bpy.data.collections.remove(props.controllers_collection)
+
+    if len(props.root_collection.all_objects) == 0:
+        bpy.data.collections.remove(props.root_collection)
+
+    props.selected_ctrl_bone1 = "NONE"
+    props.selected_ctrl_bone2 = "NONE"
+
+
+class RemovalJournal:
+    """
+    What `remove_steps` removed so far.
+    """
+
+    __slots__ = ("chains", "objects")
+
+    def __init__(self) -> None:
+        self.chains = 0
+        self.objects = 0
+
+
+def remove_steps(
+    armature: bpy.types.Object,
+    chain_list: List[Chain],
+    remove_all: bool,
+    journal: RemovalJournal,
+) -> Iterator[int]:
+    """
+    Remove the chains `chain_list` of `armature` one chain per step, yielding
+    the number of bones removed so far, and record them into `journal`.
+    With `remove_all`, a last step removes what is left of the rig: objects
+    no chain owns, bone groups and the empty collections.
+    """
+
+    done = 0
+    for chain in chain_list:
+        journal.objects += remove_chains(armature, [chain])
+        journal.chains += 1
+        done += len(chain.names)
+        yield done
+    if remove_all:
+        removal = gather_removal(armature)
+        journal.objects += len(removal.objects)
+        apply_removal(armature, removal)
+        yield done + 1
+
+
+def selected_chains(
+    operator: bpy.types.Operator, context: bpy.types.Context
+) -> List[Chain]:
+    """
+    Chains picked by the `SELECTED` or `INDEX` mode of
+    `YURERIG_OT_RemoveOperator`.
+    """
+
+    armature: bpy.types.Object = context.active_object
+    if operator.mode == "INDEX":
+        indices = {operator.slider_index}
+    else:
+        indices = set()
+        for pose_bone in context.selected_pose_bones or []:
+            match = slider_bone_pattern.match(pose_bone.name)
+            if match is not None:
+                indices.add(int(match.groups()[0]))
+            elif pose_bone.name.startswith("CTRL_YURERIG_"):
+                index = bone_slider_index(armature, pose_bone.name[13:])
+                if index is not None:
+                    indices.add(index)
+    return [
+        chain
+        for chain in (find_chain(armature, index) for index in sorted(indices))
+        if chain is not None
+    ]
+
+
+def remove_job(
+    operator: bpy.types.Operator, context: bpy.types.Context
+) -> Optional[jobs.Job]:
+    """
+    Return the job removing the Yure Rig of the active armature, or the
+    chains picked by the operator mode.
+
+    Each step removes one whole chain, which cannot be put back, so a
+    cancelled removal keeps the chains removed so far and leaves the others
+    untouched and working; the rollback reports what was removed.
+    """
+
+    init_collection()
+
+    armature: bpy.types.Object = context.active_object
+    remove_all = operator.mode == "ALL"
+    if remove_all:
+        chain_list = get_chains(armature)
+    else:
+        chain_list = selected_chains(operator, context)
+        if len(chain_list) == 0:
+            operator.report({"ERROR"}, "No Yure Rig chain to remove")
+            return None
+
+    journal = RemovalJournal()
+
+    def rollback() -> None:
+        operator.report(
+            {"WARNING"},
+            f"Removed {journal.chains} of {len(chain_list)} chains "
+            + f"and {journal.objects} objects before cancelling",
+        )
+
+    def finish() -> Set[str]:
+        if not remove_all:
+            operator.report(
+                {"INFO"},
+                f"Success Remove Chains: {journal.chains} chains, "
+                + f"{journal.objects} objects",
+            )
+        return {"FINISHED"}
+
+    return jobs.Job(
+        "Remove Yure Rig" if remove_all else "Remove Yure Rig Chains",
+        remove_steps(armature, chain_list, remove_all, journal),
+        sum(len(chain.names) for chain in chain_list) + int(remove_all),
+        rollback,
+        finish,
+    )
+
+
+def remove(operator: bpy.types.Operator, context: bpy.types.Context) -> Set[str]:
+    """
+    Implementation of `YURERIG_OT_RemoveOperator`.
+    """
+
+    return jobs.run(remove_job(operator, context))
+
+
+def remove_chains(armature: bpy.types.Object, chain_list: List[Chain]) -> int:
+    """
+    Remove the bones, rigid bodies, goals, joints, drivers and shapes of the
+    chains `chain_list` from `armature` and leave the other chains untouched.
+    Extra joints touching the chains are removed too, and so is a shared root
+    rigid body when no other chain is joined to it.
+    Return the number of removed objects.
+    """
+
+    props = bpy.context.scene.yurerig
+    names = [name for chain in chain_list for name in chain.names]
+    name_set = set(names)
+
+    # Turn the DEF_YURERIG_ bones back to plain deform bones
+    with instrument.phase("constraints"):
+        for name in names:
+            def_pose_bone = armature.pose.bones.get(f"DEF_YURERIG_{name}")
+            if def_pose_bone is None:
+                continue
+            remove_def_constraints(armature, def_pose_bone)
+            instrument.assign(def_pose_bone, bone_group=None)
+            instrument.assign(def_pose_bone.bone, hide_select=False)
+
+    # Rigid bodies, goals and every joint touching them, found by name and
+    # from the joints stored on the bodies
+    bodies = {obj for chain in chain_list for obj in chain.rigidbodies()}
+    roots = {obj for chain in chain_list for obj in chain.roots()}
+    objects: Set[bpy.types.Object] = set(bodies)
+    objects.update(obj for chain in chain_list for obj in chain.goals())
+    for body in bodies:
+        objects.update(body_joints(body))
+    for root in roots:
+        if root.name.endswith("_Root") and not root.name.endswith("_Shared_Root"):
+            objects.add(root)
+        elif all(joint in objects for joint in body_joints(root)):
+            objects.add(root)
+
+    # Per bone shapes left by older versions
+    shape_names = [
+        f"CTRL_YURERIG_{name}_ControllerBoneShape_YURERIG" for name in names
+    ] + [f"RIGIDBODY_YURERIG_{name}_BoneShape_YURERIG" for name in names]
+    for chain in chain_list:
+        shape_names.append(chain.slider_name)
+        shape_names.append(slider_root_bone_name(chain.index))
+    for shape_name in shape_names:
+        obj = bpy.data.objects.get(shape_name)
+        if obj is not None:
+            objects.add(obj)
+
+    with instrument.phase("batch_remove"):
+        meshes = unused_meshes(objects)
+        removed_num = len(objects)
+        bpy.data.batch_remove(objects | meshes)
+
+    # Animation of the sliders
+    action = (
+        armature.animation_data.action if armature.animation_data is not None else None
+    )
+    if action is not None:
+        for chain in chain_list:
+            group = action.groups.get(chain.slider_name)
+            if group is not None:
+                for fcurve in list(group.channels):
+                    action.fcurves.remove(fcurve)
+                action.groups.remove(group)
+            fcurve = action.fcurves.find(
+                f'pose.bones["{chain.slider_name}"]["{LOD_PROPERTY}"]'
+            )
+            if fcurve is not None:
+                action.fcurves.remove(fcurve)
+
+    if props.selected_ctrl_bone1[13:] in name_set:
+        props.selected_ctrl_bone1 = "NONE"
+    if props.selected_ctrl_bone2[13:] in name_set:
+        props.selected_ctrl_bone2 = "NONE"
+
+    set_mode("EDIT")
+    with instrument.phase("edit_bones"):
+        edit_bones = armature.data.edit_bones
+        for name in names:
+            restore_def_parent(edit_bones, f"DEF_YURERIG_{name}")
+        bone_names = [f"CTRL_YURERIG_{name}" for name in names] + [
+            f"PHYS_YURERIG_{name}" for name in names
+        ]
+        for chain in chain_list:
+            bone_names.append(chain.slider_name)
+            bone_names.append(slider_root_bone_name(chain.index))
+        for bone_name in bone_names:
+            edit_bone = edit_bones.get(bone_name)
+            if edit_bone is not None:
+                edit_bones.remove(edit_bone)
+    set_mode("POSE")
+
+    return removed_num
+
+
+def make_extra_joint_object(
+    armature: bpy.types.Object, name1: str, name2: str
+) -> bpy.types.Object:
+    """
+    Make a joint between the rigid bodies of two bones which are not parent and
+    child, placed between the tails of their PHYS_YURERIG_ bones.
+    `name1` and `name2` are the bone names without prefix.
+    """
+
+    bone1_pos = armature.pose.bones[f"PHYS_YURERIG_{name1}"].tail
+    bone2_pos = armature.pose.bones[f"PHYS_YURERIG_{name2}"].tail
+
+    joint_obj = bpy.data.objects.new(f"JOINT_YURERIG_{name1}_{name2}", None)
+    joint_obj.location = (bone1_pos + bone2_pos) / 2
+    bpy.context.scene.rigidbody_world.constraints.objects.link(joint_obj)
+    joint_obj.rigid_body_constraint.type = "GENERIC_SPRING"
+    joint_obj.rigid_body_constraint.object1 = bpy.data.objects[
+        f"RIGIDBODY_YURERIG_{name1}"
+    ]
+    joint_obj.rigid_body_constraint.object2 = bpy.data.objects[
+        f"RIGIDBODY_YURERIG_{name2}"
+    ]
+    set_joint_properties(joint_obj.rigid_body_constraint)
+    register_joint(joint_obj)
+    bpy.context.scene.yurerig.joints_collection.objects.link(joint_obj)
+    return joint_obj
+
+
+def add_extra_joint(
+    operator: bpy.types.Operator, context: bpy.types.Context
+) -> Set[str]:
+    """
+    Implementation of `YURERIG_OT_AddExtraJointOperator`.
+    """
+
+    init_collection()
+
+    props = context.scene.yurerig
+    armature: bpy.types.Object = context.active_object
+
+    phys_bone1_name = f"PHYS_YURERIG_{props.selected_ctrl_bone1[13:]}"
+    phys_bone2_name = f"PHYS_YURERIG_{props.selected_ctrl_bone2[13:]}"
+    make_extra_joint_object(armature, phys_bone1_name[13:], phys_bone2_name[13:])
+
+    props.selected_ctrl_bone1 = "NONE"
+    props.selected_ctrl_bone2 = "NONE"
+
+    operator.report(
+        {"INFO"},
+        "Success Add Extra Joint between "
+        + f"PHYS_YURERIG_{phys_bone1_name} and PHYS_YURERIG_{phys_bone2_name}",
+    )
+
+    return {"FINISHED"}
+
+
+class ParameterSnapshot:
+    """
+    Parameters of the rigid bodies, joints and sliders before
+    `update_parameters_steps` changed them, so that a cancelled update can be
+    rolled back by `restore_parameters`.
+    """
+
+    __slots__ = ("masses", "vertices", "joints", "sliders")
+
+    def __init__(self) -> None:
+        self.masses: Dict[str, float] = {}
+        # Flat vertex coordinates of the rigid body meshes
+        self.vertices: Dict[str, List[float]] = {}
+        self.joints: Dict[str, List[object]] = {}
+        # Max Slider Value of the slider bones
+        self.sliders: Dict[str, float] = {}
+
+    def save_body(self, obj: bpy.types.Object) -> None:
+        if obj.name in self.vertices:
+            return
+        self.masses[obj.name] = obj.rigid_body.mass
+        vertices = obj.data.vertices
+        co = [0.0] * (len(vertices) * 3)
+        vertices.foreach_get("co", co)
+        self.vertices[obj.name] = co
+
+    def save_joint(self, obj: bpy.types.Object) -> None:
+        if obj.name in self.joints:
+            return
+        joint = obj.rigid_body_constraint
+        self.joints[obj.name] = [getattr(joint, attr) for attr, _ in JOINT_PROPERTIES]
+
+
+def set_box_size(obj: bpy.types.Object, size: Tuple[float, float, float]) -> None:
+    with instrument.phase("meshes"):
+        # A mesh shared with the mirrored side is copied before it is resized
+        if obj.data.users > 1:
+            instrument.assign(obj, data=obj.data.copy())
+            instrument.assign(obj.data, name=obj.name)
+        obj.data.vertices.foreach_set("co", (BOX_CORNERS * size).ravel().tolist())
+        instrument.writes()
+        obj.data.update()
+
+
+def joint_bones(
+    armature: bpy.types.Object, joint: bpy.types.Object
+) -> Tuple[Optional[bpy.types.PoseBone], Optional[bpy.types.PoseBone]]:
+    """
+    PHYS_YURERIG_ bones of the two rigid bodies joined by `joint`, None for a
+    root body. Bone names may contain "_", so the joint name is not parsed.
+    """
+
+    constraint = joint.rigid_body_constraint
+    if constraint is None:
+        return None, None
+    bones: List[Optional[bpy.types.PoseBone]] = []
+    for obj in (constraint.object1, constraint.object2):
+        if obj is None or not obj.name.startswith("RIGIDBODY_YURERIG_"):
+            bones.append(None)
+        else:
+            bones.append(armature.pose.bones.get(f"PHYS_YURERIG_{obj.name[18:]}"))
+    return bones[0], bones[1]
+
+
+def joints_by_bone(armature: bpy.types.Object) -> Dict[str, List[bpy.types.Object]]:
+    """
+    Joints of the joints collection keyed by the names, without prefix, of the
+    bones they join.
+    """
+
+    joints: Dict[str, List[bpy.types.Object]] = {}
+    for obj in bpy.context.scene.yurerig.joints_collection.objects:
+        if not obj.name.startswith("JOINT_YURERIG_"):
+            continue
+        for bone in joint_bones(armature, obj):
+            if bone is not None:
+                joints.setdefault(bone.name[13:], []).append(obj)
+    return joints
+
+
+def update_parameters_steps(
+    armature: bpy.types.Object,
+    bone_names: List[str],
+    snapshot: ParameterSnapshot,
+    counts: Dict[str, int],
+) -> Iterator[int]:
+    """
+    Update the rigid bodies and joints of the CTRL_YURERIG_ bones and the
+    sliders in `bone_names` to the scene parameters, yielding the number of
+    bones done after each of them. The old values are saved into `snapshot`
+    and the numbers of updated rigid bodies and joints are added to `counts`.
+    """
+
+    props = bpy.context.scene.yurerig
+    x_size = props.rigidbody_size_x
+    z_size = props.rigidbody_size_z
+    size = props.rigidbody_root_size
+    gap = props.rigidbody_gap
+    mass = props.rigidbody_mass
+    max_slider_value = props.controller_slider_size * 2 / 6
+    fitted_sizes: Dict[str, Tuple[float, float]] = {}
+    if props.rigidbody_auto_fit:
+        fitted_sizes = autofit.fit_chain_sizes(
+            armature,
+            [
+                name[13:]
+                for name in bone_names
+                if slider_bone_pattern.match(name) is None
+            ],
+            props.rigidbody_fit_weight,
+        )
+
+    joints = joints_by_bone(armature)
+    updated_root_names: Set[str] = set()
+    updated_joint_names: Set[str] = set()
+
+    for done, bone_name in enumerate(bone_names, 1):
+        pose_bone = armature.pose.bones[bone_name]
+        if slider_bone_pattern.match(bone_name):
+            snapshot.sliders[bone_name] = pose_bone.get(
+                "Max Slider Value", max_slider_value
+            )
+            instrument.assign_items(pose_bone, {"Max Slider Value": max_slider_value})
+            instrument.assign(pose_bone.constraints[0], max_z=max_slider_value)
+            yield done
+            continue
+
+        name = bone_name[13:]
+        length = (pose_bone.bone.head - pose_bone.bone.tail).length
+        body_x_size, body_z_size = fitted_sizes.get(name, (x_size, z_size))
+
+        rigidbody_obj = bpy.data.objects.get(f"RIGIDBODY_YURERIG_{name}")
+        if rigidbody_obj is not None:
+            snapshot.save_body(rigidbody_obj)
+            instrument.assign(rigidbody_obj.rigid_body, mass=mass)
+            set_box_size(rigidbody_obj, (body_x_size, length - gap, body_z_size))
+            counts["rigidbodies"] += 1
+
+        rigidbody_root_obj = get_root_object(name)
+        if (
+            rigidbody_root_obj is not None
+            and rigidbody_root_obj.name not in updated_root_names
+        ):
+            updated_root_names.add(rigidbody_root_obj.name)
+            snapshot.save_body(rigidbody_root_obj)
+            set_box_size(rigidbody_root_obj, (size, size, size))
+            counts["rigidbodies"] += 1
+
+        rigidbody_goal_obj = bpy.data.objects.get(f"GOAL_YURERIG_{name}")
+        if rigidbody_goal_obj is not None:
+            snapshot.save_body(rigidbody_goal_obj)
+            set_box_size(rigidbody_goal_obj, (body_x_size, length - gap, body_z_size))
+
+        for obj in joints.get(name, []):
+            if obj.name in updated_joint_names:
+                continue
+            updated_joint_names.add(obj.name)
+            snapshot.save_joint(obj)
+            with instrument.phase("joint_settings"):
+                set_joint_properties(obj.rigid_body_constraint)
+            counts["joints"] += 1
+
+        yield done
+
+
+def restore_parameters(armature: bpy.types.Object, snapshot: ParameterSnapshot) -> None:
+    """
+    Put back the parameters saved in `snapshot`.
+    """
+
+    for name, co in snapshot.vertices.items():
+        obj = bpy.data.objects[name]
+        obj.data.vertices.foreach_set("co", co)
+        obj.data.update()
+        obj.rigid_body.mass = snapshot.masses[name]
+    for name, values in snapshot.joints.items():
+        joint = bpy.data.objects[name].rigid_body_constraint
+        for (attr, _), value in zip(JOINT_PROPERTIES, values):
+            setattr(joint, attr, value)
+    for name, value in snapshot.sliders.items():
+        pose_bone = armature.pose.bones[name]
+        pose_bone["Max Slider Value"] = value
+        pose_bone.constraints[0].max_z = value
+
+
+def update_parameters_job(
+    operator: bpy.types.Operator, context: bpy.types.Context
+) -> Optional[jobs.Job]:
+    """
+    Return the job updating the parameters of the selected CTRL_YURERIG_
+    bones and sliders.
+    """
+
+    init_collection()
+
+    armature: bpy.types.Object = context.active_object
+    bone_names = [
+        b.name
+        for b in context.selected_pose_bones
+        if b.name.startswith("CTRL_YURERIG_")
+    ]
+    shaped_bone_names: Set[str] = set()
+    for name in bone_names:
+        match = slider_bone_pattern.match(name)
+        if match is None:
+            shaped_bone_names.add(name)
+            shaped_bone_names.add(f"PHYS_YURERIG_{name[13:]}")
+        else:
+            shaped_bone_names.add(name)
+            shaped_bone_names.add(slider_root_bone_name(int(match.groups()[0])))
+
+    snapshot = ParameterSnapshot()
+    counts = {"rigidbodies": 0, "joints": 0}
+
+    def finish() -> Set[str]:
+        apply_unit_shapes(armature, shaped_bone_names)
+        operator.report(
+            {"INFO"},
+            "Success Update Parameters: "
+            + f"update {counts['joints']} joints "
+            + f"and {counts['rigidbodies']} rigidbodies",
+        )
+        return {"FINISHED"}
+
+    return jobs.Job(
+        "Update Yure Rig Parameters",
+        update_parameters_steps(armature, bone_names, snapshot, counts),
+        len(bone_names),
+        lambda: restore_parameters(armature, snapshot),
+        finish,
+    )
+
+
+def update_parameters(
+    operator: bpy.types.Operator, context: bpy.types.Context
+) -> Set[str]:
+    """
+    Implementation of `YURERIG_OT_UpdateParametersOperator`.
+    """
+
+    return jobs.run(update_parameters_job(operator, context))
+
+
+def update_shapes(operator: bpy.types.Operator, context: bpy.types.Context) -> Set[str]:
+    """
+    Implementation of `YURERIG_OT_UpdateShapesOperator`.
+    """
+
+    init_collection()
+
+    count = apply_unit_shapes(context.active_object)
+    operator.report({"INFO"}, f"Success Update Shapes: {count} bones")
+    return {"FINISHED"}
+
+
+def set_start_position(
+    operator: bpy.types.Operator, context: bpy.types.Context
+) -> Set[str]:
+    """
+    Implementation of `YURERIG_OT_SetRigidBodyAndJointStartPositionOperator`.
+    """
+
+    init_collection()
+
+    props = context.scene.yurerig
+    armature: bpy.types.Object = context.active_object
+
+    set_mode("EDIT")
+
+    rigidbody_pattern = re.compile(r"^RIGIDBODY_YURERIG_([\w\.\-]+)")
+    rigidbody_root_pattern = re.compile(r"^RIGIDBODY_YURERIG_([\w\.\-]+)_Root")
+
+    with instrument.phase("rigid_bodies"):
+        for obj in props.rigidbodies_collection.objects:
+            match = rigidbody_root_pattern.match(obj.name)
+            if match is not None:
+                continue
+            match = rigidbody_pattern.match(obj.name)
+            if match is not None:
+                ctrl_bone_name = f"CTRL_YURERIG_{match.groups()[0]}"
+                ctrl_edit_bone = armature.data.edit_bones[ctrl_bone_name]
+                ctrl_pose_bone = armature.pose.bones[ctrl_bone_name]
+                phys_bone_name = f"PHYS_YURERIG_{match.groups()[0]}"
+                phys_edit_bone = armature.data.edit_bones[phys_bone_name]
+                phys_pose_bone = armature.pose.bones[phys_bone_name]
+                instrument.assign(
+                    phys_edit_bone,
+                    head=ctrl_edit_bone.head,
+                    tail=ctrl_edit_bone.tail,
+                    roll=ctrl_edit_bone.roll,
+                )
+                armature.update_from_editmode()
+                instrument.assign(
+                    phys_pose_bone,
+                    rotation_quaternion=ctrl_pose_bone.rotation_quaternion,
+                )
+
+                rigidbody_obj_name = f"RIGIDBODY_YURERIG_{match.groups()[0]}"
+                rigidbody_obj = bpy.data.objects[rigidbody_obj_name]
+                dir_x = ctrl_pose_bone.x_axis
+                dir_y = ctrl_pose_bone.y_axis
+                dir_z = ctrl_pose_bone.z_axis
+                mat = Matrix.Identity(4)
+                mat.col[0] = dir_x.to_4d()
+                mat.col[1] = dir_y.to_4d()
+                mat.col[2] = dir_z.to_4d()
+                instrument.assign(
+                    rigidbody_obj,
+                    matrix_world=mat,
+                    location=(ctrl_pose_bone.tail + ctrl_pose_bone.head) / 2,
+                )
+
+                rigidbody_goal_obj_name = f"GOAL_YURERIG_{match.groups()[0]}"
+                rigidbody_goal_obj = bpy.data.objects.get(rigidbody_goal_obj_name)
+                # Goals of the lean topology follow the bone as its children
+                if rigidbody_goal_obj is None or rigidbody_goal_obj.parent is not None:
+                    continue
+                dir_x = ctrl_pose_bone.x_axis
+                dir_y = ctrl_pose_bone.y_axis
+                dir_z = ctrl_pose_bone.z_axis
+                mat = Matrix.Identity(4)
+                mat.col[0] = dir_x.to_4d()
+                mat.col[1] = dir_y.to_4d()
+                mat.col[2] = dir_z.to_4d()
+                instrument.assign(
+                    rigidbody_goal_obj,
+                    matrix_world=mat,
+                    location=(ctrl_pose_bone.tail + ctrl_pose_bone.head) / 2,
+                )
+
+    armature.update_from_editmode()
+
+    set_mode("POSE")
+
+    with instrument.phase("joints"):
+        for j in props.joints_collection.objects:
+            if not j.name.startswith("JOINT_YURERIG_"):
+                continue
+            bone1, bone2 = joint_bones(armature, j)
+            if bone2 is None:
+                continue
+            if bone1 is None:
+                location = bone2.head
+            elif bone1.parent == bone2:
+                location = (bone1.head + bone2.tail) / 2
+            elif bone2.parent == bone1:
+                location = (bone1.tail + bone2.head) / 2
+            else:
+                location = (bone1.tail + bone2.tail) / 2
+            instrument.assign(j, location=location)
+
+    return {"FINISHED"}
+
+
+def update_bone_color(
+    operator: bpy.types.Operator, context: bpy.types.Context
+) -> Set[str]:
+    """
+    Implementation of `YURERIG_OT_UpdateBoneColorOperator`.
+    """
+
+    init_collection()
+
+    props = context.scene.yurerig
+    armature: bpy.types.Object = context.active_object
+
+    for group_name, color in (
+        ("DEFORM_BONES", props.deform_bone_color),
+        ("CONTROLLER_BONES", props.controller_bone_color),
+        ("PHYSICS_BONES", props.physics_bone_color),
+    ):
+        instrument.assign(
+            armature.pose.bone_groups[group_name].colors,
+            normal=color,
+            select=color,
+            active=color,
+        )
+
+    return {"FINISHED"}
@@ -0,0 +1,256 @@
+import re
+from typing import Dict, Iterator, List, Optional, Sequence
+
+import bpy
+
+slider_bone_pattern = re.compile(
+    r"^CTRL_YURERIG_physics_influence_slider_(\d+)_BoneShape_YURERIG$"
+)
+slider_root_bone_pattern = re.compile(
+    r"^DECO_YURERIG_physics_influence_slider_root_(\d+)_BoneShape_YURERIG$"
+)
+def_bone_data_path_pattern = re.compile(r'^pose\.bones\["DEF_YURERIG_(.+?)"\]')
+
+KINEMATIC_RESET_CONSTRAINT_NAME = "YureRig Kinematic Reset"
+# ARMATURE constraint of the DEF_YURERIG_ bones in the lean topology, and the
+# custom properties keeping the parents these bones are detached from
+DEF_BLEND_CONSTRAINT_NAME = "YureRig Blend"
+DEF_PARENT_PROPERTY = "YureRig Parent"
+DEF_CONNECT_PROPERTY = "YureRig Connect"
+# Driven properties which pin rigid bodies to the FK pose while the physics
+# influence slider is at FK
+RESET_DRIVER_DATA_PATHS = (
+    "rigid_body_constraint.enabled",
+    "rigid_body.kinematic",
+    f'constraints["{KINEMATIC_RESET_CONSTRAINT_NAME}"].influence',
+)
+# Custom properties letting a single chain be found by name: the bone names of
+# a chain, without prefix, on its slider bone, and the names of the joints
+# connecting a rigid body on the body
+CHAIN_BONES_PROPERTY = "YureRig Chain Bones"
+JOINTS_PROPERTY = "YureRig Joints"
+
+
+def slider_bone_name(index: int) -> str:
+    return f"CTRL_YURERIG_physics_influence_slider_{index}_BoneShape_YURERIG"
+
+
+def slider_root_bone_name(index: int) -> str:
+    return f"DECO_YURERIG_physics_influence_slider_root_{index}_BoneShape_YURERIG"
+
+
+def get_root_object(name: str) -> Optional[bpy.types.Object]:
+    """
+    Get the root rigid body of the chain starting at the bone `name`, which is
+    either its own or shared with the other chains of the same parent bone.
+    """
+
+    root_obj = bpy.data.objects.get(f"RIGIDBODY_YURERIG_{name}_Root")
+    if root_obj is not None:
+        return root_obj
+    joint_obj = bpy.data.objects.get(f"JOINT_YURERIG_{name}")
+    if joint_obj is not None and joint_obj.rigid_body_constraint is not None:
+        return joint_obj.rigid_body_constraint.object1
+    return None
+
+
+class Chain:
+    """
+    Bones set up together by one "Setup Yure Rig" run and controlled by one
+    physics influence slider.
+    `names` are the bone names without `DEF_YURERIG_` prefix, parents first.
+    """
+
+    __slots__ = ("index", "names")
+
+    def __init__(self, index: int, names: List[str]):
+        self.index = index
+        self.names = names
+
+    @property
+    def slider_name(self) -> str:
+        return slider_bone_name(self.index)
+
+    def def_bone_names(self) -> Iterator[str]:
+        return (f"DEF_YURERIG_{name}" for name in self.names)
+
+    def ctrl_bone_names(self) -> Iterator[str]:
+        return (f"CTRL_YURERIG_{name}" for name in self.names)
+
+    def phys_bone_names(self) -> Iterator[str]:
+        return (f"PHYS_YURERIG_{name}" for name in self.names)
+
+    def rigidbodies(self) -> Iterator[bpy.types.Object]:
+        for name in self.names:
+            obj = bpy.data.objects.get(f"RIGIDBODY_YURERIG_{name}")
+            if obj is not None:
+                yield obj
+
+    def roots(self) -> Iterator[bpy.types.Object]:
+        """
+        Root rigid bodies of the chain, which may be shared with other chains.
+        """
+
+        for name in self.names:
+            obj = get_root_object(name)
+            if obj is not None:
+                yield obj
+
+    def goals(self) -> Iterator[bpy.types.Object]:
+        for name in self.names:
+            obj = bpy.data.objects.get(f"GOAL_YURERIG_{name}")
+            if obj is not None:
+                yield obj
+
+
+def rigged_armatures(scene: bpy.types.Scene) -> List[bpy.types.Object]:
+    """
+    Armatures of `scene` with YureRig chains.
+    """
+
+    return [
+        obj
+        for obj in scene.objects
+        if obj.type == "ARMATURE"
+        and any(slider_bone_pattern.match(b.name) for b in obj.data.bones)
+    ]
+
+
+def get_chains(armature: bpy.types.Object) -> List[Chain]:
+    """
+    Find the chains of `armature` from the physics influence drivers of its
+    DEF_YURERIG_ bones.
+    """
+
+    slider_indices: Dict[str, int] = {}
+    for bone in armature.data.bones:
+        match = slider_bone_pattern.match(bone.name)
+        if match is not None:
+            slider_indices[bone.name] = int(match.groups()[0])
+
+    names_by_index: Dict[int, List[str]] = {i: [] for i in slider_indices.values()}
+    if armature.animation_data is not None:
+        for driver in armature.animation_data.drivers:
+            match = def_bone_data_path_pattern.match(driver.data_path)
+            if match is None:
+                continue
+            for var in driver.driver.variables:
+                index = slider_indices.get(var.targets[0].bone_target)
+                if index is not None:
+                    names_by_index[index].append(match.groups()[0])
+                    break
+
+    bone_order = {b.name: i for i, b in enumerate(armature.data.bones)}
+    return [
+        Chain(
+            index,
+            sorted(
+                set(names),
+                key=lambda n: bone_order.get(f"DEF_YURERIG_{n}", len(bone_order)),
+            ),
+        )
+        for index, names in sorted(names_by_index.items())
+    ]
+
+
+def get_chain(armature: bpy.types.Object, index: int) -> Optional[Chain]:
+    for chain in get_chains(armature):
+        if chain.index == index:
+            return chain
+    return None
+
+
+def set_chain_bones(
+    armature: bpy.types.Object, index: int, names: Sequence[str]
+) -> None:
+    armature.pose.bones[slider_bone_name(index)][CHAIN_BONES_PROPERTY] = {
+        name: i for i, name in enumerate(names)
+    }
+
+
+def find_chain(armature: bpy.types.Object, index: int) -> Optional[Chain]:
+    """
+    Get the chain of the slider `index` from the bone names stored on the
+    slider, or from the drivers for rigs set up before the names were stored.
+    """
+
+    slider = armature.pose.bones.get(slider_bone_name(index))
+    if slider is None:
+        return None
+    if CHAIN_BONES_PROPERTY not in slider:
+        return get_chain(armature, index)
+    order = slider[CHAIN_BONES_PROPERTY].to_dict()
+    return Chain(index, sorted(order, key=order.__getitem__))
+
+
+def bone_slider_index(armature: bpy.types.Object, name: str) -> Optional[int]:
+    """
+    Get the slider index of the chain of the bone `name`, without prefix, from
+    the drivers of the constraints of its DEF_YURERIG_ bone.
+    """
+
+    pose_bone = armature.pose.bones.get(f"DEF_YURERIG_{name}")
+    if pose_bone is None or armature.animation_data is None:
+        return None
+    drivers = armature.animation_data.drivers
+    for constraint in pose_bone.constraints:
+        path = constraint.path_from_id()
+        for data_path in (f"{path}.influence", f"{path}.targets[0].weight"):
+            fcurve = drivers.find(data_path)
+            if fcurve is None:
+                continue
+            for var in fcurve.driver.variables:
+                match = slider_bone_pattern.match(var.targets[0].bone_target)
+                if match is not None:
+                    return int(match.groups()[0])
+    return None
+
+
+def scan_joints(obj: bpy.types.Object) -> List[bpy.types.Object]:
+    """
+    Joints of the rigid body world connecting `obj`, found by visiting every
+    joint of the world.
+    """
+
+    world = bpy.context.scene.rigidbody_world
+    if world is None or world.constraints is None:
+        return []
+    return [
+        joint
+        for joint in world.constraints.objects
+        if joint.rigid_body_constraint is not None
+        and obj
+        in (joint.rigid_body_constraint.object1, joint.rigid_body_constraint.object2)
+    ]
+
+
+def register_joint(joint_obj: bpy.types.Object) -> None:
+    """
+    Store the name of `joint_obj` on the rigid bodies it connects. Bodies
+    without stored joints, made before joints were stored, get their other
+    joints stored first.
+    """
+
+    constraint = joint_obj.rigid_body_constraint
+    for obj in (constraint.object1, constraint.object2):
+        if obj is None:
+            continue
+        if JOINTS_PROPERTY not in obj:
+            obj[JOINTS_PROPERTY] = {joint.name: 1 for joint in scan_joints(obj)}
+        obj[JOINTS_PROPERTY][joint_obj.name] = 1
+
+
+def body_joints(obj: bpy.types.Object) -> List[bpy.types.Object]:
+    """
+    Joints connecting the rigid body `obj`, from the joint names stored on it.
+    """
+
+    if JOINTS_PROPERTY not in obj:
+        return scan_joints(obj)
+    joints: List[bpy.types.Object] = []
+    for name in obj[JOINTS_PROPERTY].keys():
+        joint = bpy.data.objects.get(name)
+        constraint = joint.rigid_body_constraint if joint is not None else None
+        if constraint is not None and obj in (constraint.object1, constraint.object2):
+            joints.append(joint)
+    return joints
@@ -0,0 +1,207 @@
+from typing import List, Set, Tuple
+
+import bmesh
+import bpy
+from mathutils import Matrix, Vector
+
+from . import autofit, builder, collision_layers
+
+# Primitive colliders for the body of the character. A kinematic passive
+# capsule or box is generated per selected deform bone, sized from the
+# vertices weighted to the bone like "Fit To Skin Weights", and parented to
+# the bone so it follows the animation without constraints. Bullet collides
+# primitives much faster than the character mesh used as a mesh collider.
+#
+# Colliders go into the collider collection of the active collision group, so
+# "Collision Layers" lets them collide with the chains of the groups that
+# interact with it, or on collection 0 with the chains without group.
+
+COLLIDER_PREFIX = "COLLIDER_YURERIG_"
+DEFAULT_COLLECTION_NAME = "YureRig Colliders"
+# Capsule mesh resolution, with an odd number of rings so that no ring lies
+# on the equator, which is split into the two caps
+CAPSULE_SEGMENTS = 12
+CAPSULE_RINGS = 9
+
+
+def collider_size(shape: str, size: Tuple[float, float], length: float) -> Vector:
+    """
+    Dimensions of the collider of a bone of `length` with the fitted
+    (size X, size Z), with the local Z axis along the bone. Capsules are
+    rounded over the bone head and tail.
+    """
+
+    if shape == "CAPSULE":
+        radius = max(size) / 2
+        return Vector((radius * 2, radius * 2, length + radius * 2))
+    return Vector((size[0], size[1], length))
+
+
+def build_mesh(mesh: bpy.types.Mesh, shape: str, dimensions: Vector) -> None:
+    bm = bmesh.new()
+    if shape == "CAPSULE":
+        radius = dimensions.x / 2
+        half_length = dimensions.z / 2 - radius
+        bmesh.ops.create_uvsphere(
+            bm, u_segments=CAPSULE_SEGMENTS, v_segments=CAPSULE_RINGS, radius=radius
+        )
+        for vert in bm.verts:
+            vert.co.z += half_length if vert.co.z > 0 else -half_length
+    else:
+        bmesh.ops.create_cube(bm, size=1)
+        for vert in bm.verts:
+            vert.co *= dimensions
+    bm.to_mesh(mesh)
+    bm.free()
+    mesh.update()
+
+
+def collider_matrix(bone: bpy.types.Bone) -> Matrix:
+    """
+    Rest matrix of the collider of `bone` in armature space, at the middle of
+    the bone with the local Z axis along the bone.
+    """
+
+    # The X axis of the bone, the Z axis of the bone flipped and the Y axis
+    # of the bone as the columns of the rotation
+    rotation = Matrix(((1, 0, 0, 0), (0, 0, 1, 0), (0, -1, 0, 0), (0, 0, 0, 1)))
+    return bone.matrix_local @ Matrix.Translation((0, bone.length / 2, 0)) @ rotation
+
+
+def collider_collection(context: bpy.types.Context) -> bpy.types.Collection:
+    """
+    Collider collection of the active collision group, created when the group
+    has none, or the default collider collection without collision group.
+    """
+
+    props = context.scene.yurerig
+    group = None
+    if 0 <= props.collision_groups_index < len(props.collision_groups):
+        group = props.collision_groups[props.collision_groups_index]
+    if group is not None and group.collider_collection is not None:
+        return group.collider_collection
+
+    name = (
+        f"{DEFAULT_COLLECTION_NAME} {group.name}"
+        if group is not None
+        else DEFAULT_COLLECTION_NAME
+    )
+    collection = bpy.data.collections.get(name)
+    if collection is None:
+        collection = bpy.data.collections.new(name)
+        props.root_collection.children.link(collection)
+    if group is not None:
+        group.collider_collection = collection
+    return collection
+
+
+def make_collider(
+    context: bpy.types.Context,
+    armature: bpy.types.Object,
+    bone_name: str,
+    shape: str,
+    size: Tuple[float, float],
+    collection: bpy.types.Collection,
+) -> bpy.types.Object:
+    """
+    Create or update the collider of the bone `bone_name`.
+    """
+
+    bone = armature.data.bones[bone_name]
+    name = f"{COLLIDER_PREFIX}{bone_name}"
+    obj = bpy.data.objects.get(name)
+    if obj is None:
+        obj = bpy.data.objects.new(name, object_data=bpy.data.meshes.new(name))
+        obj.display_type = "WIRE"
+    elif obj.data.users > 1:
+        obj.data = obj.data.copy()
+        obj.data.name = name
+    dimensions = collider_size(shape, size, bone.length)
+    build_mesh(obj.data, shape, dimensions)
+    if collection not in obj.users_collection:
+        collection.objects.link(obj)
+
+    world = builder.ensure_rigidbody_world(context)
+    if obj.rigid_body is None:
+        world.collection.objects.link(obj)
+    obj.rigid_body.type = "PASSIVE"
+    obj.rigid_body.kinematic = True
+    obj.rigid_body.collision_shape = shape
+    obj.rigid_body.collision_margin = 0
+
+    builder.parent_to_bone(obj, armature, bone_name)
+    obj.matrix_basis = collider_matrix(bone)
+    return obj
+
+
+def replace_mesh_colliders(
+    context: bpy.types.Context, armature: bpy.types.Object
+) -> int:
+    """
+    Take the meshes deformed by `armature` out of the rigid body world.
+    Return the number of removed mesh colliders.
+    """
+
+    world = context.scene.rigidbody_world
+    if world is None or world.collection is None:
+        return 0
+    bodies = set(world.collection.objects)
+    count = 0
+    for obj in autofit.deformed_meshes(armature):
+        if obj in bodies:
+            world.collection.objects.unlink(obj)
+            count += 1
+    return count
+
+
+def selected_deform_bones(context: bpy.types.Context) -> List[str]:
+    armature = context.active_object
+    return [
+        b.name
+        for b in (context.selected_pose_bones or [])
+        if b.id_data == armature and b.bone.use_deform and "_YURERIG_" not in b.name
+    ]
+
+
+# Operators
+#################################################
+
+
+def generate_colliders(
+    operator: bpy.types.Operator, context: bpy.types.Context
+) -> Set[str]:
+    """
+    Implementation of `YURERIG_OT_GenerateCollidersOperator`.
+    """
+
+    armature: bpy.types.Object = context.active_object
+    bone_names = selected_deform_bones(context)
+    if len(bone_names) == 0:
+        operator.report({"ERROR"}, "Select the deform bones to make colliders for")
+        return {"CANCELLED"}
+
+    builder.init_collection()
+    sizes = autofit.fit_sizes(
+        armature, bone_names, [(name,) for name in bone_names], operator.fit_weight
+    )
+    collection = collider_collection(context)
+    colliders = [
+        make_collider(context, armature, name, operator.shape, sizes[name], collection)
+        for name in bone_names
+        if name in sizes
+    ]
+    removed = replace_mesh_colliders(context, armature) if operator.replace else 0
+
+    try:
+        collision_layers.apply(context.scene)
+    except collision_layers.CollisionPlanError as e:
+        operator.report({"WARNING"}, str(e))
+
+    skipped = len(bone_names) - len(colliders)
+    operator.report(
+        {"WARNING"} if skipped > 0 else {"INFO"},
+        f"Success Generate Colliders: {len(colliders)} colliders in "
+        + f"{collection.name}, {skipped} bones without weights, "
+        + f"{removed} mesh colliders removed",
+    )
+    return {"FINISHED"}
@@ -0,0 +1,277 @@
+from typing import Dict, Iterable, List, Sequence, Set, Tuple
+
+import bpy
+
+from . import chains
+
+# Bullet makes two rigid bodies collide when they share at least one of the 20
+# collision collections.
+#
+# Chains are gathered into user-declared collision groups and the planner
+# assigns collision collections so that two groups share a collection exactly
+# when they are declared to interact. Bodies of the same group always share
+# their collections, so a group always collides with itself; adjacent bodies
+# of a chain are kept apart by their joints.
+#
+# Collection 0 is left to chains without a group and to rigid bodies not
+# managed by YureRig, which is where Blender puts new rigid bodies.
+# Collection 19 holds the reset goals and the roots, which are kinematic and
+# never need to collide with anything.
+
+LAYER_COUNT = 20
+DEFAULT_LAYER = 0
+RESERVED_LAYER = 19
+PLANNER_LAYERS = tuple(range(DEFAULT_LAYER + 1, RESERVED_LAYER))
+GROUP_PROPERTY = "YureRig Collision Group"
+
+
+class CollisionPlanError(Exception):
+    pass
+
+
+def plan(
+    groups: Sequence[str],
+    interactions: Iterable[Tuple[str, str]],
+    layers: Sequence[int] = PLANNER_LAYERS,
+) -> Dict[str, int]:
+    """
+    Assign collision collections to groups.
+    Return a bit mask of collision collections per group.
+
+    Each collection holds a clique of the interaction graph, so that the
+    groups sharing a collection all interact with each other. Cliques are grown
+    greedily from the uncovered interactions until every interaction is
+    covered, and groups without any interaction get a collection of their own.
+    """
+
+    order = {group: i for i, group in enumerate(groups)}
+    adjacency: Dict[str, Set[str]] = {group: set() for group in groups}
+    for a, b in interactions:
+        if a in adjacency and b in adjacency and a != b:
+            adjacency[a].add(b)
+            adjacency[b].add(a)
+
+    uncovered = sorted(
+        ((a, b) for a in groups for b in adjacency[a] if order[a] < order[b]),
+        key=lambda e: (order[e[0]], order[e[1]]),
+    )
+    covered: Set[Tuple[str, str]] = set()
+    cliques: List[List[str]] = []
+    for a, b in uncovered:
+        if (a, b) in covered:
+            continue
+        clique = [a, b]
+        candidates = sorted(
+            adjacency[a] & adjacency[b], key=lambda g: (-len(adjacency[g]), order[g])
+        )
+        for candidate in candidates:
+            if all(candidate in adjacency[member] for member in clique):
+                clique.append(candidate)
+        for x in clique:
+            for y in clique:
+                covered.add((x, y))
+        cliques.append(clique)
+
+    for group in groups:
+        if len(adjacency[group]) == 0:
+            cliques.append([group])
+
+    if len(cliques) > len(layers):
+        raise CollisionPlanError(
+            f"{len(cliques)} collision collections are needed "
+            + f"but only {len(layers)} are available"
+        )
+
+    masks = {group: 0 for group in groups}
+    for layer, clique in zip(layers, cliques):
+        for group in clique:
+            masks[group] |= 1 << layer
+    return masks
+
+
+def collides(masks: Dict[str, int], a: str, b: str) -> bool:
+    return masks[a] & masks[b] != 0
+
+
+def layer_list(mask: int) -> List[int]:
+    return [layer for layer in range(LAYER_COUNT) if mask & (1 << layer)]
+
+
+def count_pairs(masks: Iterable[int]) -> int:
+    """
+    Number of body pairs which share a collision collection, that is the pairs
+    the broadphase has to consider, for bodies with the given masks.
+    """
+
+    counts: Dict[int, int] = {}
+    for mask in masks:
+        counts[mask] = counts.get(mask, 0) + 1
+    items = list(counts.items())
+    pairs = 0
+    for i, (mask_a, count_a) in enumerate(items):
+        if mask_a == 0:
+            continue
+        pairs += count_a * (count_a - 1) // 2
+        for mask_b, count_b in items[i + 1 :]:
+            if mask_a & mask_b:
+                pairs += count_a * count_b
+    return pairs
+
+
+# Scene
+#################################################
+
+
+def get_mask(obj: bpy.types.Object) -> int:
+    return sum(
+        1 << layer for layer, v in enumerate(obj.rigid_body.collision_collections) if v
+    )
+
+
+def set_mask(obj: bpy.types.Object, mask: int) -> None:
+    if get_mask(obj) != mask:
+        obj.rigid_body.collision_collections = [
+            bool(mask & (1 << layer)) for layer in range(LAYER_COUNT)
+        ]
+
+
+def scene_plan(scene: bpy.types.Scene) -> Dict[str, int]:
+    props = scene.yurerig
+    return plan(
+        [group.name for group in props.collision_groups],
+        [(i.group_a, i.group_b) for i in props.collision_interactions],
+    )
+
+
+def chain_group(armature: bpy.types.Object, chain: chains.Chain) -> str:
+    slider = armature.pose.bones.get(chain.slider_name)
+    if slider is None:
+        return ""
+    return str(slider.get(GROUP_PROPERTY, ""))
+
+
+def apply(scene: bpy.types.Scene) -> Tuple[int, int]:
+    """
+    Set the collision collections of the chain rigid bodies and of the group
+    colliders from the collision groups of `scene`.
+    Return the number of body pairs sharing a collision collection before and
+    after.
+    """
+
+    props = scene.yurerig
+    masks = scene_plan(scene)
+    default_mask = 1 << DEFAULT_LAYER
+    reserved_mask = 1 << RESERVED_LAYER
+
+    targets: Dict[str, Tuple[bpy.types.Object, int]] = {}
+    for armature in chains.rigged_armatures(scene):
+        for chain in chains.get_chains(armature):
+            mask = masks.get(chain_group(armature, chain), default_mask)
+            for obj in chain.rigidbodies():
+                targets[obj.name] = (obj, mask)
+            for obj in chain.goals():
+                targets[obj.name] = (obj, reserved_mask)
+            for obj in chain.roots():
+                targets[obj.name] = (obj, reserved_mask)
+    for group in props.collision_groups:
+        if group.collider_collection is None:
+            continue
+        for obj in group.collider_collection.all_objects:
+            if obj.rigid_body is not None and obj.name not in targets:
+                targets[obj.name] = (obj, masks[group.name])
+
+    world_objects = (
+        list(scene.rigidbody_world.collection.all_objects)
+        if scene.rigidbody_world is not None
+        and scene.rigidbody_world.collection is not None
+        else []
+    )
+    others = [
+        get_mask(obj)
+        for obj in world_objects
+        if obj.rigid_body is not None and obj.name not in targets
+    ]
+    before = count_pairs(
+        others + [get_mask(obj) for obj, _ in targets.values() if obj.rigid_body]
+    )
+    for obj, mask in targets.values():
+        if obj.rigid_body is not None:
+            set_mask(obj, mask)
+    after = count_pairs(
+        others + [mask for obj, mask in targets.values() if obj.rigid_body]
+    )
+    return before, after
+
+
+def selected_chains(
+    context: bpy.types.Context,
+) -> List[Tuple[bpy.types.Object, chains.Chain]]:
+    armature = context.active_object
+    selected = {
+        bone.name
+        for bone in (context.selected_pose_bones or [])
+        if bone.id_data == armature
+    }
+    return [
+        (armature, chain)
+        for chain in chains.get_chains(armature)
+        if chain.slider_name in selected
+        or any(name in selected for name in chain.ctrl_bone_names())
+    ]
+
+
+# Operators
+#################################################
+
+
+def apply_collision_layers(
+    operator: bpy.types.Operator, context: bpy.types.Context
+) -> Set[str]:
+    """
+    Implementation of `YURERIG_OT_ApplyCollisionLayersOperator`.
+    """
+
+    try:
+        before, after = apply(context.scene)
+    except CollisionPlanError as e:
+        operator.report({"ERROR"}, str(e))
+        return {"CANCELLED"}
+    operator.report(
+        {"INFO"},
+        f"Success Apply Collision Layers: {before} -> {after} broadphase pairs",
+    )
+    return {"FINISHED"}
+
+
+def assign_collision_group(
+    operator: bpy.types.Operator, context: bpy.types.Context
+) -> Set[str]:
+    """
+    Implementation of `YURERIG_OT_AssignCollisionGroupOperator`.
+    """
+
+    props = context.scene.yurerig
+    group_name = ""
+    if 0 <= props.collision_groups_index < len(props.collision_groups):
+        group_name = props.collision_groups[props.collision_groups_index].name
+    if operator.unassign:
+        group_name = ""
+
+    targets = selected_chains(context)
+    if len(targets) == 0:
+        operator.report({"ERROR"}, "Select the controller bones of a chain")
+        return {"CANCELLED"}
+    for armature, chain in targets:
+        armature.pose.bones[chain.slider_name][GROUP_PROPERTY] = group_name
+
+    try:
+        before, after = apply(context.scene)
+    except CollisionPlanError as e:
+        operator.report({"ERROR"}, str(e))
+        return {"CANCELLED"}
+    operator.report(
+        {"INFO"},
+        f"Success Assign Collision Group: {len(targets)} chains, "
+        + f"{before} -> {after} broadphase pairs",
+    )
+    return {"FINISHED"}
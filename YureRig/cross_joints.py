@@ -0,0 +1,157 @@
+from typing import Dict, FrozenSet, List, Sequence, Set, Tuple
+
+import bpy
+from mathutils import Vector
+from mathutils.kdtree import KDTree
+
+from . import builder, chains
+
+# Skirts and capes need joints across their strands, not only along them.
+# The bones of each depth along the strands go into their own KD-tree, so the
+# nearest neighbours of a bone are always at the same depth and on another
+# strand, and all the candidates are found in O(n log n).
+
+
+class StrandBone:
+    """
+    PHYS_YURERIG_ bone of a strand.
+    `name` is the bone name without prefix and `position` is its tail.
+    """
+
+    __slots__ = ("name", "strand", "depth", "position")
+
+    def __init__(self, name: str, strand: str, depth: int, position: Vector):
+        self.name = name
+        self.strand = strand
+        self.depth = depth
+        self.position = position
+
+
+def plan_cross_joints(
+    bones: Sequence[StrandBone],
+    max_distance: float,
+    max_degree: int,
+    existing: Set[FrozenSet[str]],
+) -> List[Tuple[str, str]]:
+    """
+    Pick the pairs of bones to join.
+
+    Each bone is linked to its nearest neighbours at the same depth on other
+    strands within `max_distance`. Candidates are accepted shortest first
+    while neither bone has `max_degree` cross joints, counting the existing
+    joints across strands, and pairs already joined are skipped.
+    """
+
+    by_depth: Dict[int, List[StrandBone]] = {}
+    for bone in bones:
+        by_depth.setdefault(bone.depth, []).append(bone)
+
+    candidates: Dict[FrozenSet[str], Tuple[float, str, str]] = {}
+    for level in by_depth.values():
+        kd = KDTree(len(level))
+        for i, bone in enumerate(level):
+            kd.insert(bone.position, i)
+        kd.balance()
+        for bone in level:
+            for _, i, distance in kd.find_n(bone.position, max_degree + 1):
+                other = level[i]
+                if other.strand == bone.strand or distance > max_distance:
+                    continue
+                pair = frozenset((bone.name, other.name))
+                if pair not in existing:
+                    candidates[pair] = (distance, bone.name, other.name)
+
+    strands = {bone.name: bone.strand for bone in bones}
+    degree: Dict[str, int] = {bone.name: 0 for bone in bones}
+    for pair in existing:
+        if len(pair) == 2 and all(name in strands for name in pair):
+            a, b = pair
+            if strands[a] != strands[b]:
+                degree[a] += 1
+                degree[b] += 1
+
+    joints: List[Tuple[str, str]] = []
+    for _, a, b in sorted(candidates.values()):
+        if degree[a] < max_degree and degree[b] < max_degree:
+            degree[a] += 1
+            degree[b] += 1
+            joints.append((a, b))
+    return joints
+
+
+def strand_bones(armature: bpy.types.Object, names: Sequence[str]) -> List[StrandBone]:
+    """
+    Sort the bones `names` into strands, a strand starting at each bone whose
+    parent is not one of `names`.
+    """
+
+    name_set = set(names)
+    bones: List[StrandBone] = []
+    for name in names:
+        pose_bone = armature.pose.bones.get(f"PHYS_YURERIG_{name}")
+        if pose_bone is None:
+            continue
+        depth = 0
+        strand = name
+        parent = pose_bone.parent
+        while parent is not None and parent.name[13:] in name_set:
+            depth += 1
+            strand = parent.name[13:]
+            parent = parent.parent
+        bones.append(StrandBone(name, strand, depth, pose_bone.tail.copy()))
+    return bones
+
+
+def existing_joint_pairs(armature: bpy.types.Object) -> Set[FrozenSet[str]]:
+    """
+    Pairs of bone names of `armature` already joined through their rigid
+    bodies.
+    """
+
+    pairs: Set[FrozenSet[str]] = set()
+    world = bpy.context.scene.rigidbody_world
+    if world is None or world.constraints is None:
+        return pairs
+    for obj in world.constraints.all_objects:
+        if not obj.name.startswith("JOINT_YURERIG_"):
+            continue
+        bone1, bone2 = builder.joint_bones(armature, obj)
+        if bone1 is None or bone2 is None:
+            continue
+        pairs.add(frozenset((bone1.name[13:], bone2.name[13:])))
+    return pairs
+
+
+def add_cross_joints(
+    operator: bpy.types.Operator, context: bpy.types.Context
+) -> Set[str]:
+    """
+    Implementation of `YURERIG_OT_AddCrossJointsOperator`.
+    """
+
+    builder.init_collection()
+
+    props = context.scene.yurerig
+    armature: bpy.types.Object = context.active_object
+    names = [
+        bone.name[13:]
+        for bone in context.selected_pose_bones
+        if bone.name.startswith("CTRL_YURERIG_")
+        and not chains.slider_bone_pattern.match(bone.name)
+        and f"RIGIDBODY_YURERIG_{bone.name[13:]}" in bpy.data.objects
+    ]
+    if len(names) < 2:
+        operator.report({"ERROR"}, "Select the controller bones of the strands")
+        return {"CANCELLED"}
+
+    joints = plan_cross_joints(
+        strand_bones(armature, names),
+        props.cross_joint_max_distance,
+        props.cross_joint_max_degree,
+        existing_joint_pairs(armature),
+    )
+    for name1, name2 in joints:
+        builder.make_extra_joint_object(armature, name1, name2)
+
+    operator.report({"INFO"}, f"Success Add Cross Joints: {len(joints)} joints added")
+    return {"FINISHED"}
@@ -0,0 +1,490 @@
+import argparse
+import math
+import statistics
+import sys
+import time
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+import bpy
+import numpy as np
+
+from . import chains, collision_layers, farm, schedule, sweep
+
+# Bullet puts a rigid body to sleep once its linear and angular velocities
+# stay below its deactivation thresholds for a while, and skips it in the
+# solver until something wakes it. The tuner enables deactivation on the
+# rigid bodies of every chain and derives the thresholds of each body from
+# its size and mass: a body of `REFERENCE_MASS` rests below `rest_speed` body
+# lengths per second, heavier bodies at a proportionally lower kinetic energy.
+#
+# Bullet does not wake a sleeping chain through its joints when its kinematic
+# root or goals move. So the tuner steps through the frame range without
+# simulating, like the camera LOD, and records where the CTRL_YURERIG_ bones,
+# the roots and the slider of each chain move, and where the activity
+# schedule enables its bodies again. `rigid_body.use_deactivation` is keyed
+# off from `wake_frames` before those frames to their end, which wakes the
+# bodies and keeps them awake, and on again afterwards so they can sleep once
+# they settled. Chains at rest on the first `wake_frames` frames start
+# deactivated.
+#
+# The `DEACTIVATION_PROPERTY` of the slider bone of a chain is "AUTO" for
+# tuned chains or "OFF" for chains which never sleep.
+
+DEACTIVATION_PROPERTY = "YureRig Deactivation"
+DEACTIVATION_DATA_PATH = "rigid_body.use_deactivation"
+DEACTIVATION_MODES = ("AUTO", "OFF")
+REFERENCE_MASS = 1.0
+# Change per frame of a bone or root matrix element, or of the slider, below
+# which a chain counts as still
+MOTION_EPSILON = 1e-5
+
+
+class DeactivationSettings:
+    __slots__ = ("rest_speed", "wake_frames", "start_deactivated")
+
+    def __init__(self, rest_speed: float, wake_frames: int, start_deactivated: bool):
+        self.rest_speed = max(rest_speed, 0.0)
+        self.wake_frames = max(wake_frames, 0)
+        self.start_deactivated = start_deactivated
+
+    @classmethod
+    def from_props(cls, props: bpy.types.PropertyGroup) -> "DeactivationSettings":
+        return cls(
+            props.deactivation_rest_speed,
+            props.deactivation_wake_frames,
+            props.use_start_deactivated,
+        )
+
+
+def chain_mode(armature: bpy.types.Object, chain: chains.Chain) -> str:
+    slider = armature.pose.bones.get(chain.slider_name)
+    if slider is None:
+        return "OFF"
+    mode = str(slider.get(DEACTIVATION_PROPERTY, "AUTO"))
+    return mode if mode in DEACTIVATION_MODES else "AUTO"
+
+
+def active_bodies(chain: chains.Chain) -> List[bpy.types.Object]:
+    return [
+        obj
+        for obj in chain.rigidbodies()
+        if obj.rigid_body is not None and obj.rigid_body.type == "ACTIVE"
+    ]
+
+
+def body_length(obj: bpy.types.Object) -> float:
+    """
+    Largest extent of the box of a rigid body.
+    """
+
+    vertices = obj.data.vertices
+    if len(vertices) == 0:
+        return 0.0
+    co = np.empty(len(vertices) * 3, dtype=np.float32)
+    vertices.foreach_get("co", co)
+    points = co.reshape(-1, 3)
+    return float((points.max(axis=0) - points.min(axis=0)).max())
+
+
+def thresholds(length: float, mass: float, rest_speed: float) -> Tuple[float, float]:
+    """
+    Linear and angular deactivation velocities of a body of `length` and
+    `mass`. The angular velocity turns the body ends at the linear velocity.
+    """
+
+    linear = rest_speed * length * math.sqrt(REFERENCE_MASS / max(mass, 1e-6))
+    angular = 2 * linear / length if length > 0 else rest_speed
+    return linear, angular
+
+
+# Motion schedule
+#################################################
+
+
+def chain_state(armature: bpy.types.Object, chain: chains.Chain) -> np.ndarray:
+    """
+    Everything moving the chain from outside of the simulation: the world
+    matrices of its CTRL_YURERIG_ bones and roots and its slider.
+    """
+
+    values: List[float] = []
+    matrix_world = armature.matrix_world
+    for name in chain.ctrl_bone_names():
+        pose_bone = armature.pose.bones.get(name)
+        if pose_bone is not None:
+            values.extend(v for row in matrix_world @ pose_bone.matrix for v in row)
+    for root in dict.fromkeys(chain.roots()):
+        values.extend(v for row in root.matrix_world for v in row)
+    slider = armature.pose.bones.get(chain.slider_name)
+    if slider is not None:
+        values.append(slider.location.z)
+    return np.array(values, dtype=np.float64)
+
+
+def compute_motion(
+    scene: bpy.types.Scene,
+    targets: Sequence[Tuple[bpy.types.Object, chains.Chain]],
+    frame_start: int,
+    frame_end: int,
+) -> Dict[Tuple[str, int], List[bool]]:
+    """
+    Per chain flags telling whether the chain is moved on each frame. The
+    frames are sampled with `schedule.sample_frames`, so this never simulates
+    and keeps the rigid body point cache.
+    """
+
+    count = frame_end - frame_start + 1
+    states: Dict[Tuple[str, int], List[Optional[np.ndarray]]] = {
+        (a.name, c.index): [None] * count for a, c in targets
+    }
+
+    def sample(frame: int) -> None:
+        for armature, chain in targets:
+            state = chain_state(armature, chain)
+            states[(armature.name, chain.index)][frame - frame_start] = state
+
+    schedule.sample_frames(scene, frame_start, frame_end, sample)
+
+    flags: Dict[Tuple[str, int], List[bool]] = {}
+    for key, chain_states in states.items():
+        chain_flags = [False]
+        for last, state in zip(chain_states, chain_states[1:]):
+            chain_flags.append(
+                last is None
+                or state is None
+                or len(last) != len(state)
+                or bool(np.abs(state - last).max(initial=0) > MOTION_EPSILON)
+            )
+        flags[key] = chain_flags[:count]
+    return flags
+
+
+def awake_ranges(
+    armature: bpy.types.Object,
+    chain: chains.Chain,
+    flags: Sequence[bool],
+    frame_start: int,
+    wake_frames: int,
+) -> schedule.Ranges:
+    """
+    Frame ranges where the chain bodies must stay awake: from `wake_frames`
+    before the chain is moved or its bodies are enabled again by the activity
+    schedule, to the last frame it is moved.
+    """
+
+    frame_end = frame_start + len(flags) - 1
+    moved = schedule.ranges_from_flags(flags, frame_start)
+    enabled = [
+        (end + 1, end + 1)
+        for _, end in schedule.inactive_ranges(armature, chain)
+        if frame_start <= end + 1 <= frame_end
+    ]
+    return schedule.merge_ranges(
+        [(max(start - wake_frames, frame_start), end) for start, end in moved + enabled]
+    )
+
+
+# Tuning
+#################################################
+
+
+def disable(chain: chains.Chain) -> int:
+    bodies = active_bodies(chain)
+    for obj in bodies:
+        schedule.clear_keys(obj, DEACTIVATION_DATA_PATH)
+        obj.rigid_body.use_deactivation = False
+        obj.rigid_body.use_start_deactivated = False
+    return len(bodies)
+
+
+def tune_chain(
+    armature: bpy.types.Object,
+    chain: chains.Chain,
+    flags: Sequence[bool],
+    frame_start: int,
+    settings: DeactivationSettings,
+) -> Tuple[int, int]:
+    """
+    Set the deactivation of the bodies of `chain` and key their wake ranges.
+    Return the number of bodies and of awake frames.
+    """
+
+    ranges = awake_ranges(armature, chain, flags, frame_start, settings.wake_frames)
+    keys: List[Tuple[int, bool]] = []
+    for start, end in ranges:
+        keys.append((start, False))
+        keys.append((end + 1, True))
+    at_rest = not any(flags[: settings.wake_frames + 1])
+    start_deactivated = settings.start_deactivated and at_rest
+
+    bodies = active_bodies(chain)
+    for obj in bodies:
+        rigid_body = obj.rigid_body
+        linear, angular = thresholds(
+            body_length(obj), rigid_body.mass, settings.rest_speed
+        )
+        rigid_body.use_deactivation = True
+        rigid_body.deactivate_linear_velocity = linear
+        rigid_body.deactivate_angular_velocity = angular
+        rigid_body.use_start_deactivated = start_deactivated
+        schedule.key_steps(obj, DEACTIVATION_DATA_PATH, keys, True)
+    return len(bodies), sum(end - start + 1 for start, end in ranges)
+
+
+def tune(
+    scene: bpy.types.Scene,
+    frame_start: int,
+    frame_end: int,
+    settings: DeactivationSettings,
+) -> Dict[str, int]:
+    """
+    Tune the deactivation of every chain of `scene` for the frame range.
+    """
+
+    targets: List[Tuple[bpy.types.Object, chains.Chain]] = []
+    result = {"chains": 0, "off_chains": 0, "bodies": 0, "awake_frames": 0}
+    for armature in chains.rigged_armatures(scene):
+        for chain in chains.get_chains(armature):
+            if chain_mode(armature, chain) == "OFF":
+                disable(chain)
+                result["off_chains"] += 1
+            else:
+                targets.append((armature, chain))
+
+    flags = compute_motion(scene, targets, frame_start, frame_end)
+    for armature, chain in targets:
+        bodies, awake = tune_chain(
+            armature, chain, flags[(armature.name, chain.index)], frame_start, settings
+        )
+        result["chains"] += 1
+        result["bodies"] += bodies
+        result["awake_frames"] += awake
+    result["chain_frames"] = result["chains"] * (frame_end - frame_start + 1)
+    return result
+
+
+def clear(scene: bpy.types.Scene) -> int:
+    count = 0
+    for armature in chains.rigged_armatures(scene):
+        for chain in chains.get_chains(armature):
+            count += disable(chain)
+    return count
+
+
+# Benchmark
+#################################################
+
+
+def benchmark(scene: bpy.types.Scene, frames: int) -> Dict[str, float]:
+    """
+    Time the simulation of `frames` frames of `scene` from the start of the
+    rigid body cache. Return milliseconds per frame.
+    """
+
+    if scene.rigidbody_world is None:
+        raise sweep.SweepError("Scene has no rigid body world")
+    sweep.prepare_scene(scene)
+    frame_current = scene.frame_current
+    frame_start = farm.simulation_start(scene)
+    times: List[float] = []
+    try:
+        scene.frame_set(frame_start)
+        for frame in range(frame_start + 1, frame_start + frames + 1):
+            started = time.perf_counter()
+            scene.frame_set(frame)
+            times.append((time.perf_counter() - started) * 1000)
+    finally:
+        scene.frame_set(frame_current)
+    return {
+        "mean_ms": statistics.mean(times),
+        "median_ms": statistics.median(times),
+        "max_ms": max(times),
+    }
+
+
+def benchmark_without_deactivation(
+    scene: bpy.types.Scene, frames: int
+) -> Dict[str, float]:
+    """
+    `benchmark` with deactivation turned off on every chain body, then put
+    back as it was.
+    """
+
+    saved: List[Tuple[bpy.types.Object, bool, bool, Optional[bpy.types.FCurve]]] = []
+    for armature in chains.rigged_armatures(scene):
+        for chain in chains.get_chains(armature):
+            for obj in active_bodies(chain):
+                fcurve = None
+                if obj.animation_data is not None and obj.animation_data.action:
+                    fcurve = obj.animation_data.action.fcurves.find(
+                        DEACTIVATION_DATA_PATH
+                    )
+                saved.append(
+                    (
+                        obj,
+                        obj.rigid_body.use_deactivation,
+                        obj.rigid_body.use_start_deactivated,
+                        fcurve if fcurve is not None and not fcurve.mute else None,
+                    )
+                )
+    try:
+        for obj, _, _, fcurve in saved:
+            if fcurve is not None:
+                fcurve.mute = True
+            obj.rigid_body.use_deactivation = False
+            obj.rigid_body.use_start_deactivated = False
+        return benchmark(scene, frames)
+    finally:
+        for obj, use_deactivation, start_deactivated, fcurve in saved:
+            if fcurve is not None:
+                fcurve.mute = False
+            obj.rigid_body.use_deactivation = use_deactivation
+            obj.rigid_body.use_start_deactivated = start_deactivated
+
+
+def report(label: str, result: Dict[str, float]) -> None:
+    print(
+        f"YureRig: {label}: {result['median_ms']:.3f} ms per frame "
+        + f"(mean {result['mean_ms']:.3f}, max {result['max_ms']:.3f})"
+    )
+
+
+def summary(result: Dict[str, int]) -> str:
+    idle = 1 - result["awake_frames"] / max(result["chain_frames"], 1)
+    return (
+        f"{result['chains']} chains, {result['bodies']} rigid bodies, "
+        + f"{idle:.0%} of chain frames may sleep, "
+        + f"{result['off_chains']} chains never sleep"
+    )
+
+
+# Headless command
+#################################################
+
+
+def parse_args(argv: Sequence[str], scene: bpy.types.Scene) -> argparse.Namespace:
+    props = scene.yurerig
+    parser = argparse.ArgumentParser(
+        prog="yurerig_deactivation",
+        description="Tune or benchmark the YureRig rigid body deactivation.",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    tune_parser = subparsers.add_parser(
+        "tune", help="Tune the deactivation of all chains of the scene."
+    )
+    tune_parser.add_argument("--frame-start", type=int, default=scene.frame_start)
+    tune_parser.add_argument("--frame-end", type=int, default=scene.frame_end)
+    tune_parser.add_argument(
+        "--rest-speed", type=float, default=props.deactivation_rest_speed
+    )
+    tune_parser.add_argument(
+        "--wake-frames", type=int, default=props.deactivation_wake_frames
+    )
+    tune_parser.add_argument(
+        "--save", action="store_true", help="Save the .blend file afterwards."
+    )
+
+    benchmark_parser = subparsers.add_parser(
+        "benchmark", help="Time the simulation of each frame."
+    )
+    benchmark_parser.add_argument(
+        "--frames", type=int, default=scene.frame_end - scene.frame_start
+    )
+    benchmark_parser.add_argument(
+        "--tune",
+        action="store_true",
+        help="Tune the deactivation before timing. The .blend file is not saved.",
+    )
+    benchmark_parser.add_argument(
+        "--compare",
+        action="store_true",
+        help="Also time the simulation with deactivation turned off.",
+    )
+    return parser.parse_args(argv)
+
+
+def command(args: argparse.Namespace, scene: bpy.types.Scene) -> None:
+    if args.command == "tune":
+        settings = DeactivationSettings(
+            args.rest_speed, args.wake_frames, scene.yurerig.use_start_deactivated
+        )
+        result = tune(scene, args.frame_start, args.frame_end, settings)
+        print(f"YureRig: tuned deactivation: {summary(result)}")
+        if args.save:
+            bpy.ops.wm.save_mainfile()
+        return
+
+    if args.tune:
+        result = tune(
+            scene,
+            scene.frame_start,
+            scene.frame_end,
+            DeactivationSettings.from_props(scene.yurerig),
+        )
+        print(f"YureRig: tuned deactivation: {summary(result)}")
+    try:
+        report("with deactivation", benchmark(scene, args.frames))
+        if args.compare:
+            report(
+                "without deactivation",
+                benchmark_without_deactivation(scene, args.frames),
+            )
+    except sweep.SweepError as e:
+        sys.exit(str(e))
+
+
+# Operators
+#################################################
+
+
+def tune_deactivation(
+    operator: bpy.types.Operator, context: bpy.types.Context
+) -> Set[str]:
+    """
+    Implementation of `YURERIG_OT_TuneDeactivationOperator`.
+    """
+
+    scene = context.scene
+    result = tune(
+        scene,
+        scene.frame_start,
+        scene.frame_end,
+        DeactivationSettings.from_props(scene.yurerig),
+    )
+    operator.report({"INFO"}, f"Success Tune Deactivation: {summary(result)}")
+    return {"FINISHED"}
+
+
+def set_chain_deactivation(
+    operator: bpy.types.Operator, context: bpy.types.Context
+) -> Set[str]:
+    """
+    Implementation of `YURERIG_OT_SetChainDeactivationOperator`.
+    """
+
+    targets = collision_layers.selected_chains(context)
+    if len(targets) == 0:
+        operator.report({"ERROR"}, "Select the controller bones of a chain")
+        return {"CANCELLED"}
+    for armature, chain in targets:
+        armature.pose.bones[chain.slider_name][DEACTIVATION_PROPERTY] = operator.mode
+        if operator.mode == "OFF":
+            disable(chain)
+    operator.report(
+        {"INFO"},
+        f"Success Set Chain Deactivation: {len(targets)} chains {operator.mode}",
+    )
+    return {"FINISHED"}
+
+
+def clear_deactivation(
+    operator: bpy.types.Operator, context: bpy.types.Context
+) -> Set[str]:
+    """
+    Implementation of `YURERIG_OT_ClearDeactivationOperator`.
+    """
+
+    count = clear(context.scene)
+    operator.report({"INFO"}, f"Success Clear Deactivation: {count} rigid bodies")
+    return {"FINISHED"}
@@ -0,0 +1,301 @@
+import argparse
+import re
+import sys
+from typing import Dict, Iterator, Sequence, Set, Tuple
+
+import bpy
+
+from . import chains, dependency_graph, headless
+
+# Analysis of the dependencies between the rigged armatures, the rigid bodies,
+# goals, roots and joints of a scene, at the granularity the depsgraph
+# evaluates them (see `dependency_graph` for the nodes and the checks).
+#
+# A chain normally runs CTRL bone -> goal or kinematic body -> world -> rigid
+# body -> PHYS bone -> DEF bone, leaving its armature and coming back to it.
+# Such round trips are expected and not reported, but a strongly connected
+# component of the graph is a dependency cycle Blender warns about and breaks
+# at an arbitrary place, for instance when a chain is set up below the
+# DEF_YURERIG_ bone of another chain.
+#
+# The report lists the cycles, the other round trips per armature and the
+# redundant edges: the same dependency created several times, or an edge
+# implied by a path of the same kind through another node.
+
+REPORT_VERSION = 2
+TEXT_NAME = "YureRig Dependencies.json"
+
+pose_bone_data_path_pattern = re.compile(r'^pose\.bones\["([^"]+)"\]')
+# Driver variable types reading the transform of an object or bone
+TRANSFORM_VARIABLE_TYPES = ("TRANSFORMS", "ROTATION_DIFF", "LOC_DIFF")
+
+
+def bone_node(armature: bpy.types.Object, bone_name: str) -> str:
+    return f"bone:{armature.name}/{bone_name}"
+
+
+def object_node(obj: bpy.types.Object) -> str:
+    return f"object:{obj.name}"
+
+
+def simulated(obj: bpy.types.Object) -> bool:
+    rigid_body = obj.rigid_body
+    return rigid_body is not None and rigid_body.type == "ACTIVE"
+
+
+def output_node(obj: bpy.types.Object, world_objects: Set[bpy.types.Object]) -> str:
+    """
+    Node of the transform other nodes read from `obj`.
+    """
+
+    if obj in world_objects and simulated(obj):
+        return f"sim:{obj.name}"
+    return object_node(obj)
+
+
+def target_node(
+    obj: bpy.types.Object,
+    bone_name: str,
+    world_objects: Set[bpy.types.Object],
+) -> str:
+    if obj.type == "ARMATURE" and bone_name != "" and bone_name in obj.pose.bones:
+        return bone_node(obj, bone_name)
+    return output_node(obj, world_objects)
+
+
+def constraint_targets(
+    constraint: bpy.types.Constraint,
+) -> Iterator[Tuple[object, str]]:
+    """
+    (target, subtarget) pairs of a bone or object constraint.
+    """
+
+    if constraint.type == "ARMATURE":
+        for target in constraint.targets:
+            yield target.target, target.subtarget
+        return
+    target = getattr(constraint, "target", None)
+    if target is not None:
+        yield target, getattr(constraint, "subtarget", "")
+
+
+def add_constraint_edges(
+    graph: dependency_graph.DependencyGraph,
+    owner: str,
+    constraints: bpy.types.bpy_prop_collection,
+    world_objects: Set[bpy.types.Object],
+) -> None:
+    for constraint in constraints:
+        if constraint.mute:
+            continue
+        for target, subtarget in constraint_targets(constraint):
+            if isinstance(target, bpy.types.Object):
+                graph.add(
+                    target_node(target, subtarget, world_objects),
+                    owner,
+                    f"constraint:{constraint.type}",
+                )
+
+
+def add_driver_edges(
+    graph: dependency_graph.DependencyGraph,
+    obj: bpy.types.Object,
+    world_objects: Set[bpy.types.Object],
+) -> None:
+    if obj.animation_data is None:
+        return
+    # One edge per driven bone or object and source, whatever the number of
+    # drivers and variables: a property has at most one driver
+    edges: Dict[Tuple[str, str], None] = {}
+    for fcurve in obj.animation_data.drivers:
+        if fcurve.mute:
+            continue
+        match = pose_bone_data_path_pattern.match(fcurve.data_path)
+        if obj.type == "ARMATURE" and match is not None:
+            owner = bone_node(obj, match.groups()[0])
+        else:
+            owner = object_node(obj)
+        for var in fcurve.driver.variables:
+            for target in var.targets:
+                target_id = target.id
+                if not isinstance(target_id, bpy.types.Object):
+                    continue
+                if var.type in TRANSFORM_VARIABLE_TYPES:
+                    bone_name = target.bone_target
+                else:
+                    path_match = pose_bone_data_path_pattern.match(target.data_path)
+                    bone_name = path_match.groups()[0] if path_match else ""
+                edges[target_node(target_id, bone_name, world_objects), owner] = None
+    for source, owner in edges:
+        graph.add(source, owner, "driver")
+
+
+def build_graph(scene: bpy.types.Scene) -> dependency_graph.DependencyGraph:
+    """
+    Dependencies of the rigged armatures of `scene` and of the objects of its
+    rigid body world.
+    """
+
+    graph = dependency_graph.DependencyGraph()
+    armatures = chains.rigged_armatures(scene)
+    world = scene.rigidbody_world
+    world_objects: Set[bpy.types.Object] = set()
+    joint_objects: Set[bpy.types.Object] = set()
+    if world is not None:
+        if world.collection is not None:
+            world_objects.update(world.collection.all_objects)
+        if world.constraints is not None:
+            joint_objects.update(world.constraints.all_objects)
+
+    for armature in armatures:
+        for pose_bone in armature.pose.bones:
+            node = bone_node(armature, pose_bone.name)
+            graph.edges.setdefault(node, {})
+            if pose_bone.parent is not None:
+                graph.add(bone_node(armature, pose_bone.parent.name), node, "parent")
+            add_constraint_edges(graph, node, pose_bone.constraints, world_objects)
+
+    objects = set(armatures) | world_objects | joint_objects
+    for obj in sorted(objects, key=lambda o: o.name):
+        add_driver_edges(graph, obj, world_objects)
+        if obj.type == "ARMATURE":
+            continue
+        node = object_node(obj)
+        graph.edges.setdefault(node, {})
+        if obj.parent is not None:
+            bone_name = obj.parent_bone if obj.parent_type == "BONE" else ""
+            graph.add(target_node(obj.parent, bone_name, world_objects), node, "parent")
+        add_constraint_edges(graph, node, obj.constraints, world_objects)
+
+    if world is not None:
+        world_node = f"world:{scene.name}"
+        for obj in world_objects:
+            rigid_body = obj.rigid_body
+            if rigid_body is None:
+                continue
+            # Bodies which may be kinematic feed their transform to the step
+            if (
+                rigid_body.type == "PASSIVE"
+                or rigid_body.kinematic
+                or (
+                    obj.animation_data is not None
+                    and obj.animation_data.drivers.find("rigid_body.kinematic")
+                    is not None
+                )
+            ):
+                graph.add(object_node(obj), world_node, "rigid_body")
+            if rigid_body.type == "ACTIVE":
+                graph.add(world_node, f"sim:{obj.name}", "simulation")
+        for obj in joint_objects:
+            graph.add(object_node(obj), world_node, "joint")
+    return graph
+
+
+def analyze(scene: bpy.types.Scene) -> Dict[str, object]:
+    """
+    Machine readable report of the dependencies of `scene`.
+    """
+
+    graph = build_graph(scene)
+    cycles = dependency_graph.strongly_connected_components(graph)
+    trips = dependency_graph.round_trips(graph)
+    redundant = dependency_graph.redundant_edges(graph)
+    return {
+        "version": REPORT_VERSION,
+        "file": bpy.data.filepath,
+        "scene": scene.name,
+        "nodes": len(graph.edges),
+        "edges": graph.edge_count(),
+        "cycles": [
+            {
+                "nodes": component,
+                "edges": [
+                    {"source": s, "target": t, "kinds": graph.edges[s][t]}
+                    for s in component
+                    for t in graph.edges[s]
+                    if t in component
+                ],
+            }
+            for component in cycles
+        ],
+        "round_trips": trips,
+        "redundant_edges": redundant,
+    }
+
+
+def finding_count(report: Dict[str, object], key: str) -> int:
+    """
+    Number of the cycles, round trips or redundant edges `key` of `report`.
+    """
+
+    findings = report[key]
+    assert isinstance(findings, list)
+    return len(findings)
+
+
+def summary(report: Dict[str, object]) -> str:
+    return (
+        f"{finding_count(report, 'cycles')} cycles, "
+        + f"{finding_count(report, 'round_trips')} round trips, "
+        + f"{finding_count(report, 'redundant_edges')} redundant edges "
+        + f"in {report['nodes']} nodes"
+    )
+
+
+# Headless command
+#################################################
+
+FAIL_CHECKS = ("cycles", "round_trips", "redundant_edges")
+
+
+def parse_args(argv: Sequence[str], scene: bpy.types.Scene) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="yurerig_dependencies",
+        description="Report the dependency cycles, round trips and redundant "
+        + "edges of the YureRig rigs of a scene as JSON.",
+    )
+    parser.add_argument("--output", help="JSON file (default: standard output).")
+    parser.add_argument(
+        "--fail-on",
+        default="cycles",
+        help="Comma separated checks which make the exit status 1: "
+        + ", ".join(FAIL_CHECKS)
+        + " (default: cycles).",
+    )
+    return parser.parse_args(argv)
+
+
+def command(args: argparse.Namespace, scene: bpy.types.Scene) -> None:
+    checks = [c for c in args.fail_on.split(",") if c != ""]
+    unknown = [c for c in checks if c not in FAIL_CHECKS]
+    if len(unknown) > 0:
+        sys.exit("unknown checks: " + ", ".join(unknown))
+
+    report = analyze(scene)
+    headless.write_report(report, args.output, summary(report))
+    failed = [c for c in checks if finding_count(report, c) > 0]
+    if len(failed) > 0:
+        print(f"YureRig: dependency check failed: {', '.join(failed)}")
+        sys.exit(1)
+
+
+# Operators
+#################################################
+
+
+def analyze_dependencies(
+    operator: bpy.types.Operator, context: bpy.types.Context
+) -> Set[str]:
+    """
+    Implementation of `YURERIG_OT_AnalyzeDependenciesOperator`.
+    """
+
+    report = analyze(context.scene)
+    headless.store_report(report, TEXT_NAME)
+
+    level = "WARNING" if finding_count(report, "cycles") > 0 else "INFO"
+    operator.report(
+        {level},
+        f"Success Analyze Dependencies: {summary(report)}, see the text {TEXT_NAME}",
+    )
+    return {"FINISHED"}
@@ -0,0 +1,239 @@
+from typing import Dict, Iterator, List, Set, Tuple
+
+# Dependency graph of the rigged armatures, the rigid bodies, goals, roots and
+# joints of a scene, and the checks of `dependencies.analyze`.
+#
+# This module only depends on the standard library, so the checks can be run
+# on graphs built from plans with plain CPython. The YureRig package imports
+# bpy, so load this file by path outside of Blender (see `tests/`).
+#
+# Nodes are named `<kind>:<name>`:
+#
+# - `bone:<armature>/<bone>`: a pose bone, after its parent, constraints and
+#   drivers,
+# - `object:<object>`: the transform of an object from its parent, constraints
+#   and drivers, which is the input of the rigid body world for passive and
+#   kinematic bodies, goals and joints,
+# - `sim:<object>`: the simulated transform of an active rigid body,
+# - `world:<scene>`: the rigid body world step.
+
+# Same prefixes as in `chains`, which imports bpy
+PHYS_PREFIX = "PHYS_YURERIG_"
+RIGIDBODY_PREFIX = "RIGIDBODY_YURERIG_"
+
+
+def owner_of(node: str) -> str:
+    """
+    Name of the object, or world, a node belongs to.
+    """
+
+    kind, name = node.split(":", 1)
+    if kind == "bone":
+        return name.split("/", 1)[0]
+    if kind == "world":
+        return node
+    return name
+
+
+class DependencyGraph:
+    """
+    Edges from the node a dependency is read from to the node depending on it,
+    with the kinds of all relations creating the edge.
+    """
+
+    __slots__ = ("edges",)
+
+    def __init__(self) -> None:
+        self.edges: Dict[str, Dict[str, List[str]]] = {}
+
+    def add(self, source: str, target: str, kind: str) -> None:
+        self.edges.setdefault(target, {})
+        self.edges.setdefault(source, {}).setdefault(target, []).append(kind)
+
+    def nodes(self) -> List[str]:
+        return list(self.edges)
+
+    def edge_count(self) -> int:
+        return sum(len(targets) for targets in self.edges.values())
+
+
+def strongly_connected_components(graph: DependencyGraph) -> List[List[str]]:
+    """
+    Components of more than one node, or of one node with an edge to itself,
+    by Tarjan's algorithm without recursion.
+    """
+
+    index: Dict[str, int] = {}
+    lowlink: Dict[str, int] = {}
+    on_stack: Set[str] = set()
+    stack: List[str] = []
+    components: List[List[str]] = []
+    counter = 0
+
+    for root in graph.edges:
+        if root in index:
+            continue
+        work: List[Tuple[str, Iterator[str]]] = [(root, iter(graph.edges[root]))]
+        index[root] = lowlink[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack.add(root)
+        while len(work) > 0:
+            node, successors = work[-1]
+            advanced = False
+            for successor in successors:
+                if successor not in index:
+                    index[successor] = lowlink[successor] = counter
+                    counter += 1
+                    stack.append(successor)
+                    on_stack.add(successor)
+                    work.append((successor, iter(graph.edges[successor])))
+                    advanced = True
+                    break
+                if successor in on_stack:
+                    lowlink[node] = min(lowlink[node], index[successor])
+            if advanced:
+                continue
+            work.pop()
+            if len(work) > 0:
+                parent = work[-1][0]
+                lowlink[parent] = min(lowlink[parent], lowlink[node])
+            if lowlink[node] == index[node]:
+                component: List[str] = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.append(member)
+                    if member == node:
+                        break
+                if len(component) > 1 or node in graph.edges[node]:
+                    components.append(sorted(component))
+    return components
+
+
+def reachable(edges: Dict[str, Dict[str, List[str]]], starts: Set[str]) -> Set[str]:
+    seen = set(starts)
+    queue = list(starts)
+    while len(queue) > 0:
+        for successor in edges.get(queue.pop(), {}):
+            if successor not in seen:
+                seen.add(successor)
+                queue.append(successor)
+    return seen
+
+
+def expected_entry(node: str, sources: List[str]) -> bool:
+    """
+    Whether the bone `node` is the PHYS_YURERIG_ bone of a chain, entered from
+    outside of its armature only by the simulated transform of its own rigid
+    body.
+    """
+
+    bone_name = node.split("/", 1)[1]
+    if not bone_name.startswith(PHYS_PREFIX):
+        return False
+    body = f"sim:{RIGIDBODY_PREFIX}{bone_name[len(PHYS_PREFIX) :]}"
+    return all(source == body for source in sources)
+
+
+def round_trips(graph: DependencyGraph) -> List[Dict[str, object]]:
+    """
+    For each armature whose bones depend on other objects depending on its
+    bones: the objects in between and the bones the trip leaves from and comes
+    back to.
+
+    Every chain leaves its armature to its goals or kinematic bodies and comes
+    back through its rigid bodies to its PHYS_YURERIG_ bones, which the DEF
+    bones follow. Trips only coming back that way, to bones none of the bones
+    they leave from depend on, are expected and not listed.
+    """
+
+    reverse: Dict[str, Dict[str, List[str]]] = {}
+    for source, targets in graph.edges.items():
+        for target, kinds in targets.items():
+            reverse.setdefault(target, {})[source] = kinds
+
+    bones_by_armature: Dict[str, Set[str]] = {}
+    for node in graph.edges:
+        if node.startswith("bone:"):
+            bones_by_armature.setdefault(owner_of(node), set()).add(node)
+
+    trips: List[Dict[str, object]] = []
+    for armature, bones in sorted(bones_by_armature.items()):
+        between = {
+            node
+            for node in reachable(graph.edges, bones) & reachable(reverse, bones)
+            if owner_of(node) != armature
+        }
+        if len(between) == 0:
+            continue
+        exits = sorted(
+            {
+                node
+                for node in bones
+                if any(t in between for t in graph.edges.get(node, {}))
+            }
+        )
+        entries = sorted(
+            {node for node in bones if any(s in between for s in reverse.get(node, {}))}
+        )
+        if all(
+            expected_entry(node, [s for s in reverse[node] if s in between])
+            for node in entries
+        ) and reachable(graph.edges, set(entries)).isdisjoint(exits):
+            continue
+        trips.append(
+            {
+                "armature": armature,
+                "objects": sorted({owner_of(node) for node in between}),
+                "exit_bones": exits,
+                "entry_bones": entries,
+            }
+        )
+    return trips
+
+
+def redundant_edges(graph: DependencyGraph) -> List[Dict[str, object]]:
+    """
+    Edges created several times by relations of the same kind, and edges
+    implied by a path of two edges of the same kind through another node, such
+    as a parent edge implied by parent edges.
+
+    Relations of different kinds carry different data: the location and
+    rotation constraints of a goal, or a driver reading the slider of a bone
+    whose parent reads it too, are not redundant.
+    """
+
+    redundant: List[Dict[str, object]] = []
+    for source, targets in graph.edges.items():
+        for target, kinds in targets.items():
+            duplicates = sorted({kind for kind in kinds if kinds.count(kind) > 1})
+            if len(duplicates) > 0:
+                redundant.append(
+                    {
+                        "source": source,
+                        "target": target,
+                        "kinds": duplicates,
+                        "reason": "duplicate",
+                    }
+                )
+        for middle, first_kinds in targets.items():
+            if middle == source:
+                continue
+            for target, second_kinds in graph.edges.get(middle, {}).items():
+                if target == middle or target == source or target not in targets:
+                    continue
+                kinds = sorted(
+                    set(targets[target]) & set(first_kinds) & set(second_kinds)
+                )
+                if len(kinds) > 0:
+                    redundant.append(
+                        {
+                            "source": source,
+                            "target": target,
+                            "kinds": kinds,
+                            "reason": "implied",
+                            "via": middle,
+                        }
+                    )
+    return redundant
@@ -0,0 +1,701 @@
+import argparse
+import hashlib
+import os
+import re
+from array import array
+from contextlib import ExitStack
+from typing import (
+    AbstractSet,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+import bpy
+import numpy as np
+from mathutils import Matrix
+
+from . import bake_cache, playback, sim_cache
+
+HASH_VERSION = b"yurerig-simulation-hash-3"
+
+# UI state which does not affect the simulation.
+UNHASHED_PROPERTIES = {"rna_type", "active", "show_expanded"}
+
+# Pose channels of bones hashed with `foreach_get`, with their sizes
+POSE_CHANNELS = (
+    ("location", 3),
+    ("rotation_quaternion", 4),
+    ("rotation_euler", 3),
+    ("rotation_axis_angle", 4),
+    ("scale", 3),
+)
+
+is_phys_bone_pattern = re.compile(r"^PHYS_YURERIG_.+")
+# Bones driven by the simulation, which do not affect it
+is_output_bone_pattern = re.compile(r"^(?:PHYS|DEF)_YURERIG_.+")
+pose_bone_path_pattern = re.compile(r'^pose\.bones\["([^"]+)"\]')
+pose_channel_pattern = re.compile(r'^pose\.bones\["([^"]+)"\]\.(\w+)$')
+
+# Baked playback writes its caches to this subdirectory of the farm cache
+# directory, so baking never overwrites a cache prepared for render nodes.
+PLAYBACK_DIRECTORY_NAME = "playback"
+
+
+def rigged_armatures(scene: bpy.types.Scene) -> List[bpy.types.Object]:
+    """
+    Armatures of `scene` which have YureRig PHYS_YURERIG_ bones.
+    """
+
+    return [
+        obj
+        for obj in scene.objects
+        if obj.type == "ARMATURE"
+        and any(is_phys_bone_pattern.match(b.name) for b in obj.data.bones)
+    ]
+
+
+def phys_bone_names(armature: bpy.types.Object) -> List[str]:
+    return [b.name for b in armature.data.bones if is_phys_bone_pattern.match(b.name)]
+
+
+def cache_directory(scene: bpy.types.Scene) -> str:
+    return str(bpy.path.abspath(scene.yurerig.farm_cache_directory))
+
+
+def playback_directory(scene: bpy.types.Scene) -> str:
+    return os.path.join(cache_directory(scene), PLAYBACK_DIRECTORY_NAME)
+
+
+def cache_path(directory: str, armature: bpy.types.Object) -> str:
+    return os.path.join(
+        directory, bpy.path.clean_name(armature.name) + bake_cache.FILE_EXTENSION
+    )
+
+
+def simulation_start(scene: bpy.types.Scene) -> int:
+    return int(scene.rigidbody_world.point_cache.frame_start)
+
+
+# Simulation hash
+#################################################
+
+
+def _update_floats(h: "hashlib._Hash", values: Iterable[float]) -> None:
+    h.update(array("d", values).tobytes())
+
+
+def _update_collection(
+    h: "hashlib._Hash", collection: bpy.types.bpy_prop_collection, attr: str, size: int
+) -> None:
+    values = array("f", [0.0]) * (len(collection) * size)
+    collection.foreach_get(attr, values)
+    h.update(values.tobytes())
+
+
+def _update_values(
+    h: "hashlib._Hash",
+    values: Iterable[float],
+    path: str,
+    animated: AbstractSet[Tuple[str, int]],
+) -> None:
+    """
+    Hash the array property `path`, leaving out the animated items, whose
+    F-curves are hashed instead.
+    """
+
+    _update_floats(
+        h, (0.0 if (path, i) in animated else v for i, v in enumerate(values))
+    )
+
+
+def _update_rna(
+    h: "hashlib._Hash",
+    struct: Optional[bpy.types.bpy_struct],
+    animated: AbstractSet[Tuple[str, int]] = frozenset(),
+    prefix: str = "",
+    overrides: Optional[Dict[str, object]] = None,
+) -> None:
+    """
+    Hash every writable RNA property of `struct` whose data path from its ID is
+    `prefix` followed by the property name.
+    Pointers are hashed by name, collections and animated properties are
+    skipped, and `overrides` replace the stored values.
+    """
+
+    if struct is None:
+        h.update(b"None")
+        return
+    for prop in struct.bl_rna.properties:
+        identifier = prop.identifier
+        if (
+            identifier in UNHASHED_PROPERTIES
+            or prop.is_readonly
+            or prop.type == "COLLECTION"
+        ):
+            continue
+        path = prefix + identifier
+        if overrides is not None and identifier in overrides:
+            value = overrides[identifier]
+        elif prop.type == "POINTER":
+            value = getattr(getattr(struct, identifier), "name", None)
+        elif getattr(prop, "is_array", False):
+            value = tuple(
+                None if (path, i) in animated else v
+                for i, v in enumerate(getattr(struct, identifier))
+            )
+        elif (path, 0) in animated:
+            continue
+        else:
+            value = getattr(struct, identifier)
+        h.update(f"{identifier}={value!r};".encode("utf-8"))
+
+
+def _update_fcurves(
+    h: "hashlib._Hash", fcurves: Iterable[bpy.types.FCurve]
+) -> Set[Tuple[str, int]]:
+    """
+    Hash the keys and modifiers of `fcurves` and return their data paths and
+    array indices.
+    The mute state of `rigid_body.enabled` F-curves is left out, since baked
+    playback mutes them while it plays.
+    """
+
+    paths: Set[Tuple[str, int]] = set()
+    for fcurve in fcurves:
+        data_path = fcurve.data_path
+        paths.add((data_path, fcurve.array_index))
+        h.update(f"{data_path}[{fcurve.array_index}]".encode("utf-8"))
+        mute = fcurve.mute and data_path != "rigid_body.enabled"
+        h.update(f"{mute}{fcurve.extrapolation}".encode("utf-8"))
+        points = fcurve.keyframe_points
+        for attr in ("co", "handle_left", "handle_right"):
+            _update_collection(h, points, attr, 2)
+        # Enum properties do not support `foreach_get`.
+        h.update("".join(p.interpolation for p in points).encode("utf-8"))
+        for modifier in fcurve.modifiers:
+            _update_rna(h, modifier)
+    return paths
+
+
+# Digests of the F-curves of actions and their animated data paths by action
+# name, along with the numbers of F-curves and keys they were computed for.
+# Entries are dropped by `forget_actions` when an action is updated.
+action_digests: Dict[str, Tuple[Tuple[int, int], bytes, FrozenSet[Tuple[str, int]]]] = (
+    {}
+)
+
+
+def _action_digest(
+    action: bpy.types.Action,
+) -> Tuple[bytes, FrozenSet[Tuple[str, int]]]:
+    fcurves = action.fcurves
+    size = (len(fcurves), sum(len(f.keyframe_points) for f in fcurves))
+    cached = action_digests.get(action.name)
+    if cached is not None and cached[0] == size:
+        return cached[1], cached[2]
+    h = hashlib.sha256()
+    paths = frozenset(_update_fcurves(h, fcurves))
+    action_digests[action.name] = (size, h.digest(), paths)
+    return h.digest(), paths
+
+
+def forget_actions(actions: Iterable[bpy.types.ID]) -> None:
+    """
+    Drop the digests of the edited `actions`.
+    """
+
+    for action in actions:
+        action_digests.pop(action.name, None)
+
+
+def _update_animation(
+    h: "hashlib._Hash", id_data: bpy.types.ID
+) -> Set[Tuple[str, int]]:
+    """
+    Hash the action and drivers of `id_data` and return the animated data
+    paths and array indices. Drivers of the DEF_YURERIG_ bones are left out.
+    """
+
+    animated: Set[Tuple[str, int]] = set()
+    animation_data = id_data.animation_data
+    if animation_data is None:
+        return animated
+    if animation_data.action is not None:
+        digest, paths = _action_digest(animation_data.action)
+        h.update(digest)
+        animated.update(paths)
+    for fcurve in animation_data.drivers:
+        match = pose_bone_path_pattern.match(fcurve.data_path)
+        if match is not None and is_output_bone_pattern.match(match.groups()[0]):
+            continue
+        animated.update(_update_fcurves(h, (fcurve,)))
+        driver = fcurve.driver
+        h.update(f"{driver.type}:{driver.expression}".encode("utf-8"))
+        for var in driver.variables:
+            h.update(f"{var.name}:{var.type}".encode("utf-8"))
+            for target in var.targets:
+                h.update(
+                    f"{getattr(target.id, 'name', None)}:{target.data_path}:"
+                    f"{target.bone_target}:{target.transform_type}:"
+                    f"{target.transform_space}:{target.rotation_mode}".encode("utf-8")
+                )
+    return animated
+
+
+def _update_object(
+    h: "hashlib._Hash", obj: bpy.types.Object, enabled: Dict[str, bool]
+) -> Set[Tuple[str, int]]:
+    """
+    Hash `obj` and return its animated data paths and array indices.
+    `enabled` holds the rigid body states baked playback replaced.
+    """
+
+    animated = _update_animation(h, obj)
+    h.update(f"{obj.name}:{obj.rotation_mode}".encode("utf-8"))
+    for attr, _ in POSE_CHANNELS:
+        _update_values(h, getattr(obj, attr), attr, animated)
+    h.update(getattr(obj.parent, "name", "").encode("utf-8"))
+    h.update(f"{obj.parent_type}{obj.parent_bone}".encode("utf-8"))
+    for row in obj.matrix_parent_inverse:
+        _update_floats(h, row)
+    if obj.type == "MESH":
+        _update_collection(h, obj.data.vertices, "co", 3)
+    _update_rna(
+        h,
+        obj.rigid_body,
+        animated,
+        "rigid_body.",
+        {"enabled": enabled[obj.name]} if obj.name in enabled else None,
+    )
+    _update_rna(h, obj.rigid_body_constraint, animated, "rigid_body_constraint.")
+    for constraint in obj.constraints:
+        _update_rna(h, constraint, animated, f'constraints["{constraint.name}"].')
+    return animated
+
+
+def _update_pose(
+    h: "hashlib._Hash",
+    pose_bones: bpy.types.bpy_prop_collection,
+    animated: AbstractSet[Tuple[str, int]],
+) -> None:
+    """
+    Hash the pose and constraints of every bone but the PHYS_YURERIG_ and
+    DEF_YURERIG_ bones, which are simulation output and are overwritten by
+    baked playback. Animated channels are left out.
+    """
+
+    names = [b.name for b in pose_bones]
+    indices = {name: i for i, name in enumerate(names)}
+    output = [i for i, name in enumerate(names) if is_output_bone_pattern.match(name)]
+    masked: Dict[str, List[Tuple[int, int]]] = {}
+    for path, index in animated:
+        match = pose_channel_pattern.match(path)
+        if match is not None and match.groups()[0] in indices:
+            bone, attr = match.groups()
+            masked.setdefault(attr, []).append((indices[bone], index))
+
+    for attr, size in POSE_CHANNELS:
+        values = np.empty((len(names), size), dtype=np.float32)
+        pose_bones.foreach_get(attr, values.ravel())
+        values[output] = 0.0
+        for row, column in masked.get(attr, []):
+            values[row, column] = 0.0
+        h.update(values.tobytes())
+
+    output_names = {names[i] for i in output}
+    for pose_bone in pose_bones:
+        if pose_bone.name in output_names:
+            continue
+        h.update(f"{pose_bone.name}:{pose_bone.rotation_mode}".encode("utf-8"))
+        prefix = f'pose.bones["{pose_bone.name}"].constraints'
+        for constraint in pose_bone.constraints:
+            _update_rna(h, constraint, animated, f'{prefix}["{constraint.name}"].')
+
+
+def _playback_rigidbodies(armatures: Iterable[bpy.types.Object]) -> Dict[str, bool]:
+    """
+    Enabled states of the rigid bodies disabled by baked playback, stored on
+    `armatures`, so a hash computed while playing back matches the rig.
+    """
+
+    enabled: Dict[str, bool] = {}
+    for armature in armatures:
+        if playback.PLAYBACK_STATE_PROPERTY in armature:
+            state = armature[playback.PLAYBACK_STATE_PROPERTY].to_dict()
+            for name, value in state["rigidbodies"].items():
+                enabled[name] = bool(value)
+    return enabled
+
+
+def compute_simulation_hash(
+    scene: bpy.types.Scene, frame_start: int, frame_end: int
+) -> str:
+    """
+    Compute a hash over everything that affects the rigid body simulation of
+    `scene` between `frame_start` and `frame_end`: the rigid body world
+    settings, every object in the rigid body world, the rigged armatures and
+    their animation. The simulated PHYS_YURERIG_ and DEF_YURERIG_ bones are
+    left out.
+
+    Only stored properties and F-curves are hashed, with animated properties
+    hashed through their F-curves, so the hash does not depend on the current
+    frame and needs no frame change. Actions are digested once until they are
+    edited.
+    """
+
+    h = hashlib.sha256(HASH_VERSION)
+    h.update(f"{frame_start}:{frame_end}".encode("utf-8"))
+    h.update(f"{scene.render.fps}/{scene.render.fps_base}".encode("utf-8"))
+    animated = _update_animation(h, scene)
+    _update_values(h, scene.gravity, "gravity", animated)
+    h.update(f"{scene.use_gravity}".encode("utf-8"))
+
+    world = scene.rigidbody_world
+    _update_rna(h, world, animated, "rigidbody_world.")
+    h.update(
+        f"{world.point_cache.frame_start}:{world.point_cache.frame_end}".encode("utf-8")
+    )
+
+    objects: Set[bpy.types.Object] = set()
+    for collection in (world.collection, world.constraints):
+        if collection is not None:
+            objects.update(collection.all_objects)
+    armatures = rigged_armatures(scene)
+    objects.update(armatures)
+    for obj in list(objects):
+        parent = obj.parent
+        while parent is not None:
+            objects.add(parent)
+            parent = parent.parent
+        for constraint in obj.constraints:
+            target = getattr(constraint, "target", None)
+            if target is not None:
+                objects.add(target)
+
+    enabled = _playback_rigidbodies(armatures)
+    animated_paths = {
+        obj.name: _update_object(h, obj, enabled)
+        for obj in sorted(objects, key=lambda o: o.name)
+    }
+
+    for armature in sorted(armatures, key=lambda o: o.name):
+        bones = armature.data.bones
+        h.update("\n".join(b.name for b in bones).encode("utf-8"))
+        h.update(
+            "\n".join(getattr(b.parent, "name", "") for b in bones).encode("utf-8")
+        )
+        _update_collection(h, bones, "matrix_local", 16)
+        _update_collection(h, bones, "use_connect", 1)
+        _update_pose(h, armature.pose.bones, animated_paths[armature.name])
+        _update_animation(h, armature.data)
+
+    return h.hexdigest()
+
+
+# Prepare
+#################################################
+
+
+class PhysBoneSampler:
+    """
+    Sample the evaluated local rotation of PHYS_YURERIG_ bones as quaternions.
+    """
+
+    def __init__(self, armature: bpy.types.Object, bone_names: List[str]):
+        self.armature = armature
+        self.bone_names = bone_names
+        self.rest_offsets: List[Matrix] = []
+        for name in bone_names:
+            bone = armature.data.bones[name]
+            if bone.parent is None:
+                self.rest_offsets.append(bone.matrix_local.inverted())
+            else:
+                self.rest_offsets.append(
+                    (bone.parent.matrix_local.inverted() @ bone.matrix_local).inverted()
+                )
+        self.values = array("f", [0.0]) * (len(bone_names) * bake_cache.CHANNELS)
+
+    def sample(self, depsgraph: bpy.types.Depsgraph) -> "array[float]":
+        pose_bones = self.armature.evaluated_get(depsgraph).pose.bones
+        values = self.values
+        for i, name in enumerate(self.bone_names):
+            pose_bone = pose_bones[name]
+            if pose_bone.parent is None:
+                basis = self.rest_offsets[i] @ pose_bone.matrix
+            else:
+                basis = (
+                    self.rest_offsets[i]
+                    @ pose_bone.parent.matrix.inverted()
+                    @ pose_bone.matrix
+                )
+            values[i * 4 : i * 4 + 4] = array("f", basis.to_quaternion())
+        return values
+
+
+def prepare(
+    scene: bpy.types.Scene,
+    directory: str,
+    frame_start: int,
+    frame_end: int,
+    use_farm_cache: bool = True,
+    use_simulation_cache: bool = True,
+) -> List[str]:
+    """
+    Simulate the rigid body world of `scene` once and write the PHYS_YURERIG_
+    bone rotations of every rigged armature between `frame_start` and
+    `frame_end` to `directory`.
+    When `use_farm_cache` is set, render nodes will play the cache back.
+    When `use_simulation_cache` is set and the simulation cache is enabled, a
+    matching entry is copied instead of simulating, and a new simulation is
+    stored there.
+    Return written file paths.
+    """
+
+    if scene.rigidbody_world is None:
+        raise bake_cache.BakeCacheError("Scene has no rigid body world")
+    armatures = rigged_armatures(scene)
+    if len(armatures) == 0:
+        raise bake_cache.BakeCacheError("No YureRig armature in scene")
+
+    playback.deactivate(scene)
+    os.makedirs(directory, exist_ok=True)
+
+    rig_hash = compute_simulation_hash(scene, frame_start, frame_end)
+
+    cache_settings = sim_cache.settings() if use_simulation_cache else None
+    if cache_settings is not None:
+        cached = sim_cache.fetch(cache_settings, rig_hash, directory)
+        if cached is not None and sorted(cached) == sorted(
+            cache_path(directory, armature) for armature in armatures
+        ):
+            if use_farm_cache:
+                scene.yurerig.use_farm_cache = True
+            return cached
+
+    sim_start = min(simulation_start(scene), frame_start)
+    scene.frame_set(sim_start)
+    paths: List[str] = []
+    with ExitStack() as stack:
+        outputs = []
+        for armature in armatures:
+            bone_names = phys_bone_names(armature)
+            header = bake_cache.BakeCacheHeader(
+                armature.name, rig_hash, frame_start, frame_end, bone_names
+            )
+            path = cache_path(directory, armature)
+            writer = stack.enter_context(bake_cache.BakeCacheWriter(path, header))
+            outputs.append((PhysBoneSampler(armature, bone_names), writer))
+            paths.append(path)
+
+        for frame in range(sim_start, frame_end + 1):
+            scene.frame_set(frame)
+            if frame < frame_start:
+                continue
+            depsgraph = bpy.context.evaluated_depsgraph_get()
+            for sampler, writer in outputs:
+                writer.write_frame(sampler.sample(depsgraph))
+
+    if cache_settings is not None:
+        sim_cache.store(cache_settings, rig_hash, paths)
+    if use_farm_cache:
+        scene.yurerig.use_farm_cache = True
+    return paths
+
+
+# Load
+#################################################
+
+
+def load(scene: bpy.types.Scene, directory: str, verify: bool = True) -> List[str]:
+    """
+    Load the caches of `scene` from `directory` read-only and play them back
+    instead of simulating.
+    Return names of the loaded armatures.
+    """
+
+    playback.deactivate(scene)
+    armatures = rigged_armatures(scene)
+    readers: List[bake_cache.BakeCacheReader] = []
+    try:
+        for armature in armatures:
+            readers.append(bake_cache.BakeCacheReader(cache_path(directory, armature)))
+    except OSError as e:
+        for reader in readers:
+            reader.close()
+        raise bake_cache.BakeCacheError(f"Missing cache file: {e.filename}") from e
+
+    rig_hash = readers[0].header.rig_hash if len(readers) > 0 else None
+    if verify and len(readers) > 0:
+        header = readers[0].header
+        rig_hash = compute_simulation_hash(scene, header.frame_start, header.frame_end)
+        stale = [r.header.armature for r in readers if r.header.rig_hash != rig_hash]
+        if len(stale) > 0:
+            for reader in readers:
+                reader.close()
+            raise bake_cache.BakeCacheError(
+                "Cache does not match the current rig or animation: " + ", ".join(stale)
+            )
+
+    playback.activate(scene, list(zip(armatures, readers)), rig_hash)
+    return [armature.name for armature in armatures]
+
+
+def load_cached(scene: bpy.types.Scene) -> Optional[List[str]]:
+    """
+    Play back the simulation cache entry matching the current rig and
+    animation of `scene` over the scene frame range, if there is one.
+    Playback of a cache which no longer matches is stopped.
+    Return names of the loaded armatures.
+    """
+
+    cache_settings = sim_cache.settings()
+    if (
+        cache_settings is None
+        or scene.rigidbody_world is None
+        or len(rigged_armatures(scene)) == 0
+    ):
+        return None
+    rig_hash = compute_simulation_hash(scene, scene.frame_start, scene.frame_end)
+    if playback.is_active():
+        if playback.rig_hash == rig_hash:
+            return None
+        # The rig or animation was edited since the cache was loaded
+        playback.deactivate(scene)
+    entry = sim_cache.lookup(cache_settings.root, rig_hash)
+    if entry is None:
+        return None
+    try:
+        return load(scene, entry, verify=False)
+    except bake_cache.BakeCacheError as e:
+        print(f"YureRig: simulation cache entry not loaded: {e}")
+        return None
+
+
+# Headless command
+#################################################
+
+
+def parse_args(argv: Sequence[str], scene: bpy.types.Scene) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="yurerig_farm",
+        description="Prepare or load YureRig simulation caches for render farms.",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    prepare_parser = subparsers.add_parser(
+        "prepare", help="Simulate once and write the cache next to the .blend file."
+    )
+    prepare_parser.add_argument("--frame-start", type=int)
+    prepare_parser.add_argument("--frame-end", type=int)
+    prepare_parser.add_argument("--directory")
+    prepare_parser.add_argument(
+        "--save", action="store_true", help="Save the .blend file afterwards."
+    )
+
+    load_parser = subparsers.add_parser(
+        "load", help="Play the cache back instead of simulating."
+    )
+    load_parser.add_argument("--directory")
+    load_parser.add_argument(
+        "--no-verify", action="store_true", help="Skip the rig hash check."
+    )
+    return parser.parse_args(argv)
+
+
+def command(args: argparse.Namespace, scene: bpy.types.Scene) -> None:
+    directory = (
+        bpy.path.abspath(args.directory)
+        if args.directory is not None
+        else cache_directory(scene)
+    )
+
+    if args.command == "prepare":
+        frame_start = (
+            args.frame_start if args.frame_start is not None else scene.frame_start
+        )
+        frame_end = args.frame_end if args.frame_end is not None else scene.frame_end
+        paths = prepare(scene, directory, frame_start, frame_end)
+        for path in paths:
+            print(f"YureRig: wrote {path}")
+        if args.save:
+            bpy.ops.wm.save_mainfile()
+    else:
+        names = load(scene, directory, verify=not args.no_verify)
+        print(f"YureRig: loaded cache for {', '.join(names)} from {directory}")
+
+
+# Operators
+#################################################
+
+
+def prepare_farm_cache(
+    operator: bpy.types.Operator, context: bpy.types.Context
+) -> Set[str]:
+    """
+    Implementation of `YURERIG_OT_PrepareFarmCacheOperator`.
+    """
+
+    scene = context.scene
+    directory = cache_directory(scene)
+    frame_current = scene.frame_current
+    try:
+        paths = prepare(scene, directory, scene.frame_start, scene.frame_end)
+    except bake_cache.BakeCacheError as e:
+        operator.report({"ERROR"}, str(e))
+        return {"CANCELLED"}
+    finally:
+        scene.frame_set(frame_current)
+
+    operator.report(
+        {"INFO"},
+        f"Success Prepare for Farm: wrote {len(paths)} caches "
+        + f"of frames {scene.frame_start}-{scene.frame_end} to {directory}",
+    )
+    return {"FINISHED"}
+
+
+def load_farm_cache(
+    operator: bpy.types.Operator, context: bpy.types.Context
+) -> Set[str]:
+    """
+    Implementation of `YURERIG_OT_LoadFarmCacheOperator`.
+    """
+
+    scene = context.scene
+    try:
+        names = load(scene, cache_directory(scene))
+    except bake_cache.BakeCacheError as e:
+        operator.report({"ERROR"}, str(e))
+        return {"CANCELLED"}
+
+    operator.report({"INFO"}, f"Success Load Farm Cache: {', '.join(names)}")
+    return {"FINISHED"}
+
+
+def bake_playback(operator: bpy.types.Operator, context: bpy.types.Context) -> Set[str]:
+    """
+    Implementation of `YURERIG_OT_BakePlaybackOperator`.
+    """
+
+    scene = context.scene
+    directory = playback_directory(scene)
+    frame_current = scene.frame_current
+    try:
+        prepare(
+            scene, directory, scene.frame_start, scene.frame_end, use_farm_cache=False
+        )
+        names = load(scene, directory, verify=False)
+    except bake_cache.BakeCacheError as e:
+        operator.report({"ERROR"}, str(e))
+        return {"CANCELLED"}
+    finally:
+        scene.frame_set(frame_current)
+
+    operator.report({"INFO"}, f"Success Bake Playback: {', '.join(names)}")
+    return {"FINISHED"}
@@ -0,0 +1,324 @@
+import argparse
+import json
+import re
+from typing import Dict, Optional, Sequence, Set
+
+import bpy
+
+from . import bake_cache, chains, headless, orphans
+
+# Footprint of the Yure Rigs of a scene, for capacity planning. For every
+# rigged armature the report counts what YureRig generated for it:
+#
+# - the DEF_YURERIG_, CTRL_YURERIG_, PHYS_YURERIG_, slider and DECO_YURERIG_
+#   bones, with their constraints and drivers,
+# - the rigid bodies, roots, goals and joints of its chains, per collection,
+#   with their meshes, constraints and drivers,
+# - the bone shapes only its bones use,
+# - the rigid body point cache and the baked playback cache per frame.
+#
+# Bone shapes used by several armatures, like the unit shapes, are reported
+# once as shared. Byte sizes are estimates from the rough sizes of
+# `orphans.py`, not the memory Blender actually allocates.
+
+REPORT_VERSION = 1
+TEXT_NAME = "YureRig Footprint.json"
+
+BONE_CATEGORIES = ("DEF", "CTRL", "PHYS", "SLIDER", "DECO")
+rig_bone_data_path_pattern = re.compile(
+    r'^pose\.bones\["(?:DEF|CTRL|PHYS|DECO)_YURERIG_[^"]*"\]'
+)
+
+# Rough sizes in bytes, on top of those of `orphans.py`
+BONE_BYTES = 1024
+CONSTRAINT_BYTES = 512
+DRIVER_VARIABLE_BYTES = 256
+# The rigid body point cache stores the location and rotation of every body of
+# the rigid body world per frame
+POINT_CACHE_BODY_BYTES = 7 * 4
+
+
+def bone_category(name: str) -> Optional[str]:
+    if chains.slider_bone_pattern.match(name) is not None:
+        return "SLIDER"
+    for category in ("DEF", "CTRL", "PHYS", "DECO"):
+        if name.startswith(f"{category}_YURERIG_"):
+            return category
+    return None
+
+
+class Footprint:
+    """
+    Counts and estimated size in bytes of the datablocks, bones, constraints
+    and drivers of one rig, or of several rigs added together.
+    """
+
+    __slots__ = (
+        "chains",
+        "bones",
+        "objects",
+        "collections",
+        "meshes",
+        "vertices",
+        "constraints",
+        "drivers",
+        "driver_variables",
+        "rigid_bodies",
+        "joints",
+        "phys_bones",
+        "size",
+    )
+
+    def __init__(self) -> None:
+        self.chains = 0
+        self.bones: Dict[str, int] = {category: 0 for category in BONE_CATEGORIES}
+        self.objects = 0
+        self.collections: Dict[str, int] = {}
+        self.meshes = 0
+        self.vertices = 0
+        self.constraints: Dict[str, int] = {}
+        self.drivers = 0
+        self.driver_variables = 0
+        self.rigid_bodies = 0
+        self.joints = 0
+        self.phys_bones = 0
+        self.size = 0
+
+    def add_constraints(self, constraints: bpy.types.bpy_prop_collection) -> None:
+        for constraint in constraints:
+            self.constraints[constraint.type] = (
+                self.constraints.get(constraint.type, 0) + 1
+            )
+            self.size += CONSTRAINT_BYTES
+
+    def add_driver(self, fcurve: bpy.types.FCurve) -> None:
+        variables = len(fcurve.driver.variables)
+        self.drivers += 1
+        self.driver_variables += variables
+        self.size += orphans.FCURVE_BYTES + variables * DRIVER_VARIABLE_BYTES
+
+    def add_object(self, obj: bpy.types.Object, meshes: Set[bpy.types.Mesh]) -> None:
+        """
+        Count `obj` and its mesh, unless the mesh is already in `meshes`.
+        """
+
+        self.objects += 1
+        self.size += orphans.estimate_size(obj)
+        for collection in obj.users_collection:
+            self.collections[collection.name] = (
+                self.collections.get(collection.name, 0) + 1
+            )
+        if obj.type == "MESH" and obj.data not in meshes:
+            meshes.add(obj.data)
+            self.meshes += 1
+            self.vertices += len(obj.data.vertices)
+            self.size += orphans.estimate_size(obj.data)
+        self.add_constraints(obj.constraints)
+        if obj.animation_data is not None:
+            for fcurve in obj.animation_data.drivers:
+                self.add_driver(fcurve)
+        if obj.rigid_body is not None:
+            self.rigid_bodies += 1
+        if obj.rigid_body_constraint is not None:
+            self.joints += 1
+
+    def add(self, other: "Footprint") -> None:
+        self.chains += other.chains
+        self.objects += other.objects
+        self.meshes += other.meshes
+        self.vertices += other.vertices
+        self.drivers += other.drivers
+        self.driver_variables += other.driver_variables
+        self.rigid_bodies += other.rigid_bodies
+        self.joints += other.joints
+        self.phys_bones += other.phys_bones
+        self.size += other.size
+        for counts, other_counts in (
+            (self.bones, other.bones),
+            (self.collections, other.collections),
+            (self.constraints, other.constraints),
+        ):
+            for key, count in other_counts.items():
+                counts[key] = counts.get(key, 0) + count
+
+    @property
+    def point_cache_bytes_per_frame(self) -> int:
+        return self.rigid_bodies * POINT_CACHE_BODY_BYTES
+
+    @property
+    def bake_cache_bytes_per_frame(self) -> int:
+        return self.phys_bones * bake_cache.CHANNELS * 4
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "chains": self.chains,
+            "bones": dict(self.bones),
+            "objects": self.objects,
+            "collections": dict(sorted(self.collections.items())),
+            "meshes": self.meshes,
+            "vertices": self.vertices,
+            "constraints": sum(self.constraints.values()),
+            "constraint_types": dict(sorted(self.constraints.items())),
+            "drivers": self.drivers,
+            "driver_variables": self.driver_variables,
+            "rigid_bodies": self.rigid_bodies,
+            "joints": self.joints,
+            "point_cache_bytes_per_frame": self.point_cache_bytes_per_frame,
+            "bake_cache_bytes_per_frame": self.bake_cache_bytes_per_frame,
+            "estimated_bytes": self.size,
+        }
+
+
+def count_armature(
+    armature: bpy.types.Object,
+    footprint: Footprint,
+    shapes: Dict[bpy.types.Object, Set[str]],
+) -> None:
+    """
+    Count the YureRig bones of `armature` with their constraints and drivers,
+    and record the bone shapes they use in `shapes`.
+    """
+
+    for pose_bone in armature.pose.bones:
+        category = bone_category(pose_bone.name)
+        if category is None:
+            continue
+        footprint.bones[category] += 1
+        footprint.size += BONE_BYTES
+        if category == "PHYS":
+            footprint.phys_bones += 1
+        footprint.add_constraints(pose_bone.constraints)
+        shape = pose_bone.custom_shape
+        if shape is not None and orphans.owned_name_pattern.search(shape.name):
+            shapes.setdefault(shape, set()).add(armature.name)
+    if armature.animation_data is not None:
+        for fcurve in armature.animation_data.drivers:
+            if rig_bone_data_path_pattern.match(fcurve.data_path) is not None:
+                footprint.add_driver(fcurve)
+
+
+def measure(scene: bpy.types.Scene) -> Dict[str, object]:
+    """
+    Machine readable footprint of the Yure Rigs of `scene`. Every bone,
+    driver and rig object is visited once.
+    """
+
+    footprints: Dict[str, Footprint] = {}
+    owners: Dict[bpy.types.Object, str] = {}
+    shapes: Dict[bpy.types.Object, Set[str]] = {}
+    for armature in chains.rigged_armatures(scene):
+        footprint = footprints[armature.name] = Footprint()
+        count_armature(armature, footprint, shapes)
+        for chain in chains.get_chains(armature):
+            footprint.chains += 1
+            for name in chain.names:
+                for obj in (
+                    bpy.data.objects.get(f"RIGIDBODY_YURERIG_{name}"),
+                    chains.get_root_object(name),
+                    bpy.data.objects.get(f"GOAL_YURERIG_{name}"),
+                ):
+                    if obj is not None:
+                        owners.setdefault(obj, armature.name)
+
+    # Joints belong to the armature of the bodies they connect
+    world = scene.rigidbody_world
+    if world is not None and world.constraints is not None:
+        for obj in world.constraints.all_objects:
+            constraint = obj.rigid_body_constraint
+            if constraint is None:
+                continue
+            owner = owners.get(constraint.object1) or owners.get(constraint.object2)
+            if owner is not None:
+                owners.setdefault(obj, owner)
+
+    meshes: Dict[str, Set[bpy.types.Mesh]] = {name: set() for name in footprints}
+    for obj, owner in owners.items():
+        footprints[owner].add_object(obj, meshes[owner])
+
+    shared = Footprint()
+    shared_meshes: Set[bpy.types.Mesh] = set()
+    for shape, users in shapes.items():
+        if len(users) == 1:
+            owner = next(iter(users))
+            footprints[owner].add_object(shape, meshes[owner])
+        else:
+            shared.add_object(shape, shared_meshes)
+
+    total = Footprint()
+    for footprint in footprints.values():
+        total.add(footprint)
+    total.add(shared)
+    return {
+        "version": REPORT_VERSION,
+        "file": bpy.data.filepath,
+        "scene": scene.name,
+        "rigs": [
+            dict(armature=name, **footprint.to_dict())
+            for name, footprint in sorted(footprints.items())
+        ],
+        "shared": shared.to_dict(),
+        "total": total.to_dict(),
+    }
+
+
+def summary(report: Dict[str, object]) -> str:
+    rigs = report["rigs"]
+    total = report["total"]
+    assert isinstance(rigs, list) and isinstance(total, dict)
+    size = total["estimated_bytes"] / (1024 * 1024)
+    cache = total["point_cache_bytes_per_frame"] / 1024
+    return (
+        f"{len(rigs)} rigs, {sum(total['bones'].values())} bones, "
+        + f"{total['objects']} objects, {total['vertices']} vertices, "
+        + f"{total['constraints']} constraints, {total['drivers']} drivers, "
+        + f"about {size:.2f} MB and {cache:.2f} KB point cache per frame"
+    )
+
+
+# Headless command
+#################################################
+
+
+def parse_args(argv: Sequence[str], scene: bpy.types.Scene) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="yurerig_footprint",
+        description="Report the footprint of the YureRig rigs of a scene as JSON.",
+    )
+    parser.add_argument("--output", help="JSON file (default: standard output).")
+    parser.add_argument(
+        "--append",
+        help="JSON lines file the report is added to as one line, "
+        + "to track the footprint of many files.",
+    )
+    return parser.parse_args(argv)
+
+
+def command(args: argparse.Namespace, scene: bpy.types.Scene) -> None:
+    report = measure(scene)
+    if args.append is not None:
+        with open(args.append, "a", encoding="utf-8") as f:
+            f.write(json.dumps(report) + "\n")
+        print(f"YureRig: {summary(report)}, added to {args.append}")
+    if args.output is not None or args.append is None:
+        headless.write_report(report, args.output, summary(report))
+
+
+# Operators
+#################################################
+
+
+def footprint_report(
+    operator: bpy.types.Operator, context: bpy.types.Context
+) -> Set[str]:
+    """
+    Implementation of `YURERIG_OT_FootprintReportOperator`.
+    """
+
+    report = measure(context.scene)
+    headless.store_report(report, TEXT_NAME)
+
+    operator.report(
+        {"INFO"},
+        f"Success Footprint Report: {summary(report)}, see the text {TEXT_NAME}",
+    )
+    return {"FINISHED"}
@@ -0,0 +1,130 @@
+import sys
+
+import bpy
+from bpy.app.handlers import persistent
+
+# Persistent application handlers of the addon.
+# Handlers only import the modules doing the actual work when they have
+# something to do, so registering them stays cheap.
+
+classes = ()
+
+
+@persistent  # type: ignore
+def load_pre(*args: object) -> None:
+    playback = sys.modules.get(f"{__package__}.playback")
+    if playback is not None:
+        playback.deactivate()
+    lod = sys.modules.get(f"{__package__}.lod")
+    if lod is not None:
+        lod.set_live(False)
+    farm = sys.modules.get(f"{__package__}.farm")
+    if farm is not None:
+        farm.action_digests.clear()
+
+
+@persistent  # type: ignore
+def load_post(*args: object) -> None:
+    """
+    Restore the live LOD of the loaded file, and the rigs of a file saved
+    during baked playback.
+    Render nodes play back the farm cache instead of simulating when the file
+    was prepared for the farm.
+    """
+
+    scene = bpy.context.scene
+    if scene is None:
+        return
+
+    from . import playback
+
+    playback.deactivate(scene)
+
+    if scene.yurerig.use_live_lod:
+        from . import lod
+
+        lod.set_live(True, scene)
+
+    if not bpy.app.background or not scene.yurerig.use_farm_cache:
+        return
+
+    from . import bake_cache, farm
+
+    try:
+        names = farm.load(scene, farm.cache_directory(scene))
+    except bake_cache.BakeCacheError as e:
+        print(f"YureRig: farm cache not loaded, simulating instead: {e}")
+        return
+    print(f"YureRig: loaded farm cache for {', '.join(names)}")
+
+
+def load_simulation_cache(scene: bpy.types.Scene) -> None:
+    if scene.rigidbody_world is None or not scene.yurerig.use_cached_playback:
+        return
+
+    from . import farm
+
+    names = farm.load_cached(scene)
+    if names is not None:
+        print(f"YureRig: loaded simulation cache for {', '.join(names)}")
+
+
+@persistent  # type: ignore
+def animation_playback_pre(scene: bpy.types.Scene, *args: object) -> None:
+    """
+    Play back a matching simulation cache entry instead of simulating.
+    """
+
+    load_simulation_cache(scene)
+
+
+@persistent  # type: ignore
+def render_init(scene: bpy.types.Scene, *args: object) -> None:
+    """
+    Command line renders play back a matching simulation cache entry instead
+    of simulating. Renders from the UI use the entry loaded on playback, as
+    frames can not be changed while the render starts.
+    """
+
+    if bpy.app.background:
+        load_simulation_cache(scene)
+
+
+@persistent  # type: ignore
+def depsgraph_update_post(
+    scene: bpy.types.Scene, depsgraph: bpy.types.Depsgraph
+) -> None:
+    """
+    Forget the simulation hash digests of the edited actions, and reschedule
+    the chains whose physics influence slider animation changed.
+    """
+
+    actions = [u.id for u in depsgraph.updates if isinstance(u.id, bpy.types.Action)]
+    if len(actions) == 0:
+        return
+    farm = sys.modules.get(f"{__package__}.farm")
+    if farm is not None:
+        farm.forget_actions(actions)
+    if not scene.yurerig.use_slider_activity:
+        return
+
+    from . import slider_activity
+
+    slider_activity.update_changed(scene, depsgraph)
+
+
+def register() -> None:
+    bpy.app.handlers.load_pre.append(load_pre)
+    bpy.app.handlers.load_post.append(load_post)
+    bpy.app.handlers.animation_playback_pre.append(animation_playback_pre)
+    bpy.app.handlers.render_init.append(render_init)
+    bpy.app.handlers.depsgraph_update_post.append(depsgraph_update_post)
+
+
+def unregister() -> None:
+    bpy.app.handlers.depsgraph_update_post.remove(depsgraph_update_post)
+    bpy.app.handlers.render_init.remove(render_init)
+    bpy.app.handlers.animation_playback_pre.remove(animation_playback_pre)
+    bpy.app.handlers.load_post.remove(load_post)
+    bpy.app.handlers.load_pre.remove(load_pre)
+    load_pre()
@@ -0,0 +1,66 @@
+import argparse
+import json
+import sys
+from typing import Callable, Dict, List, Optional, Sequence
+
+import bpy
+
+# Entry point of the `scripts/yurerig_*.py` scripts, which Blender runs in the
+# background with the arguments of the script after `--`:
+#
+#     blender --background shot.blend --python scripts/yurerig_farm.py -- load
+#
+# A module run this way provides `parse_args(argv, scene)` and
+# `command(args, scene)`, and `scripts/yurerig_bootstrap.py` enables the
+# addon and calls `run` with them. Commands making a JSON report write it with
+# `write_report`, and their operators show it in a text with `store_report`.
+
+ParseArgs = Callable[[Sequence[str], bpy.types.Scene], argparse.Namespace]
+Command = Callable[[argparse.Namespace, bpy.types.Scene], None]
+
+
+def script_argv() -> List[str]:
+    """
+    Arguments after `--` on the Blender command line.
+    """
+
+    return sys.argv[sys.argv.index("--") + 1 :] if "--" in sys.argv else []
+
+
+def run(
+    parse_args: ParseArgs, command: Command, argv: Optional[Sequence[str]] = None
+) -> None:
+    """
+    Run `command` on the scene with the arguments `argv` parsed by
+    `parse_args`. `argv` defaults to the arguments of the script.
+    """
+
+    scene = bpy.context.scene
+    command(parse_args(script_argv() if argv is None else argv, scene), scene)
+
+
+def write_report(
+    report: Dict[str, object], output: Optional[str], summary: str
+) -> None:
+    """
+    Write `report` as JSON to the file `output`, or print it without `output`.
+    """
+
+    text = json.dumps(report, indent=2)
+    if output is None:
+        print(text)
+        return
+    with open(output, "w", encoding="utf-8") as f:
+        f.write(text + "\n")
+    print(f"YureRig: {summary}, written to {output}")
+
+
+def store_report(report: Dict[str, object], text_name: str) -> None:
+    """
+    Write `report` as JSON to the text `text_name`, created when missing.
+    """
+
+    text = bpy.data.texts.get(text_name)
+    if text is None:
+        text = bpy.data.texts.new(text_name)
+    text.from_string(json.dumps(report, indent=2))
@@ -0,0 +1,236 @@
+import os
+from typing import List, Optional, Set, Tuple
+
+import bpy
+
+from . import builder, chains
+
+# Instancing one Yure Rig for many characters through library overrides.
+#
+# In the library .blend, "Prepare Yure Rig Library" links the rigid bodies,
+# roots, goals and joints of the active armature into a child collection of
+# the collection of the armature, and records the armature on the collection
+# of the armature. In a shot, "Instance Linked Yure Rig" links that
+# collection and makes library overrides of its hierarchy once per character:
+#
+# - the armature, rigid bodies, goals and joints are overridden per instance,
+#   and their constraints, drivers and joints are remapped to the overrides
+#   of the same instance,
+# - meshes and bone shapes stay linked and shared.
+#
+# The rigid body and joint parameters are the ones of the library objects,
+# which the overrides start from.
+#
+# The rigid body world of the library scene is not linked, so the overridden
+# bodies and joints are registered with the rigid body world of the shot.
+# "Register Linked Yure Rig Bodies" does the same for instances made by hand
+# or after a resync. Instances are edited in the library: the operators
+# looking rig objects up by name only work on local rigs.
+
+INSTANCE_COLLECTION_SUFFIX = " YureRig"
+# Custom property of the prepared collection
+ARMATURE_PROPERTY = "YureRig Armature"
+
+RIG_OBJECT_PREFIXES = ("RIGIDBODY_YURERIG_", "GOAL_YURERIG_", "JOINT_YURERIG_")
+
+
+def instance_objects(armature: bpy.types.Object) -> Set[bpy.types.Object]:
+    """
+    Rigid bodies, roots, goals and joints of the chains of `armature`, which
+    every instance needs its own copy of.
+    """
+
+    bodies: Set[bpy.types.Object] = set()
+    for chain in chains.get_chains(armature):
+        bodies.update(chain.rigidbodies())
+        bodies.update(chain.roots())
+        bodies.update(chain.goals())
+    objects = set(bodies)
+    users = bpy.data.user_map(subset=bodies, value_types={"OBJECT"})
+    for body in bodies:
+        for user in users[body]:
+            if user.rigid_body_constraint is not None:
+                objects.add(user)
+    return objects
+
+
+def prepare_library(
+    operator: bpy.types.Operator, context: bpy.types.Context
+) -> Set[str]:
+    """
+    Implementation of `YURERIG_OT_PrepareLibraryOperator`.
+    """
+
+    armature: bpy.types.Object = context.active_object
+    if len(armature.users_collection) == 0:
+        operator.report({"ERROR"}, "The armature is in no collection")
+        return {"CANCELLED"}
+    objects = instance_objects(armature)
+    if len(objects) == 0:
+        operator.report({"ERROR"}, "No Yure Rig chain on the armature")
+        return {"CANCELLED"}
+
+    parent = armature.users_collection[0]
+    name = f"{armature.name}{INSTANCE_COLLECTION_SUFFIX}"
+    collection = bpy.data.collections.get(name)
+    if collection is None:
+        collection = bpy.data.collections.new(name)
+    if collection.name not in parent.children:
+        parent.children.link(collection)
+    linked = set(collection.objects)
+    for obj in objects:
+        if obj not in linked:
+            collection.objects.link(obj)
+
+    parent[ARMATURE_PROPERTY] = armature.name
+    operator.report(
+        {"INFO"},
+        f"Success Prepare Library: {len(objects)} objects in {parent.name}",
+    )
+    return {"FINISHED"}
+
+
+def link_collection(filepath: str, name: str) -> Optional[bpy.types.Collection]:
+    """
+    Link the collection `name` of the library `filepath`, or reuse it when it
+    is already linked.
+    """
+
+    library_path = bpy.path.abspath(filepath)
+    for collection in bpy.data.collections:
+        library = collection.library
+        if (
+            collection.name == name
+            and library is not None
+            and os.path.normpath(bpy.path.abspath(library.filepath))
+            == os.path.normpath(library_path)
+        ):
+            return collection
+    with bpy.data.libraries.load(library_path, link=True) as (data_from, data_to):
+        if name not in data_from.collections:
+            return None
+        data_to.collections = [name]
+    return data_to.collections[0]
+
+
+def override_collection(
+    context: bpy.types.Context, linked: bpy.types.Collection
+) -> Optional[bpy.types.Collection]:
+    """
+    Make a library override of the hierarchy of `linked` in the scene and
+    return its root collection.
+    """
+
+    if hasattr(linked, "override_hierarchy_create"):
+        return linked.override_hierarchy_create(context.scene, context.view_layer)
+
+    # Older Blender versions override the instance of a collection
+    empty = bpy.data.objects.new(linked.name, None)
+    empty.instance_type = "COLLECTION"
+    empty.instance_collection = linked
+    context.scene.collection.objects.link(empty)
+    for obj in context.selected_objects:
+        obj.select_set(False)
+    empty.select_set(True)
+    context.view_layer.objects.active = empty
+    before = set(bpy.data.collections)
+    bpy.ops.object.make_override_library()
+    for collection in bpy.data.collections:
+        if (
+            collection not in before
+            and collection.override_library is not None
+            and collection.override_library.reference == linked
+        ):
+            return collection
+    return None
+
+
+def is_linked(obj: bpy.types.Object) -> bool:
+    return obj.library is not None or obj.override_library is not None
+
+
+def register_bodies(
+    context: bpy.types.Context, objects: List[bpy.types.Object]
+) -> Tuple[int, int]:
+    """
+    Add the Yure Rig rigid bodies and joints of `objects` to the rigid body
+    world of the scene. Return the number of added bodies and joints.
+    """
+
+    world = builder.ensure_rigidbody_world(context)
+    # Overrides of several instances share names with each other and with
+    # the linked objects, so compare the objects themselves
+    bodies = set(world.collection.objects)
+    joints = set(world.constraints.objects)
+    body_count = 0
+    joint_count = 0
+    for obj in objects:
+        if not obj.name.startswith(RIG_OBJECT_PREFIXES):
+            continue
+        if obj.rigid_body is not None and obj not in bodies:
+            world.collection.objects.link(obj)
+            body_count += 1
+        if obj.rigid_body_constraint is not None and obj not in joints:
+            world.constraints.objects.link(obj)
+            joint_count += 1
+    return body_count, joint_count
+
+
+def instance_linked_rig(
+    operator: bpy.types.Operator, context: bpy.types.Context
+) -> Set[str]:
+    """
+    Implementation of `YURERIG_OT_InstanceLinkedRigOperator`.
+    """
+
+    try:
+        linked = link_collection(operator.filepath, operator.collection_name)
+    except OSError as e:
+        operator.report({"ERROR"}, str(e))
+        return {"CANCELLED"}
+    if linked is None:
+        operator.report(
+            {"ERROR"}, f"No collection {operator.collection_name} in the library"
+        )
+        return {"CANCELLED"}
+    if linked.get(ARMATURE_PROPERTY) is None:
+        operator.report(
+            {"WARNING"}, f"{linked.name} was not prepared with Prepare Library"
+        )
+
+    body_count = 0
+    joint_count = 0
+    instances = 0
+    for _ in range(operator.count):
+        instance = override_collection(context, linked)
+        if instance is None:
+            operator.report({"ERROR"}, f"Can not override {linked.name}")
+            return {"CANCELLED"}
+        counts = register_bodies(context, list(instance.all_objects))
+        body_count += counts[0]
+        joint_count += counts[1]
+        instances += 1
+
+    operator.report(
+        {"INFO"},
+        f"Success Instance Linked Rig: {instances} instances, "
+        + f"{body_count} rigid bodies, {joint_count} joints",
+    )
+    return {"FINISHED"}
+
+
+def register_linked_bodies(
+    operator: bpy.types.Operator, context: bpy.types.Context
+) -> Set[str]:
+    """
+    Implementation of `YURERIG_OT_RegisterLinkedBodiesOperator`.
+    """
+
+    objects = [obj for obj in context.scene.objects if is_linked(obj)]
+    body_count, joint_count = register_bodies(context, objects)
+    operator.report(
+        {"INFO"},
+        f"Success Register Linked Bodies: {body_count} rigid bodies, "
+        + f"{joint_count} joints",
+    )
+    return {"FINISHED"}
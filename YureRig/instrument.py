@@ -0,0 +1,304 @@
+import json
+import os
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Set
+
+import bpy
+
+# Optional profiling of the operators. When enabled in the addon preferences
+# or with the `YURERIG_PROFILE` environment variable, each operator run appends
+# one JSON line to the profile log with:
+#
+# - the wall time per phase (mode switches, edit bones, meshes, ...), each
+#   phase counting only the time outside its nested phases,
+# - the net number of datablocks and bones created and removed,
+# - the number of RNA property writes per phase: properties are set through
+#   `assign` and `assign_items`, which count one write per property, and
+#   methods setting properties and `foreach_set` calls are counted with
+#   `writes`.
+#
+# `YURERIG_PROFILE` is either a path of the log or "1" for the default path.
+# While disabled, `phase` and `writes` return at once.
+#
+# Only the run being executed is recorded: a modal run is detached between its
+# ticks, so the operators running in between are not counted to it.
+
+ENV_VAR = "YURERIG_PROFILE"
+DEFAULT_LOG_NAME = "yurerig_profile.jsonl"
+
+# bpy.data collections whose lengths are compared before and after a run
+DATA_COLLECTIONS = (
+    "objects",
+    "meshes",
+    "curves",
+    "actions",
+    "collections",
+    "armatures",
+)
+
+
+class Recorder:
+    """
+    Phase times, RNA write counts and datablock counts of one operator run.
+    The clock can be paused while a modal operator waits for its next tick.
+    """
+
+    __slots__ = (
+        "operator",
+        "path",
+        "times",
+        "write_counts",
+        "stack",
+        "last",
+        "paused_at",
+        "paused",
+        "started",
+        "data_counts",
+        "bone_count",
+        "modal",
+    )
+
+    def __init__(self, operator: str, path: str) -> None:
+        self.operator = operator
+        self.path = path
+        self.times: Dict[str, float] = {}
+        self.write_counts: Dict[str, int] = {}
+        self.stack: List[str] = ["other"]
+        self.paused = 0.0
+        self.paused_at: Optional[float] = None
+        self.started = time.perf_counter()
+        self.last = self.started
+        self.data_counts = count_data()
+        self.bone_count = count_bones()
+        self.modal = False
+
+    def clock(self) -> float:
+        return time.perf_counter() - self.paused
+
+    def charge(self) -> None:
+        """
+        Add the time since the last change of phase to the current phase.
+        """
+
+        now = self.clock()
+        top = self.stack[-1]
+        self.times[top] = self.times.get(top, 0.0) + now - self.last
+        self.last = now
+
+    def enter(self, name: str) -> None:
+        self.charge()
+        self.stack.append(name)
+
+    def exit(self) -> None:
+        self.charge()
+        self.stack.pop()
+
+    def pause(self) -> None:
+        if self.paused_at is None:
+            self.charge()
+            self.paused_at = time.perf_counter()
+
+    def resume(self) -> None:
+        if self.paused_at is not None:
+            self.paused += time.perf_counter() - self.paused_at
+            self.paused_at = None
+
+    def add_writes(self, count: int) -> None:
+        top = self.stack[-1]
+        self.write_counts[top] = self.write_counts.get(top, 0) + count
+
+    def entry(self, result: Set[str]) -> Dict[str, object]:
+        self.resume()
+        self.charge()
+        created: Dict[str, int] = {}
+        removed: Dict[str, int] = {}
+        counts = count_data()
+        counts["bones"] = count_bones()
+        before = dict(self.data_counts, bones=self.bone_count)
+        for kind, count in counts.items():
+            delta = count - before.get(kind, 0)
+            if delta > 0:
+                created[kind] = delta
+            elif delta < 0:
+                removed[kind] = -delta
+        return {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "addon_version": addon_version(),
+            "blender_version": bpy.app.version_string,
+            "file": bpy.data.filepath,
+            "operator": self.operator,
+            "result": sorted(result),
+            "modal": self.modal,
+            "wall_seconds": round(self.clock() - self.started, 6),
+            "phases": {k: round(v, 6) for k, v in self.times.items()},
+            "rna_writes": sum(self.write_counts.values()),
+            "rna_writes_per_phase": self.write_counts,
+            "created": created,
+            "removed": removed,
+        }
+
+
+current: Optional[Recorder] = None
+
+
+def addon_version() -> str:
+    package = sys.modules.get(__package__)
+    info = getattr(package, "bl_info", {})
+    return ".".join(str(v) for v in info.get("version", ()))
+
+
+def count_data() -> Dict[str, int]:
+    return {name: len(getattr(bpy.data, name)) for name in DATA_COLLECTIONS}
+
+
+def count_bones() -> int:
+    return sum(len(armature.bones) for armature in bpy.data.armatures)
+
+
+def log_path(context: bpy.types.Context) -> Optional[str]:
+    """
+    Path of the profile log, or None when profiling is disabled.
+    """
+
+    value = os.environ.get(ENV_VAR, "")
+    if value not in ("", "0"):
+        if value != "1":
+            return value
+    else:
+        addon = context.preferences.addons.get(__package__)
+        if addon is None or addon.preferences is None:
+            return None
+        if not addon.preferences.profile_operators:
+            return None
+        if addon.preferences.profile_log_path != "":
+            return str(bpy.path.abspath(addon.preferences.profile_log_path))
+    if bpy.data.filepath != "":
+        return os.path.join(os.path.dirname(bpy.data.filepath), DEFAULT_LOG_NAME)
+    return os.path.join(tempfile.gettempdir(), DEFAULT_LOG_NAME)
+
+
+def start(context: bpy.types.Context, operator: str) -> Optional[Recorder]:
+    """
+    Start recording a run of `operator` when profiling is enabled. A run
+    nested in another one, like an operator called by an operator, is recorded
+    as a phase of the outer run.
+    """
+
+    global current
+
+    if current is not None:
+        current.enter(operator)
+        return None
+    path = log_path(context)
+    if path is None:
+        return None
+    current = Recorder(operator, path)
+    return current
+
+
+def stop(recorder: Optional[Recorder], result: Set[str]) -> None:
+    """
+    End the run started by `start` and append its entry to the log.
+    """
+
+    global current
+
+    if recorder is None:
+        if current is not None:
+            current.exit()
+        return
+    current = None
+    entry = recorder.entry(result)
+    try:
+        with open(recorder.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+    except OSError as e:
+        print(f"YureRig: can not write the profile log {recorder.path}: {e}")
+
+
+@contextmanager
+def record(context: bpy.types.Context, operator: str) -> Iterator[Set[str]]:
+    """
+    Record the run of `operator` in the `with` block. The block adds the
+    operator result to the yielded set.
+    """
+
+    result: Set[str] = set()
+    recorder = start(context, operator)
+    try:
+        yield result
+    finally:
+        stop(recorder, result)
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """
+    Count the time in the `with` block to the phase `name` of the current run.
+    """
+
+    recorder = current
+    if recorder is None:
+        yield
+        return
+    recorder.enter(name)
+    try:
+        yield
+    finally:
+        recorder.exit()
+
+
+def writes(count: int = 1) -> None:
+    """
+    Count `count` RNA writes made by the caller to the current phase.
+    """
+
+    if current is not None:
+        current.add_writes(count)
+
+
+def assign(struct: Any, **values: object) -> None:
+    """
+    Set the properties `values` of `struct` in order, counting one write each.
+    """
+
+    for attr, value in values.items():
+        setattr(struct, attr, value)
+    writes(len(values))
+
+
+def assign_items(struct: Any, values: Mapping[str, object]) -> None:
+    """
+    Set the custom properties `values` of `struct`, counting one write each.
+    """
+
+    for key, value in values.items():
+        struct[key] = value
+    writes(len(values))
+
+
+def pause(recorder: Optional[Recorder]) -> None:
+    """
+    Pause the clock of the modal run `recorder` and detach it until `resume`.
+    """
+
+    global current
+
+    if recorder is not None and current is recorder:
+        recorder.pause()
+        current = None
+
+
+def resume(recorder: Optional[Recorder]) -> None:
+    """
+    Attach the modal run `recorder` again for its next tick.
+    """
+
+    global current
+
+    if recorder is not None and current is None:
+        recorder.resume()
+        current = recorder
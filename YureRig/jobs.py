@@ -0,0 +1,184 @@
+import time
+from typing import Callable, Iterator, Optional, Set
+
+import bpy
+
+# Long edits run as a job: a generator of steps which the invoking operator
+# drives in time sliced chunks on a window manager timer, so Blender keeps
+# redrawing and showing the progress in between. Esc cancels the job and rolls
+# back what its steps already changed.
+#
+# `execute` runs the same job to the end without a timer, so scripts and small
+# rigs behave as before.
+
+# Seconds of work per timer tick
+SLICE_SECONDS = 0.05
+# Seconds between timer ticks
+TIMER_STEP = 0.01
+
+# Events handed to the viewport while a job runs, so the view can be navigated
+NAVIGATION_EVENTS = {
+    "MIDDLEMOUSE",
+    "WHEELUPMOUSE",
+    "WHEELDOWNMOUSE",
+    "TRACKPADPAN",
+    "TRACKPADZOOM",
+    "MOUSEMOVE",
+    "INBETWEEN_MOUSEMOVE",
+}
+
+
+class Job:
+    """
+    Work of an operator split into steps.
+    `steps` yields the number of work units done so far out of `total`.
+    `rollback` undoes the steps which already ran when the job is cancelled,
+    and `finish` runs once after the last step and returns the operator result.
+    """
+
+    __slots__ = ("label", "steps", "total", "rollback", "finish", "done", "finished")
+
+    def __init__(
+        self,
+        label: str,
+        steps: Iterator[int],
+        total: int,
+        rollback: Callable[[], None],
+        finish: Callable[[], Set[str]],
+    ) -> None:
+        self.label = label
+        self.steps = steps
+        self.total = max(total, 1)
+        self.rollback = rollback
+        self.finish = finish
+        self.done = 0
+        self.finished = False
+
+    def run_slice(self, seconds: float) -> None:
+        """
+        Run steps for about `seconds`, or until the last one.
+        """
+
+        deadline = time.perf_counter() + seconds
+        for done in self.steps:
+            self.done = min(done, self.total)
+            if time.perf_counter() >= deadline:
+                return
+        self.done = self.total
+        self.finished = True
+
+    def status(self) -> str:
+        percent = min(100, self.done * 100 // self.total)
+        return f"{self.label}: {self.done}/{self.total} ({percent}%)    Esc: Cancel"
+
+
+def run(job: Optional[Job]) -> Set[str]:
+    """
+    Run `job` to the end without yielding to Blender. A failing step rolls the
+    job back before the error is raised.
+    """
+
+    if job is None:
+        return {"CANCELLED"}
+    try:
+        for done in job.steps:
+            job.done = min(done, job.total)
+    except Exception:
+        job.rollback()
+        raise
+    return job.finish()
+
+
+def invoke(
+    operator: bpy.types.Operator, context: bpy.types.Context, job: Optional[Job]
+) -> Set[str]:
+    """
+    Start `job` as a modal operator. A job which fits in the first slice is
+    finished right away.
+    """
+
+    if job is None:
+        return {"CANCELLED"}
+    if not step(operator, job):
+        return {"CANCELLED"}
+    if job.finished:
+        return job.finish()
+
+    wm = context.window_manager
+    operator._job = job
+    operator._timer = wm.event_timer_add(TIMER_STEP, window=context.window)
+    operator._timer_duration = operator._timer.time_duration
+    wm.progress_begin(0, job.total)
+    wm.progress_update(job.done)
+    context.workspace.status_text_set(job.status())
+    wm.modal_handler_add(operator)
+    return {"RUNNING_MODAL"}
+
+
+def modal(
+    operator: bpy.types.Operator, context: bpy.types.Context, event: bpy.types.Event
+) -> Set[str]:
+    """
+    Drive the job started by `invoke` by one slice per timer tick.
+    """
+
+    job: Job = operator._job
+    if event.type == "ESC":
+        end(operator, context)
+        job.rollback()
+        operator.report({"WARNING"}, f"Cancelled {job.label}")
+        return {"CANCELLED"}
+    if event.type != "TIMER":
+        if event.type in NAVIGATION_EVENTS:
+            return {"PASS_THROUGH"}
+        return {"RUNNING_MODAL"}
+    if not is_own_tick(operator):
+        # Timers of other operators and addons
+        return {"PASS_THROUGH"}
+
+    if not step(operator, job):
+        end(operator, context)
+        return {"CANCELLED"}
+    if not job.finished:
+        context.window_manager.progress_update(job.done)
+        context.workspace.status_text_set(job.status())
+        return {"RUNNING_MODAL"}
+
+    end(operator, context)
+    return job.finish()
+
+
+def is_own_tick(operator: bpy.types.Operator) -> bool:
+    """
+    Whether the TIMER event being handled is a tick of the timer of `operator`.
+    Events do not tell which timer sent them, but the duration of a timer only
+    grows when it fires.
+    """
+
+    duration = operator._timer.time_duration
+    if duration == operator._timer_duration:
+        return False
+    operator._timer_duration = duration
+    return True
+
+
+def step(operator: bpy.types.Operator, job: Job) -> bool:
+    """
+    Run one slice of `job`. When a step fails, roll the job back, report the
+    error and return False.
+    """
+
+    try:
+        job.run_slice(SLICE_SECONDS)
+    except Exception as e:
+        job.rollback()
+        operator.report({"ERROR"}, f"{job.label} failed and was rolled back: {e}")
+        return False
+    return True
+
+
+def end(operator: bpy.types.Operator, context: bpy.types.Context) -> None:
+    wm = context.window_manager
+    wm.event_timer_remove(operator._timer)
+    wm.progress_end()
+    context.workspace.status_text_set(None)
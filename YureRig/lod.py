@@ -0,0 +1,609 @@
+import argparse
+import itertools
+import math
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import bpy
+from bpy.app.handlers import persistent
+from bpy_extras.object_utils import world_to_camera_view
+from mathutils import Vector
+
+from . import chains, schedule
+
+# Chains far from or outside of the active camera fade to FK through their
+# physics influence slider and their rigid bodies are disabled.
+#
+# The fade is driven by the `LOD_PROPERTY` custom property of the slider bone,
+# which multiplies the slider value in the chain drivers, so the slider
+# animation of the animators is kept as is.
+
+LOD_PROPERTY = "LOD Influence"
+SCHEDULE_SOURCE = "lod"
+
+
+class LodSettings:
+    """
+    LOD thresholds.
+    Screen sizes are the diameter of the chain bounding sphere relative to the
+    larger side of the camera frame.
+    """
+
+    __slots__ = (
+        "fk_screen_size",
+        "physics_screen_size",
+        "fade_frames",
+        "settle_frames",
+    )
+
+    def __init__(
+        self,
+        fk_screen_size: float,
+        physics_screen_size: float,
+        fade_frames: int,
+        settle_frames: int,
+    ):
+        self.fk_screen_size = fk_screen_size
+        self.physics_screen_size = max(physics_screen_size, fk_screen_size)
+        self.fade_frames = max(fade_frames, 0)
+        self.settle_frames = max(settle_frames, 0)
+
+    @classmethod
+    def from_props(cls, props: bpy.types.PropertyGroup) -> "LodSettings":
+        return cls(
+            props.lod_fk_screen_size,
+            props.lod_physics_screen_size,
+            props.lod_fade_frames,
+            props.lod_settle_frames,
+        )
+
+
+# Screen size
+#################################################
+
+
+def chain_bounds(
+    armature: bpy.types.Object, chain: chains.Chain
+) -> Optional[Tuple[Vector, float]]:
+    """
+    World space bounding sphere of the CTRL_YURERIG_ bones of `chain`.
+    The FK pose is used, so it can be evaluated without simulating.
+    """
+
+    return bone_bounds(armature, chain.ctrl_bone_names())
+
+
+def bone_bounds(
+    armature: bpy.types.Object, names: Iterable[str]
+) -> Optional[Tuple[Vector, float]]:
+    points: List[Vector] = []
+    matrix_world = armature.matrix_world
+    for name in names:
+        pose_bone = armature.pose.bones.get(name)
+        if pose_bone is not None:
+            points.append(matrix_world @ pose_bone.head)
+            points.append(matrix_world @ pose_bone.tail)
+    if len(points) == 0:
+        return None
+    center = sum(points, Vector()) / len(points)
+    radius = max((p - center).length for p in points)
+    return center, radius
+
+
+def screen_size(
+    scene: bpy.types.Scene, camera: bpy.types.Object, center: Vector, radius: float
+) -> float:
+    """
+    Projected diameter of a sphere relative to the larger side of the camera
+    frame, or 0 when the sphere is outside of the camera frustum.
+    """
+
+    projected = world_to_camera_view(scene, camera, center)
+    depth = projected.z
+    if camera.data.type == "ORTHO":
+        size = 2 * radius / camera.data.ortho_scale
+    else:
+        if depth + radius <= camera.data.clip_start:
+            return 0.0
+        size = radius / (max(depth, 1e-6) * math.tan(camera.data.angle / 2))
+    margin = size / 2
+    if (
+        projected.x < -margin
+        or projected.x > 1 + margin
+        or projected.y < -margin
+        or projected.y > 1 + margin
+        or depth - radius > camera.data.clip_end
+    ):
+        return 0.0
+    return float(size)
+
+
+class LodState:
+    """
+    Hysteresis between physics and FK for a chain.
+    """
+
+    __slots__ = ("physics",)
+
+    def __init__(self, physics: bool = True):
+        self.physics = physics
+
+    def update(self, size: float, settings: LodSettings) -> bool:
+        if self.physics and size < settings.fk_screen_size:
+            self.physics = False
+        elif not self.physics and size >= settings.physics_screen_size:
+            self.physics = True
+        return self.physics
+
+
+# Precomputed schedule
+#################################################
+
+
+def compute_schedule(
+    scene: bpy.types.Scene,
+    camera: bpy.types.Object,
+    armatures: Sequence[bpy.types.Object],
+    frame_start: int,
+    frame_end: int,
+    settings: LodSettings,
+) -> Dict[Tuple[str, int], List[bool]]:
+    """
+    Evaluate the camera once per frame and return per chain flags telling
+    whether the chain needs physics on each frame.
+    Frames are sampled with `schedule.sample_frames`, so computing the
+    schedule never simulates.
+    """
+
+    all_chains = [(a, c) for a in armatures for c in chains.get_chains(a)]
+    frame_count = frame_end - frame_start + 1
+    sizes: Dict[Tuple[str, int], List[float]] = {
+        (a.name, c.index): [0.0] * frame_count for a, c in all_chains
+    }
+
+    def sample(frame: int) -> None:
+        for armature, chain in all_chains:
+            bounds = chain_bounds(armature, chain)
+            if bounds is not None:
+                sizes[(armature.name, chain.index)][frame - frame_start] = screen_size(
+                    scene, camera, *bounds
+                )
+
+    schedule.sample_frames(scene, frame_start, frame_end, sample)
+
+    flags: Dict[Tuple[str, int], List[bool]] = {}
+    for key, values in sizes.items():
+        state = LodState()
+        flags[key] = [state.update(size, settings) for size in values]
+    return flags
+
+
+def physics_ranges(
+    flags: Sequence[bool], frame_start: int, settings: LodSettings
+) -> List[Tuple[int, int]]:
+    """
+    Frame ranges where a chain is fully in physics.
+    Gaps too short to fade out, disable, re-enable, settle and fade in again are
+    filled.
+    """
+
+    ranges = schedule.ranges_from_flags(flags, frame_start)
+    lead = settings.fade_frames + settings.settle_frames
+    merged: List[Tuple[int, int]] = []
+    for start, end in ranges:
+        if len(merged) > 0 and start - merged[-1][1] <= lead + settings.fade_frames:
+            merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def apply_schedule(
+    armature: bpy.types.Object,
+    chain: chains.Chain,
+    flags: Sequence[bool],
+    frame_start: int,
+    settings: LodSettings,
+) -> None:
+    """
+    Key the LOD influence of `chain` and disable its rigid bodies where it is
+    in FK.
+
+    For each physics range `[a, b]` the chain rigid bodies are enabled from
+    `a - fade - settle` so they settle on the FK pose, the influence fades in
+    from `a - fade` to `a`, fades out from `b` to `b + fade` and the bodies are
+    disabled again after `b + fade`.
+    """
+
+    ensure_lod_drivers(armature, chain)
+    frame_end = frame_start + len(flags) - 1
+    fade = settings.fade_frames
+    lead = fade + settings.settle_frames
+    ranges = physics_ranges(flags, frame_start, settings)
+
+    keys: List[Tuple[float, float]] = []
+    inactive: List[Tuple[int, int]] = []
+    cursor = frame_start
+    for start, end in ranges:
+        fade_in_start = start - fade if start > frame_start else start
+        enable_start = start - lead if start > frame_start else start
+        if enable_start > cursor:
+            inactive.append((cursor, enable_start - 1))
+        if start > frame_start:
+            keys.append((fade_in_start, 0.0))
+        keys.append((start, 1.0))
+        keys.append((end, 1.0))
+        if end < frame_end:
+            keys.append((end + fade, 0.0))
+        cursor = end + fade + 1
+    if len(ranges) == 0:
+        keys.append((frame_start, 0.0))
+    if cursor <= frame_end:
+        inactive.append((cursor, frame_end))
+
+    data_path = f'pose.bones["{chain.slider_name}"]["{LOD_PROPERTY}"]'
+    clear_lod_keys(armature, chain)
+    if armature.animation_data is None:
+        armature.animation_data_create()
+    if armature.animation_data.action is None:
+        armature.animation_data.action = bpy.data.actions.new(
+            f"{armature.name}_YureRig_LOD"
+        )
+    fcurve = armature.animation_data.action.fcurves.new(
+        data_path, action_group="YureRig LOD"
+    )
+    fcurve.keyframe_points.add(len(keys))
+    fcurve.keyframe_points.foreach_set("co", [c for key in keys for c in key])
+    for point in fcurve.keyframe_points:
+        point.interpolation = "LINEAR"
+    fcurve.update()
+
+    schedule.set_source(armature, chain, SCHEDULE_SOURCE, inactive)
+
+
+def clear_lod_keys(armature: bpy.types.Object, chain: chains.Chain) -> None:
+    if armature.animation_data is None or armature.animation_data.action is None:
+        return
+    action = armature.animation_data.action
+    fcurve = action.fcurves.find(f'pose.bones["{chain.slider_name}"]["{LOD_PROPERTY}"]')
+    if fcurve is not None:
+        action.fcurves.remove(fcurve)
+
+
+def clear_schedule(armature: bpy.types.Object, chain: chains.Chain) -> None:
+    clear_lod_keys(armature, chain)
+    slider = armature.pose.bones.get(chain.slider_name)
+    if slider is not None and LOD_PROPERTY in slider:
+        slider[LOD_PROPERTY] = 1.0
+    schedule.set_source(armature, chain, SCHEDULE_SOURCE, [])
+
+
+# Drivers
+#################################################
+
+
+def ensure_lod_drivers(armature: bpy.types.Object, chain: chains.Chain) -> None:
+    """
+    Make the chain drivers multiply the slider value by the LOD influence.
+    """
+
+    slider = armature.pose.bones[chain.slider_name]
+    if LOD_PROPERTY not in slider:
+        slider[LOD_PROPERTY] = 1.0
+    data_path = f'pose.bones["{chain.slider_name}"]["{LOD_PROPERTY}"]'
+
+    def add_lod_variable(driver: bpy.types.Driver) -> bool:
+        if "lod" in driver.variables:
+            return False
+        var = driver.variables.new()
+        var.name = "lod"
+        var.type = "SINGLE_PROP"
+        var.targets[0].id = armature
+        var.targets[0].data_path = data_path
+        return True
+
+    def_bone_names = set(chain.def_bone_names())
+    if armature.animation_data is not None:
+        for fcurve in armature.animation_data.drivers:
+            match = chains.def_bone_data_path_pattern.match(fcurve.data_path)
+            if match is None or f"DEF_YURERIG_{match.groups()[0]}" not in (
+                def_bone_names
+            ):
+                continue
+            if add_lod_variable(fcurve.driver):
+                # Influence of the CTRL_YURERIG_ bone, or the weight of either
+                # target of the lean blend constraint
+                fcurve.driver.expression = fcurve.driver.expression.replace(
+                    "locZ / maxLocZ", "locZ / maxLocZ * lod"
+                )
+
+    for obj in itertools.chain(chain.goals(), chain.rigidbodies()):
+        if obj.animation_data is None:
+            continue
+        for fcurve in obj.animation_data.drivers:
+            if fcurve.data_path in chains.RESET_DRIVER_DATA_PATHS:
+                if add_lod_variable(fcurve.driver):
+                    fcurve.driver.expression = "locZ * lod == 0"
+
+
+# Live mode
+#################################################
+
+
+class LiveLodState(LodState):
+    """
+    Hysteresis of a chain in live mode, with the rigid bodies and the frames
+    left to settle before the influence fades in.
+    """
+
+    __slots__ = ("enabled", "settle", "influence")
+
+    def __init__(self, influence: float = 1.0) -> None:
+        super().__init__()
+        self.enabled = True
+        self.settle = 0
+        self.influence = influence
+
+
+class LiveChain:
+    """
+    Names of the bones and rigid bodies of a chain switched by the live mode,
+    gathered once when the live mode is turned on, so switching a frame does
+    not search the chains.
+    """
+
+    __slots__ = ("armature_name", "slider_name", "ctrl_names", "body_names", "state")
+
+    def __init__(self, armature: bpy.types.Object, chain: chains.Chain):
+        self.armature_name = armature.name
+        self.slider_name = chain.slider_name
+        self.ctrl_names = list(chain.ctrl_bone_names())
+        self.body_names = [obj.name for obj in chain.rigidbodies()]
+        slider = armature.pose.bones[chain.slider_name]
+        self.state = LiveLodState(float(slider.get(LOD_PROPERTY, 1.0)))
+
+
+live_chains: List[LiveChain] = []
+
+
+def is_animated(id_data: bpy.types.ID, data_path: str) -> bool:
+    animation_data = id_data.animation_data
+    return (
+        animation_data is not None
+        and animation_data.action is not None
+        and animation_data.action.fcurves.find(data_path) is not None
+    )
+
+
+def gather_live_chains(scene: bpy.types.Scene) -> List[LiveChain]:
+    """
+    Chains of `scene` the live mode can switch.
+    Chains with a keyed LOD influence or keyed rigid bodies are skipped,
+    because animation evaluation overwrites the values set before it on each
+    frame. Compute or clear the LOD schedule and the slider activity first.
+    """
+
+    live: List[LiveChain] = []
+    for armature in chains.rigged_armatures(scene):
+        for chain in chains.get_chains(armature):
+            data_path = f'pose.bones["{chain.slider_name}"]["{LOD_PROPERTY}"]'
+            if is_animated(armature, data_path) or any(
+                is_animated(obj, schedule.ENABLED_DATA_PATH)
+                for obj in chain.rigidbodies()
+            ):
+                print(
+                    f"YureRig: live LOD skips {armature.name} {chain.slider_name}, "
+                    + "its LOD influence or rigid bodies are keyed"
+                )
+                continue
+            live.append(LiveChain(armature, chain))
+    return live
+
+
+@persistent  # type: ignore
+def frame_change_pre(scene: bpy.types.Scene, *args: object) -> None:
+    """
+    Evaluate the active camera once per frame and switch chains between
+    physics and FK right away.
+    Chains switching back to physics get their rigid bodies enabled
+    `settle_frames` before the influence fades in, like the precomputed
+    schedule, so they settle on the FK pose first.
+    Properties are only written when a chain fades or switches.
+    """
+
+    props = scene.yurerig
+    camera = props.lod_camera or scene.camera
+    if not props.use_live_lod or camera is None:
+        return
+    settings = LodSettings.from_props(props)
+    step = 1 / (settings.fade_frames + 1)
+    objects = bpy.data.objects
+    for live in live_chains:
+        armature = objects.get(live.armature_name)
+        if armature is None:
+            continue
+        state = live.state
+        bounds = bone_bounds(armature, live.ctrl_names)
+        size = 0.0 if bounds is None else screen_size(scene, camera, *bounds)
+        physics = state.update(size, settings)
+        influence = state.influence
+        enabled = state.enabled
+        if physics:
+            if not state.enabled:
+                state.enabled = True
+                state.settle = settings.settle_frames
+            if state.settle > 0:
+                state.settle -= 1
+            else:
+                influence = min(influence + step, 1.0)
+        else:
+            influence = max(influence - step, 0.0)
+            state.enabled = influence > 0
+            state.settle = 0
+        if influence != state.influence:
+            state.influence = influence
+            slider = armature.pose.bones.get(live.slider_name)
+            if slider is not None:
+                slider[LOD_PROPERTY] = influence
+        if state.enabled != enabled:
+            for name in live.body_names:
+                obj = objects.get(name)
+                if obj is not None and obj.rigid_body is not None:
+                    obj.rigid_body.enabled = state.enabled
+
+
+def set_live(enabled: bool, scene: Optional[bpy.types.Scene] = None) -> None:
+    """
+    Turn the live mode on for the chains of `scene`, or off.
+    """
+
+    handlers = bpy.app.handlers.frame_change_pre
+    live_chains.clear()
+    if enabled and scene is not None:
+        live_chains.extend(gather_live_chains(scene))
+        if frame_change_pre not in handlers:
+            handlers.append(frame_change_pre)
+    elif frame_change_pre in handlers:
+        handlers.remove(frame_change_pre)
+
+
+def prepare_live(scene: bpy.types.Scene) -> None:
+    """
+    Add the LOD driver variables needed by the live mode.
+    """
+
+    for armature in chains.rigged_armatures(scene):
+        for chain in chains.get_chains(armature):
+            ensure_lod_drivers(armature, chain)
+
+
+# Entry points
+#################################################
+
+
+def compute_and_apply(
+    scene: bpy.types.Scene,
+    camera: bpy.types.Object,
+    armatures: Sequence[bpy.types.Object],
+    frame_start: int,
+    frame_end: int,
+    settings: LodSettings,
+) -> Tuple[int, int]:
+    """
+    Compute the LOD schedule and apply it.
+    Return the number of chains and the number of chain frames switched to FK.
+    """
+
+    flags = compute_schedule(scene, camera, armatures, frame_start, frame_end, settings)
+    fk_frames = 0
+    armatures_by_name = {a.name: a for a in armatures}
+    touched: Set[Tuple[str, int]] = set()
+    for armature_name, index in flags:
+        armature = armatures_by_name[armature_name]
+        chain = chains.get_chain(armature, index)
+        if chain is None:
+            continue
+        values = flags[(armature_name, index)]
+        apply_schedule(armature, chain, values, frame_start, settings)
+        fk_frames += values.count(False)
+        touched.add((armature_name, index))
+    return len(touched), fk_frames
+
+
+def compute_lod_schedule(
+    operator: bpy.types.Operator, context: bpy.types.Context
+) -> Set[str]:
+    """
+    Implementation of `YURERIG_OT_ComputeLodScheduleOperator`.
+    """
+
+    scene = context.scene
+    props = scene.yurerig
+    camera = props.lod_camera or scene.camera
+    if camera is None:
+        operator.report({"ERROR"}, "Scene has no camera")
+        return {"CANCELLED"}
+
+    chain_count, fk_frames = compute_and_apply(
+        scene,
+        camera,
+        chains.rigged_armatures(scene),
+        scene.frame_start,
+        scene.frame_end,
+        LodSettings.from_props(props),
+    )
+    operator.report(
+        {"INFO"},
+        f"Success Compute LOD Schedule: {chain_count} chains, "
+        + f"{fk_frames} chain frames in FK",
+    )
+    return {"FINISHED"}
+
+
+def clear_lod_schedule(
+    operator: bpy.types.Operator, context: bpy.types.Context
+) -> Set[str]:
+    """
+    Implementation of `YURERIG_OT_ClearLodScheduleOperator`.
+    """
+
+    count = 0
+    for armature in chains.rigged_armatures(context.scene):
+        for chain in chains.get_chains(armature):
+            clear_schedule(armature, chain)
+            count += 1
+    operator.report({"INFO"}, f"Success Clear LOD Schedule: {count} chains")
+    return {"FINISHED"}
+
+
+# Headless command
+#################################################
+
+
+def parse_args(argv: Sequence[str], scene: bpy.types.Scene) -> argparse.Namespace:
+    props = scene.yurerig
+    parser = argparse.ArgumentParser(
+        prog="yurerig_lod", description="Compute the YureRig camera LOD schedule."
+    )
+    parser.add_argument("--camera")
+    parser.add_argument("--frame-start", type=int, default=scene.frame_start)
+    parser.add_argument("--frame-end", type=int, default=scene.frame_end)
+    parser.add_argument(
+        "--fk-screen-size", type=float, default=props.lod_fk_screen_size
+    )
+    parser.add_argument(
+        "--physics-screen-size", type=float, default=props.lod_physics_screen_size
+    )
+    parser.add_argument("--fade-frames", type=int, default=props.lod_fade_frames)
+    parser.add_argument("--settle-frames", type=int, default=props.lod_settle_frames)
+    parser.add_argument("--save", action="store_true")
+    return parser.parse_args(argv)
+
+
+def command(args: argparse.Namespace, scene: bpy.types.Scene) -> None:
+    """
+    Compute and apply the LOD schedule.
+    """
+
+    props = scene.yurerig
+    camera = (
+        bpy.data.objects[args.camera]
+        if args.camera is not None
+        else props.lod_camera or scene.camera
+    )
+    settings = LodSettings(
+        args.fk_screen_size,
+        args.physics_screen_size,
+        args.fade_frames,
+        args.settle_frames,
+    )
+    chain_count, fk_frames = compute_and_apply(
+        scene,
+        camera,
+        chains.rigged_armatures(scene),
+        args.frame_start,
+        args.frame_end,
+        settings,
+    )
+    print(f"YureRig: LOD schedule for {chain_count} chains, {fk_frames} FK frames")
+    if args.save:
+        bpy.ops.wm.save_mainfile()
@@ -0,0 +1,211 @@
+import re
+from typing import Dict, Iterable, List, Set
+
+import bpy
+
+# Every datablock YureRig creates is named with a `<KIND>_YURERIG_` prefix or a
+# `BoneShape_YURERIG` suffix. One of them is an orphan when nothing uses it
+# anymore, or when the rig part owning it is gone:
+#
+# - RIGIDBODY_YURERIG_X, RIGIDBODY_YURERIG_X_Root and GOAL_YURERIG_X belong to
+#   the PHYS_YURERIG_X bone of some armature,
+# - joints belong to the two rigid bodies they connect and a shared root to
+#   the joints using it,
+# - bone shapes belong to the pose bones using them,
+# - meshes, curves and actions belong to the objects using them.
+#
+# Linked and fake user datablocks are never touched.
+
+owned_name_pattern = re.compile(
+    r"^(?:RIGIDBODY|GOAL|JOINT|CTRL|DECO|PHYS|UNIT|COLLIDER)_YURERIG_|BoneShape_YURERIG"
+)
+body_name_pattern = re.compile(r"^(?:RIGIDBODY|GOAL)_YURERIG_(.+?)(?:_Root)?$")
+
+# Rough sizes in bytes, to estimate the memory held by orphans
+ID_BYTES = 1024
+OBJECT_BYTES = 2048
+VERTEX_BYTES = 16
+EDGE_BYTES = 16
+LOOP_BYTES = 16
+POLYGON_BYTES = 16
+CURVE_POINT_BYTES = 48
+FCURVE_BYTES = 256
+KEYFRAME_BYTES = 64
+
+
+class OrphanReport:
+    """
+    Number and estimated size in bytes of orphans per datablock type.
+    """
+
+    __slots__ = ("counts", "sizes")
+
+    def __init__(self) -> None:
+        self.counts: Dict[str, int] = {}
+        self.sizes: Dict[str, int] = {}
+
+    def add(self, ids: Iterable[bpy.types.ID]) -> None:
+        for id_data in ids:
+            kind = type(id_data).__name__
+            self.counts[kind] = self.counts.get(kind, 0) + 1
+            self.sizes[kind] = self.sizes.get(kind, 0) + estimate_size(id_data)
+
+    @property
+    def total_count(self) -> int:
+        return sum(self.counts.values())
+
+    @property
+    def total_size(self) -> int:
+        return sum(self.sizes.values())
+
+    def summary(self) -> str:
+        kinds = ", ".join(
+            f"{count} {kind}" for kind, count in sorted(self.counts.items())
+        )
+        size = self.total_size / (1024 * 1024)
+        return f"{self.total_count} datablocks ({kinds}), about {size:.2f} MB"
+
+
+def estimate_size(id_data: bpy.types.ID) -> int:
+    if isinstance(id_data, bpy.types.Object):
+        return OBJECT_BYTES
+    if isinstance(id_data, bpy.types.Mesh):
+        return (
+            ID_BYTES
+            + len(id_data.vertices) * VERTEX_BYTES
+            + len(id_data.edges) * EDGE_BYTES
+            + len(id_data.loops) * LOOP_BYTES
+            + len(id_data.polygons) * POLYGON_BYTES
+        )
+    if isinstance(id_data, bpy.types.Curve):
+        points = sum(len(s.points) + len(s.bezier_points) for s in id_data.splines)
+        return ID_BYTES + points * CURVE_POINT_BYTES
+    if isinstance(id_data, bpy.types.Action):
+        keyframes = sum(len(fcurve.keyframe_points) for fcurve in id_data.fcurves)
+        return (
+            ID_BYTES + len(id_data.fcurves) * FCURVE_BYTES + keyframes * KEYFRAME_BYTES
+        )
+    return ID_BYTES
+
+
+def is_owned(id_data: bpy.types.ID) -> bool:
+    return (
+        id_data.library is None
+        and not id_data.use_fake_user
+        and owned_name_pattern.search(id_data.name) is not None
+    )
+
+
+def find_orphan_objects() -> Set[bpy.types.Object]:
+    phys_names: Set[str] = set()
+    shapes_in_use: Set[bpy.types.Object] = set()
+    for obj in bpy.data.objects:
+        if obj.type != "ARMATURE" or obj.pose is None:
+            continue
+        for pose_bone in obj.pose.bones:
+            if pose_bone.name.startswith("PHYS_YURERIG_"):
+                phys_names.add(pose_bone.name[13:])
+            if pose_bone.custom_shape is not None:
+                shapes_in_use.add(pose_bone.custom_shape)
+
+    orphans: Set[bpy.types.Object] = set()
+    joints: List[bpy.types.Object] = []
+    shared_roots: List[bpy.types.Object] = []
+    for obj in bpy.data.objects:
+        if not is_owned(obj):
+            continue
+        if obj.users == 0:
+            orphans.add(obj)
+        elif obj.name.endswith("BoneShape_YURERIG"):
+            if obj not in shapes_in_use:
+                orphans.add(obj)
+        elif obj.name.startswith(("DECO_YURERIG_PHYS", "DECO_YURERIG_FK")):
+            # Slider labels are only kept joined into the slider root shape
+            orphans.add(obj)
+        elif obj.name.startswith("JOINT_YURERIG_"):
+            joints.append(obj)
+        elif obj.name.endswith("_Shared_Root"):
+            shared_roots.append(obj)
+        else:
+            match = body_name_pattern.match(obj.name)
+            if match is not None and match.groups()[0] not in phys_names:
+                orphans.add(obj)
+
+    joined: Set[bpy.types.Object] = set()
+    for joint in joints:
+        constraint = joint.rigid_body_constraint
+        if (
+            constraint is None
+            or constraint.object1 is None
+            or constraint.object2 is None
+            or constraint.object1 in orphans
+            or constraint.object2 in orphans
+        ):
+            orphans.add(joint)
+        else:
+            joined.add(constraint.object1)
+            joined.add(constraint.object2)
+    orphans.update(root for root in shared_roots if root not in joined)
+    return orphans
+
+
+def find_orphan_data(removed: Set[bpy.types.Object]) -> List[bpy.types.ID]:
+    """
+    Meshes, curves and actions used by nothing but the objects `removed`.
+    """
+
+    removed_users: Dict[bpy.types.ID, int] = {}
+    for obj in removed:
+        for id_data in (obj.data, obj.animation_data and obj.animation_data.action):
+            if id_data is not None:
+                removed_users[id_data] = removed_users.get(id_data, 0) + 1
+
+    data: List[bpy.types.ID] = []
+    for collection in (bpy.data.meshes, bpy.data.curves, bpy.data.actions):
+        for id_data in collection:
+            if is_owned(id_data) and id_data.users <= removed_users.get(id_data, 0):
+                data.append(id_data)
+    return data
+
+
+def scan() -> OrphanReport:
+    """
+    Report the YureRig orphans without removing them.
+    """
+
+    objects = find_orphan_objects()
+    report = OrphanReport()
+    report.add(objects)
+    report.add(find_orphan_data(objects))
+    return report
+
+
+def purge() -> OrphanReport:
+    """
+    Remove all YureRig orphans in bulk and report what was removed.
+    """
+
+    report = OrphanReport()
+    objects = find_orphan_objects()
+    if len(objects) > 0:
+        report.add(objects)
+        bpy.data.batch_remove(objects)
+    data = find_orphan_data(set())
+    if len(data) > 0:
+        report.add(data)
+        bpy.data.batch_remove(data)
+    return report
+
+
+def purge_orphans(operator: bpy.types.Operator, context: bpy.types.Context) -> Set[str]:
+    """
+    Implementation of `YURERIG_OT_PurgeOrphansOperator`.
+    """
+
+    if operator.scan_only:
+        report = scan()
+        operator.report({"INFO"}, f"Found Yure Rig orphans: {report.summary()}")
+    else:
+        report = purge()
+        operator.report({"INFO"}, f"Success Purge Orphans: {report.summary()}")
+    return {"FINISHED"}
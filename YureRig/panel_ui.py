@@ -1,9 +1,38 @@
 import re
+import sys
 from typing import List, Optional, Tuple
 
 import bpy
 
 
+def get_category(context: bpy.types.Context) -> str:
+    """
+    Get the 'Addon Tab' setting from preferences, or the default category when
+    the addon preferences are not available yet.
+    """
+
+    addon = context.preferences.addons.get(__package__)
+    if addon is None or addon.preferences is None:
+        return str(YURERIG_PT_MAIN_PanelUI.bl_category)
+    return str(addon.preferences.category)
+
+
+def pre_register() -> None:
+    """
+    Set Category of Panels before registering them, so that each panel is
+    registered only once on addon startup.
+    """
+
+    category = get_category(bpy.context)
+    for panel in classes:
+        panel.bl_category = category
+
+
+def is_baked_playback_active() -> bool:
+    playback = sys.modules.get(f"{__package__}.playback")
+    return playback is not None and bool(playback.is_active())
+
+
 def update_panel(
     self: Optional[bpy.props.StringProperty], context: bpy.types.Context
 ) -> None:
@@ -11,29 +40,16 @@ def update_panel(
     Update Category of Panel by preferences 'Addon Tab' setting.
     """
 
-    panels: List[bpy.types.Panel] = [
-        YURERIG_PT_MAIN_PanelUI,
-        YURERIG_PT_ControllerParameter_PanelUI,
-        YURERIG_PT_RigidBodyParameter_PanelUI,
-        YURERIG_PT_RigidBodyJointParameter_PanelUI,
-        YURERIG_PT_RigidBodyJointLimitParameter_PanelUI,
-        YURERIG_PT_RigidBodyJointLimitAngleParameter_PanelUI,
-        YURERIG_PT_RigidBodyJointLimitLinearParameter_PanelUI,
-        YURERIG_PT_RigidBodyJointSpringLinearrParameter_PanelUI,
-        YURERIG_PT_RigidBodyJointSpringParameter_PanelUI,
-        YURERIG_PT_RigidBodyJointSpringAngularParameter_PanelUI,
-        YURERIG_PT_RigidBodyJointSpringLinearrParameter_PanelUI,
-        YURERIG_PT_BoneColorSet_PanelUI,
-        YURERIG_PT_Setup_PanelUI,
-    ]
+    category = get_category(context)
+    if YURERIG_PT_MAIN_PanelUI.bl_category == category:
+        return
 
     try:
-        for panel in panels:
+        for panel in reversed(classes):
             if "bl_rna" in panel.__dict__:
                 bpy.utils.unregister_class(panel)
-            panel.bl_category = context.preferences.addons[
-                __package__
-            ].preferences.category
+        for panel in classes:
+            panel.bl_category = category
             bpy.utils.register_class(panel)
     except Exception:
         pass
@@ -53,6 +69,7 @@ class YURERIG_PT_ControllerParameter_PanelUI(bpy.types.Panel):
         col.use_property_split = True
         col.prop(props, "controller_bone_radius")
         col.prop(props, "controller_slider_size")
+        col.operator("orito_itsuki.yurerig_update_shapes")
 
 
 class YURERIG_PT_RigidBodyParameter_PanelUI(bpy.types.Panel):
@@ -71,6 +88,10 @@ class YURERIG_PT_RigidBodyParameter_PanelUI(bpy.types.Panel):
         col.prop(props, "rigidbody_size_x", text="Size X")
         col.prop(props, "rigidbody_size_z", text="Size Z")
         col.prop(props, "rigidbody_gap", text="Gap")
+        col.prop(props, "rigidbody_auto_fit")
+        sub = col.column()
+        sub.active = props.rigidbody_auto_fit
+        sub.prop(props, "rigidbody_fit_weight")
         col.prop(props, "rigidbody_mass", text="Mass")
 
 
@@ -306,6 +327,11 @@ class YURERIG_PT_Setup_PanelUI(bpy.types.Panel):
 
         col = self.layout.column()
 
+        col.prop(props, "reset_mode")
+        col.prop(props, "constraint_topology")
+        col.prop(props, "share_root_body")
+        col.prop(props, "mirror_setup")
+
         col.separator()
         col.operator("orito_itsuki.yurerig_setup")
 
@@ -328,8 +354,18 @@ class YURERIG_PT_Setup_PanelUI(bpy.types.Panel):
         )
         box.operator("orito_itsuki.yurerig_add_extra_joint")
 
+        col.separator()
+        box = col.box()
+        box.label(text="Add Cross Joints")
+        box.prop(props, "cross_joint_max_distance")
+        box.prop(props, "cross_joint_max_degree")
+        box.operator("orito_itsuki.yurerig_add_cross_joints")
+
         col.separator()
         col.operator("orito_itsuki.yurerig_update_parameters")
+        col.operator("orito_itsuki.yurerig_apply_sweep_profile")
+        col.operator("orito_itsuki.yurerig_convert_reset_mode")
+        col.operator("orito_itsuki.yurerig_convert_topology")
 
         col.separator(factor=3)
         col.operator(
@@ -338,7 +374,261 @@ class YURERIG_PT_Setup_PanelUI(bpy.types.Panel):
         )
 
         col.separator(factor=5)
-        col.operator("orito_itsuki.yurerig_remove")
+        op = col.operator(
+            "orito_itsuki.yurerig_remove", text="Remove Selected Yure Rig Chains"
+        )
+        op.mode = "SELECTED"
+        op = col.operator("orito_itsuki.yurerig_remove")
+        op.mode = "ALL"
+
+        col.separator()
+        col.operator("orito_itsuki.yurerig_purge_orphans")
+        col.operator("orito_itsuki.yurerig_analyze_dependencies")
+        col.operator("orito_itsuki.yurerig_footprint_report")
+
+
+class YURERIG_PT_Farm_PanelUI(bpy.types.Panel):
+    bl_label = "Simulation Cache"
+    bl_idname = "YURERIG_PT_Farm_PanelUI"
+    bl_space_type = "VIEW_3D"
+    bl_region_type = "UI"
+    bl_parent_id = "YURERIG_PT_MAIN_PanelUI"
+    bl_options = {"DEFAULT_CLOSED"}
+
+    def draw(self, context: bpy.types.Context) -> None:
+        props = context.scene.yurerig
+
+        col = self.layout.column()
+        col.prop(props, "farm_cache_directory", text="")
+
+        box = col.box()
+        box.label(text="Farm")
+        box.prop(props, "use_farm_cache")
+        box.operator("orito_itsuki.yurerig_prepare_farm_cache")
+
+        box = col.box()
+        box.label(text="Baked Playback")
+        if is_baked_playback_active():
+            box.label(text="Playing back baked motion", icon="PLAY")
+            box.operator("orito_itsuki.yurerig_unload_farm_cache", text="Simulate")
+        else:
+            row = box.row(align=True)
+            row.operator("orito_itsuki.yurerig_bake_playback", text="Bake")
+            row.operator("orito_itsuki.yurerig_load_farm_cache", text="Load")
+        box.prop(props, "use_cached_playback")
+
+
+class YURERIG_PT_Library_PanelUI(bpy.types.Panel):
+    bl_label = "Library"
+    bl_idname = "YURERIG_PT_Library_PanelUI"
+    bl_space_type = "VIEW_3D"
+    bl_region_type = "UI"
+    bl_parent_id = "YURERIG_PT_MAIN_PanelUI"
+    bl_options = {"DEFAULT_CLOSED"}
+
+    def draw(self, context: bpy.types.Context) -> None:
+        col = self.layout.column()
+        col.operator("orito_itsuki.yurerig_prepare_library")
+        col.separator()
+        col.operator("orito_itsuki.yurerig_instance_linked_rig")
+        col.operator("orito_itsuki.yurerig_register_linked_bodies")
+
+
+class YURERIG_PT_Lod_PanelUI(bpy.types.Panel):
+    bl_label = "Camera LOD"
+    bl_idname = "YURERIG_PT_Lod_PanelUI"
+    bl_space_type = "VIEW_3D"
+    bl_region_type = "UI"
+    bl_parent_id = "YURERIG_PT_MAIN_PanelUI"
+    bl_options = {"DEFAULT_CLOSED"}
+
+    def draw(self, context: bpy.types.Context) -> None:
+        props = context.scene.yurerig
+
+        col = self.layout.column()
+        col.prop(props, "lod_camera")
+        col.prop(props, "lod_fk_screen_size")
+        col.prop(props, "lod_physics_screen_size")
+        col.prop(props, "lod_fade_frames")
+        col.prop(props, "lod_settle_frames")
+        col.separator()
+        col.prop(props, "use_live_lod")
+        row = col.row(align=True)
+        row.enabled = not props.use_live_lod
+        row.operator("orito_itsuki.yurerig_compute_lod_schedule", text="Compute")
+        row.operator("orito_itsuki.yurerig_clear_lod_schedule", text="Clear")
+
+
+class YURERIG_PT_SliderActivity_PanelUI(bpy.types.Panel):
+    bl_label = "Slider Activity"
+    bl_idname = "YURERIG_PT_SliderActivity_PanelUI"
+    bl_space_type = "VIEW_3D"
+    bl_region_type = "UI"
+    bl_parent_id = "YURERIG_PT_MAIN_PanelUI"
+    bl_options = {"DEFAULT_CLOSED"}
+
+    def draw(self, context: bpy.types.Context) -> None:
+        props = context.scene.yurerig
+
+        col = self.layout.column()
+        col.prop(props, "slider_activity_settle_frames")
+        col.prop(props, "use_slider_activity")
+        row = col.row(align=True)
+        row.operator("orito_itsuki.yurerig_update_slider_activity", text="Update")
+        row.operator("orito_itsuki.yurerig_clear_slider_activity", text="Clear")
+
+
+class YURERIG_PT_Deactivation_PanelUI(bpy.types.Panel):
+    bl_label = "Deactivation"
+    bl_idname = "YURERIG_PT_Deactivation_PanelUI"
+    bl_space_type = "VIEW_3D"
+    bl_region_type = "UI"
+    bl_parent_id = "YURERIG_PT_MAIN_PanelUI"
+    bl_options = {"DEFAULT_CLOSED"}
+
+    def draw(self, context: bpy.types.Context) -> None:
+        props = context.scene.yurerig
+
+        col = self.layout.column()
+        col.prop(props, "deactivation_rest_speed")
+        col.prop(props, "deactivation_wake_frames")
+        col.prop(props, "use_start_deactivated")
+        row = col.row(align=True)
+        row.operator("orito_itsuki.yurerig_tune_deactivation", text="Tune")
+        row.operator("orito_itsuki.yurerig_clear_deactivation", text="Clear")
+        row = col.row(align=True)
+        row.operator(
+            "orito_itsuki.yurerig_set_chain_deactivation", text="Auto"
+        ).mode = "AUTO"
+        row.operator(
+            "orito_itsuki.yurerig_set_chain_deactivation", text="Never Sleep"
+        ).mode = "OFF"
+
+
+class YURERIG_UL_CollisionGroups(bpy.types.UIList):
+    def draw_item(
+        self,
+        context: bpy.types.Context,
+        layout: bpy.types.UILayout,
+        data: bpy.types.PropertyGroup,
+        item: bpy.types.PropertyGroup,
+        icon: int,
+        active_data: bpy.types.PropertyGroup,
+        active_propname: str,
+    ) -> None:
+        row = layout.row(align=True)
+        row.prop(item, "name", text="", emboss=False, icon="GROUP")
+        row.prop(item, "collider_collection", text="")
+
+
+class YURERIG_UL_CollisionInteractions(bpy.types.UIList):
+    def draw_item(
+        self,
+        context: bpy.types.Context,
+        layout: bpy.types.UILayout,
+        data: bpy.types.PropertyGroup,
+        item: bpy.types.PropertyGroup,
+        icon: int,
+        active_data: bpy.types.PropertyGroup,
+        active_propname: str,
+    ) -> None:
+        props = context.scene.yurerig
+        row = layout.row(align=True)
+        row.prop_search(item, "group_a", props, "collision_groups", text="")
+        row.prop_search(item, "group_b", props, "collision_groups", text="")
+
+
+class YURERIG_PT_CollisionLayers_PanelUI(bpy.types.Panel):
+    bl_label = "Collision Layers"
+    bl_idname = "YURERIG_PT_CollisionLayers_PanelUI"
+    bl_space_type = "VIEW_3D"
+    bl_region_type = "UI"
+    bl_parent_id = "YURERIG_PT_MAIN_PanelUI"
+    bl_options = {"DEFAULT_CLOSED"}
+
+    def draw(self, context: bpy.types.Context) -> None:
+        from . import collision_layers
+
+        props = context.scene.yurerig
+
+        col = self.layout.column()
+        col.label(text="Groups")
+        row = col.row()
+        row.template_list(
+            "YURERIG_UL_CollisionGroups",
+            "",
+            props,
+            "collision_groups",
+            props,
+            "collision_groups_index",
+            rows=3,
+        )
+        sub = row.column(align=True)
+        sub.operator("orito_itsuki.yurerig_add_collision_group", icon="ADD", text="")
+        sub.operator(
+            "orito_itsuki.yurerig_remove_collision_group", icon="REMOVE", text=""
+        )
+
+        row = col.row(align=True)
+        row.operator("orito_itsuki.yurerig_assign_collision_group", text="Assign")
+        row.operator(
+            "orito_itsuki.yurerig_assign_collision_group", text="Unassign"
+        ).unassign = True
+
+        col.label(text="Collides With")
+        row = col.row()
+        row.template_list(
+            "YURERIG_UL_CollisionInteractions",
+            "",
+            props,
+            "collision_interactions",
+            props,
+            "collision_interactions_index",
+            rows=3,
+        )
+        sub = row.column(align=True)
+        sub.operator(
+            "orito_itsuki.yurerig_add_collision_interaction", icon="ADD", text=""
+        )
+        sub.operator(
+            "orito_itsuki.yurerig_remove_collision_interaction", icon="REMOVE", text=""
+        )
+
+        names = [group.name for group in props.collision_groups]
+        if len(names) > 0:
+            box = col.box()
+            try:
+                masks = collision_layers.scene_plan(context.scene)
+            except collision_layers.CollisionPlanError as e:
+                box.label(text=str(e), icon="ERROR")
+            else:
+                grid = box.grid_flow(
+                    row_major=True, columns=len(names) + 2, even_columns=False
+                )
+                grid.label(text="")
+                for i in range(len(names)):
+                    grid.label(text=str(i))
+                grid.label(text="Layers")
+                for i, a in enumerate(names):
+                    grid.label(text=f"{i}: {a}")
+                    for b in names:
+                        grid.label(
+                            text="",
+                            icon=(
+                                "CHECKBOX_HLT"
+                                if collision_layers.collides(masks, a, b)
+                                else "CHECKBOX_DEHLT"
+                            ),
+                        )
+                    grid.label(
+                        text=", ".join(
+                            str(layer)
+                            for layer in collision_layers.layer_list(masks[a])
+                        )
+                    )
+
+        col.operator("orito_itsuki.yurerig_generate_colliders")
+        col.operator("orito_itsuki.yurerig_apply_collision_layers")
 
 
 class YURERIG_PT_MAIN_PanelUI(bpy.types.Panel):
@@ -354,3 +644,27 @@ class YURERIG_PT_MAIN_PanelUI(bpy.types.Panel):
 
     def draw(self, context: bpy.types.Context) -> None:
         pass
+
+
+classes = (
+    YURERIG_PT_MAIN_PanelUI,
+    YURERIG_PT_ControllerParameter_PanelUI,
+    YURERIG_PT_RigidBodyParameter_PanelUI,
+    YURERIG_PT_RigidBodyJointParameter_PanelUI,
+    YURERIG_PT_RigidBodyJointLimitParameter_PanelUI,
+    YURERIG_PT_RigidBodyJointLimitAngleParameter_PanelUI,
+    YURERIG_PT_RigidBodyJointLimitLinearParameter_PanelUI,
+    YURERIG_PT_RigidBodyJointSpringParameter_PanelUI,
+    YURERIG_PT_RigidBodyJointSpringAngularParameter_PanelUI,
+    YURERIG_PT_RigidBodyJointSpringLinearrParameter_PanelUI,
+    YURERIG_PT_BoneColorSet_PanelUI,
+    YURERIG_PT_Setup_PanelUI,
+    YURERIG_PT_Farm_PanelUI,
+    YURERIG_PT_Library_PanelUI,
+    YURERIG_PT_Lod_PanelUI,
+    YURERIG_PT_SliderActivity_PanelUI,
+    YURERIG_PT_Deactivation_PanelUI,
+    YURERIG_UL_CollisionGroups,
+    YURERIG_UL_CollisionInteractions,
+    YURERIG_PT_CollisionLayers_PanelUI,
+)
@@ -0,0 +1,920 @@
+from collections import deque
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# "Setup Yure Rig" runs in two stages.
+#
+# - `plan` turns the rest data of the selected bones and the setup settings
+#   into a `RigPlan`: the new bones, the rigid bodies with their matrices and
+#   box sizes, the joints, and the constraints and drivers binding them.
+# - `builder.apply_plan` creates the datablocks of a plan in one pass per kind.
+#
+# This module only depends on the standard library and NumPy, so plans can be
+# built, checked and profiled with plain CPython. The YureRig package imports
+# bpy, so load this file by path outside of Blender (see
+# `scripts/benchmark_planner.py`).
+#
+# Positions are in armature space. Vectors are float64 arrays of shape
+# (n, 3) and matrices of shape (n, 4, 4).
+#
+# `mirror_plan` turns the plan of one side of a left/right pair into the plan
+# of the other side by reflecting it across the armature X axis, without
+# reading or planning the other side again.
+
+# Same names as in `chains`, which imports bpy
+KINEMATIC_RESET_CONSTRAINT_NAME = "YureRig Kinematic Reset"
+DEF_BLEND_CONSTRAINT_NAME = "YureRig Blend"
+
+CTRL_LAYER = 8
+PHYS_LAYER = 16
+
+# Corners of a box of size 1 centered at the origin, in the vertex order of
+# the rigid body meshes, and the faces of the box
+BOX_CORNERS = np.array(
+    [
+        (0.5, -0.5, 0.5),
+        (0.5, -0.5, -0.5),
+        (-0.5, -0.5, 0.5),
+        (-0.5, -0.5, -0.5),
+        (0.5, 0.5, 0.5),
+        (0.5, 0.5, -0.5),
+        (-0.5, 0.5, 0.5),
+        (-0.5, 0.5, -0.5),
+    ]
+)
+BOX_FACES = (
+    (0, 1, 3, 2),
+    (4, 5, 7, 6),
+    (0, 1, 5, 4),
+    (1, 2, 6, 5),
+    (2, 3, 7, 6),
+    (3, 0, 4, 7),
+)
+
+
+def slider_bone_name(index: int) -> str:
+    return f"CTRL_YURERIG_physics_influence_slider_{index}_BoneShape_YURERIG"
+
+
+def slider_root_bone_name(index: int) -> str:
+    return f"DECO_YURERIG_physics_influence_slider_root_{index}_BoneShape_YURERIG"
+
+
+NAME_SEPARATORS = ".-_ "
+
+
+def flip_side_name(name: str) -> str:
+    """
+    Name of the opposite side by the Blender naming conventions, like
+    `bpy.utils.flip_name`: `Hair.L` and `Hair_R.001`, `l-Hair`, `LeftHair`
+    or `hair_right`. Names without a side are returned unchanged.
+    """
+
+    number = ""
+    if name[-1:].isdigit():
+        index = name.rfind(".")
+        if index >= 0 and name[index + 1 : index + 2].isdigit():
+            number = name[index:]
+            name = name[:index]
+
+    sides = {"l": "r", "r": "l", "L": "R", "R": "L"}
+    if len(name) > 1 and name[-2] in NAME_SEPARATORS and name[-1] in sides:
+        return name[:-1] + sides[name[-1]] + number
+    if len(name) > 1 and name[1] in NAME_SEPARATORS and name[0] in sides:
+        return sides[name[0]] + name[1:] + number
+    if len(name) > 5:
+        lower = name.lower()
+        for word, other in (("right", "left"), ("left", "right")):
+            index = lower.find(word)
+            if index != 0 and index != len(name) - len(word):
+                continue
+            found = name[index : index + len(word)]
+            if found[0].islower():
+                replace = other
+            elif found[1].isupper():
+                replace = other.upper()
+            else:
+                replace = other.capitalize()
+            return name[:index] + replace + name[index + len(word) :] + number
+    return name + number
+
+
+def slider_placement(
+    settings: "SetupSettings", slider_index: int
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Heads, tails and Z axes of the slider root and slider bones `slider_index`.
+    """
+
+    slider_gap = settings.slider_size / 6 * 2
+    slider_z = (settings.slider_size + slider_gap) * slider_index + slider_gap
+    return (
+        np.array([(1.0, 0.0, slider_z)] * 2),
+        np.array([(1.0, 1.0, slider_z)] * 2),
+        np.array([(0.0, 0.0, 1.0)] * 2),
+    )
+
+
+class SetupSettings:
+    """
+    Values of `YURERIG_Props` used by the planner.
+    """
+
+    __slots__ = (
+        "slider_size",
+        "size_x",
+        "size_z",
+        "gap",
+        "root_size",
+        "mass",
+        "reset_mode",
+        "share_root_body",
+        "topology",
+        "fitted_sizes",
+    )
+
+    def __init__(
+        self,
+        slider_size: float = 1.0,
+        size_x: float = 0.05,
+        size_z: float = 0.05,
+        gap: float = 0.01,
+        root_size: float = 0.05,
+        mass: float = 1.0,
+        reset_mode: str = "GOAL",
+        share_root_body: bool = False,
+        topology: str = "CLASSIC",
+        fitted_sizes: Optional[Dict[str, Tuple[float, float]]] = None,
+    ):
+        self.slider_size = slider_size
+        self.size_x = size_x
+        self.size_z = size_z
+        self.gap = gap
+        self.root_size = root_size
+        self.mass = mass
+        self.reset_mode = reset_mode
+        self.share_root_body = share_root_body
+        self.topology = topology
+        # (size X, size Z) of the bodies fitted to the skin, keyed by the bone
+        # names without prefix, overriding `size_x` and `size_z`
+        self.fitted_sizes = fitted_sizes if fitted_sizes is not None else {}
+
+    @classmethod
+    def from_props(cls, props: Any) -> "SetupSettings":
+        return cls(
+            props.controller_slider_size,
+            props.rigidbody_size_x,
+            props.rigidbody_size_z,
+            props.rigidbody_gap,
+            props.rigidbody_root_size,
+            props.rigidbody_mass,
+            props.reset_mode,
+            props.share_root_body,
+            props.constraint_topology,
+        )
+
+
+class SelectedBones:
+    """
+    Rest data of the selected bones and the active bone.
+    `parents` holds the index of the parent bone, or -1 when the parent is not
+    selected. `z_axes` are the Z axes of the bones and `rotations` their pose
+    rotation quaternions.
+    """
+
+    __slots__ = (
+        "names",
+        "parents",
+        "active",
+        "heads",
+        "tails",
+        "z_axes",
+        "rotations",
+        "connects",
+    )
+
+    def __init__(
+        self,
+        names: Sequence[str],
+        parents: Sequence[int],
+        active: int,
+        heads: np.ndarray,
+        tails: np.ndarray,
+        z_axes: np.ndarray,
+        rotations: Optional[np.ndarray] = None,
+        connects: Optional[Sequence[bool]] = None,
+    ):
+        n = len(names)
+        self.names = tuple(names)
+        self.parents = tuple(parents)
+        self.active = active
+        self.heads = np.asarray(heads, dtype=np.float64).reshape(n, 3)
+        self.tails = np.asarray(tails, dtype=np.float64).reshape(n, 3)
+        self.z_axes = np.asarray(z_axes, dtype=np.float64).reshape(n, 3)
+        if rotations is None:
+            rotations = np.tile((1.0, 0.0, 0.0, 0.0), (n, 1))
+        self.rotations = np.asarray(rotations, dtype=np.float64).reshape(n, 4)
+        self.connects = tuple(connects) if connects is not None else (False,) * n
+
+
+class BoneTable:
+    """
+    Edit bones to create or update.
+    `kinds` are `DECO`, `SLIDER`, `PHYS` or `CTRL` and `parents` are bone
+    names, or `None` for no parent. `layers` is -1 to keep the default layer.
+    """
+
+    __slots__ = (
+        "names",
+        "kinds",
+        "parents",
+        "heads",
+        "tails",
+        "z_axes",
+        "rotations",
+        "connects",
+        "layers",
+    )
+
+    def __init__(
+        self,
+        names: Sequence[str],
+        kinds: Sequence[str],
+        parents: Sequence[Optional[str]],
+        heads: np.ndarray,
+        tails: np.ndarray,
+        z_axes: np.ndarray,
+        rotations: np.ndarray,
+        connects: Sequence[bool],
+        layers: Sequence[int],
+    ):
+        self.names = tuple(names)
+        self.kinds = tuple(kinds)
+        self.parents = tuple(parents)
+        self.heads = heads
+        self.tails = tails
+        self.z_axes = z_axes
+        self.rotations = rotations
+        self.connects = tuple(connects)
+        self.layers = tuple(layers)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+
+class BodyTable:
+    """
+    Rigid body objects with their world matrices and box sizes.
+    `kinds` are `ACTIVE`, `ROOT` or `GOAL`. `targets` are the bones followed
+    by roots and goals and the rigid bodies goals are fixed to.
+    """
+
+    __slots__ = ("names", "kinds", "matrices", "sizes", "parent_bones", "targets")
+
+    def __init__(
+        self,
+        names: Sequence[str],
+        kinds: Sequence[str],
+        matrices: np.ndarray,
+        sizes: np.ndarray,
+        parent_bones: Sequence[str],
+        targets: Sequence[str],
+    ):
+        self.names = tuple(names)
+        self.kinds = tuple(kinds)
+        self.matrices = matrices
+        self.sizes = sizes
+        self.parent_bones = tuple(parent_bones)
+        self.targets = tuple(targets)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def vertices(self) -> np.ndarray:
+        """
+        Box vertices of all bodies in object space, of shape (n, 8, 3).
+        """
+
+        vertices: np.ndarray = (
+            BOX_CORNERS[np.newaxis, :, :] * self.sizes[:, np.newaxis, :]
+        )
+        return vertices
+
+
+class JointTable:
+    """
+    Rigid body joints between `object1` and `object2`.
+    """
+
+    __slots__ = ("names", "object1", "object2", "locations")
+
+    def __init__(
+        self,
+        names: Sequence[str],
+        object1: Sequence[str],
+        object2: Sequence[str],
+        locations: np.ndarray,
+    ):
+        self.names = tuple(names)
+        self.object1 = tuple(object1)
+        self.object2 = tuple(object2)
+        self.locations = locations
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+
+class ConstraintRecord:
+    """
+    Constraint on the pose bone `owner` when `on_bone`, otherwise on the object
+    `owner`. It targets the armature bone `subtarget`, or the object
+    `target_object` when set. ARMATURE constraints target the armature bones
+    `subtargets` instead.
+    """
+
+    __slots__ = (
+        "owner",
+        "on_bone",
+        "type",
+        "subtarget",
+        "target_object",
+        "head_tail",
+        "name",
+        "subtargets",
+    )
+
+    def __init__(
+        self,
+        owner: str,
+        on_bone: bool,
+        type: str,
+        subtarget: str = "",
+        target_object: Optional[str] = None,
+        head_tail: float = 0.0,
+        name: Optional[str] = None,
+        subtargets: Sequence[str] = (),
+    ):
+        self.owner = owner
+        self.on_bone = on_bone
+        self.type = type
+        self.subtarget = subtarget
+        self.target_object = target_object
+        self.head_tail = head_tail
+        self.name = name
+        self.subtargets = tuple(subtargets)
+
+
+class DriverRecord:
+    """
+    Driver reading the Z location of the physics influence slider.
+    `data_path` is relative to the constraint at index `constraint` of the plan,
+    or to the object `owner` when `constraint` is -1. With `use_max` the
+    "Max Slider Value" of the slider is available as `maxLocZ`.
+    """
+
+    __slots__ = ("owner", "constraint", "data_path", "expression", "use_max")
+
+    def __init__(
+        self,
+        owner: str,
+        constraint: int,
+        data_path: str,
+        expression: str,
+        use_max: bool = False,
+    ):
+        self.owner = owner
+        self.constraint = constraint
+        self.data_path = data_path
+        self.expression = expression
+        self.use_max = use_max
+
+
+class RigPlan:
+    """
+    Everything "Setup Yure Rig" creates for one chain group and its slider.
+    `renames` are the selected bones getting the `DEF_YURERIG_` prefix.
+    `mesh_sources` maps rigid bodies to the bodies whose mesh they reuse.
+    """
+
+    __slots__ = (
+        "settings",
+        "active",
+        "slider_index",
+        "max_slider_value",
+        "renames",
+        "def_names",
+        "bones",
+        "bodies",
+        "joints",
+        "constraints",
+        "drivers",
+        "mesh_sources",
+    )
+
+    def __init__(
+        self,
+        settings: SetupSettings,
+        active: str,
+        slider_index: int,
+        renames: Sequence[Tuple[str, str]],
+        def_names: Sequence[str],
+        bones: BoneTable,
+        bodies: BodyTable,
+        joints: JointTable,
+        constraints: Sequence[ConstraintRecord],
+        drivers: Sequence[DriverRecord],
+        mesh_sources: Optional[Dict[str, str]] = None,
+    ):
+        self.settings = settings
+        self.active = active
+        self.slider_index = slider_index
+        self.max_slider_value = settings.slider_size * 2 / 6
+        self.renames = tuple(renames)
+        self.def_names = tuple(def_names)
+        self.bones = bones
+        self.bodies = bodies
+        self.joints = joints
+        self.constraints = tuple(constraints)
+        self.drivers = tuple(drivers)
+        self.mesh_sources = mesh_sources if mesh_sources is not None else {}
+
+    @property
+    def slider_name(self) -> str:
+        return slider_bone_name(self.slider_index)
+
+    @property
+    def slider_root_name(self) -> str:
+        return slider_root_bone_name(self.slider_index)
+
+    def validate(self) -> List[str]:
+        """
+        Return the problems of the plan, empty when it can be applied.
+        """
+
+        problems: List[str] = []
+        bone_names = set(self.bones.names)
+        body_names = set(self.bodies.names)
+        for names, kind in (
+            (self.bones.names, "bone"),
+            (self.bodies.names, "rigid body"),
+            (self.joints.names, "joint"),
+        ):
+            if len(set(names)) != len(names):
+                problems.append(f"duplicate {kind} names")
+        for name, parent in zip(self.bones.names, self.bones.parents):
+            if (
+                parent is not None
+                and parent not in bone_names
+                and parent != self.active
+            ):
+                problems.append(f"{name}: unknown parent {parent}")
+        for name, a, b in zip(
+            self.joints.names, self.joints.object1, self.joints.object2
+        ):
+            if a not in body_names or b not in body_names:
+                problems.append(f"{name}: unknown rigid body")
+        if not np.all(np.isfinite(self.bodies.matrices)):
+            problems.append("degenerate rigid body matrix")
+        for driver in self.drivers:
+            if not -1 <= driver.constraint < len(self.constraints):
+                problems.append(f"{driver.data_path}: unknown constraint")
+        return problems
+
+
+def body_matrices(
+    heads: np.ndarray, tails: np.ndarray, z_axes: np.ndarray, locations: np.ndarray
+) -> np.ndarray:
+    """
+    World matrices with the Y axis along the bones and the Z axis along
+    `z_axes`, placed at `locations`.
+    """
+
+    y = tails - heads
+    y = y / np.linalg.norm(y, axis=1, keepdims=True)
+    z = z_axes / np.linalg.norm(z_axes, axis=1, keepdims=True)
+    x = np.cross(y, z)
+    x = x / np.linalg.norm(x, axis=1, keepdims=True)
+    matrices = np.zeros((len(heads), 4, 4))
+    matrices[:, :3, 0] = x
+    matrices[:, :3, 1] = y
+    matrices[:, :3, 2] = z
+    matrices[:, :3, 3] = locations
+    matrices[:, 3, 3] = 1.0
+    return matrices
+
+
+def chain_order(bones: SelectedBones) -> List[int]:
+    """
+    Indices of the selected bones chained from the active bone, parents first.
+    Bones already set up and the bones below them are skipped.
+    """
+
+    children: Dict[int, List[int]] = {}
+    for i, parent in enumerate(bones.parents):
+        children.setdefault(parent, []).append(i)
+
+    order: List[int] = []
+    queue = deque([bones.active])
+    while len(queue) > 0:
+        for child in children.get(queue.popleft(), []):
+            if child == bones.active or bones.names[child].startswith("CTRL_YURERIG_"):
+                continue
+            order.append(child)
+            queue.append(child)
+    return order
+
+
+def plan(bones: SelectedBones, settings: SetupSettings, slider_index: int) -> RigPlan:
+    """
+    Plan the rig of the bones chained from the active bone of `bones`, driven
+    by the physics influence slider `slider_index`.
+    """
+
+    active = bones.names[bones.active]
+    order = chain_order(bones)
+    n = len(order)
+    idx = np.array(order, dtype=np.int64)
+    heads = bones.heads[idx]
+    tails = bones.tails[idx]
+    z_axes = bones.z_axes[idx]
+
+    def_names = [
+        name if name.startswith("DEF_YURERIG_") else f"DEF_YURERIG_{name}"
+        for name in (bones.names[i] for i in order)
+    ]
+    renames = [
+        (bones.names[i], d) for i, d in zip(order, def_names) if bones.names[i] != d
+    ]
+    base_names = [d[12:] for d in def_names]
+    base_by_index = dict(zip(order, base_names))
+    parent_bases = [base_by_index.get(bones.parents[i]) for i in order]
+
+    slider = slider_bone_name(slider_index)
+    slider_root = slider_root_bone_name(slider_index)
+
+    # Bones
+    slider_head, slider_tail, slider_up = slider_placement(settings, slider_index)
+    identity = np.tile((1.0, 0.0, 0.0, 0.0), (2 * n + 2, 1))
+    rotations = identity.copy()
+    rotations[2 + n :] = bones.rotations[idx]
+
+    bone_table = BoneTable(
+        [slider_root, slider]
+        + [f"PHYS_YURERIG_{b}" for b in base_names]
+        + [f"CTRL_YURERIG_{b}" for b in base_names],
+        ["DECO", "SLIDER"] + ["PHYS"] * n + ["CTRL"] * n,
+        [None, slider_root]
+        + [active if p is None else f"PHYS_YURERIG_{p}" for p in parent_bases]
+        + [active if p is None else f"CTRL_YURERIG_{p}" for p in parent_bases],
+        np.concatenate([slider_head, heads, heads]),
+        np.concatenate([slider_tail, tails, tails]),
+        np.concatenate([slider_up, z_axes, z_axes]),
+        rotations,
+        [False, False] + [bones.connects[i] for i in order] * 2,
+        [-1, -1] + [PHYS_LAYER] * n + [CTRL_LAYER] * n,
+    )
+
+    # Rigid bodies: roots, chain bodies, then goals
+    body_names: List[str] = []
+    body_kinds: List[str] = []
+    body_parent_bones: List[str] = []
+    body_targets: List[str] = []
+    body_heads: List[np.ndarray] = []
+    body_tails: List[np.ndarray] = []
+    body_z_axes: List[np.ndarray] = []
+    body_locations: List[np.ndarray] = []
+    body_sizes: List[Tuple[float, float, float]] = []
+    root_names: Dict[str, str] = {}
+
+    root_size = (settings.root_size,) * 3
+    if settings.share_root_body and any(p is None for p in parent_bases):
+        a = bones.active
+        shared = f"RIGIDBODY_YURERIG_{active}_Shared_Root"
+        head, tail = bones.heads[a], bones.tails[a]
+        body_names.append(shared)
+        body_kinds.append("ROOT")
+        body_parent_bones.append(active)
+        body_targets.append(active)
+        body_heads.append(tail)
+        body_tails.append(tail + (tail - head))
+        body_z_axes.append(bones.z_axes[a])
+        body_locations.append(tail)
+        body_sizes.append(root_size)
+    for k, base in enumerate(base_names):
+        if parent_bases[k] is not None:
+            continue
+        if settings.share_root_body:
+            root_names[base] = f"RIGIDBODY_YURERIG_{active}_Shared_Root"
+            continue
+        root = f"RIGIDBODY_YURERIG_{base}_Root"
+        root_names[base] = root
+        body_names.append(root)
+        body_kinds.append("ROOT")
+        body_parent_bones.append(active)
+        body_targets.append(active)
+        body_heads.append(heads[k])
+        body_tails.append(tails[k])
+        body_z_axes.append(z_axes[k])
+        body_locations.append(heads[k])
+        body_sizes.append(root_size)
+
+    lengths = np.linalg.norm(tails - heads, axis=1)
+    body_kind_list = ["ACTIVE"]
+    if settings.reset_mode != "KINEMATIC":
+        body_kind_list.append("GOAL")
+    for kind in body_kind_list:
+        prefix = "RIGIDBODY_YURERIG_" if kind == "ACTIVE" else "GOAL_YURERIG_"
+        for k, base in enumerate(base_names):
+            body_names.append(f"{prefix}{base}")
+            body_kinds.append(kind)
+            body_parent_bones.append(f"CTRL_YURERIG_{base}" if kind == "GOAL" else "")
+            body_targets.append(f"RIGIDBODY_YURERIG_{base}" if kind == "GOAL" else "")
+            body_heads.append(heads[k])
+            body_tails.append(tails[k])
+            body_z_axes.append(z_axes[k])
+            body_locations.append((heads[k] + tails[k]) / 2)
+            size_x, size_z = settings.fitted_sizes.get(
+                base, (settings.size_x, settings.size_z)
+            )
+            body_sizes.append((size_x, lengths[k] - settings.gap, size_z))
+
+    empty = np.zeros((0, 3))
+    body_table = BodyTable(
+        body_names,
+        body_kinds,
+        body_matrices(
+            np.array(body_heads).reshape(-1, 3) if body_heads else empty,
+            np.array(body_tails).reshape(-1, 3) if body_tails else empty,
+            np.array(body_z_axes).reshape(-1, 3) if body_z_axes else empty,
+            np.array(body_locations).reshape(-1, 3) if body_locations else empty,
+        ),
+        np.array(body_sizes, dtype=np.float64).reshape(-1, 3),
+        body_parent_bones,
+        body_targets,
+    )
+
+    # Joints along the chains
+    joint_names: List[str] = []
+    joint_object1: List[str] = []
+    joint_locations: List[np.ndarray] = []
+    tail_by_base = dict(zip(base_names, tails))
+    for k, base in enumerate(base_names):
+        parent = parent_bases[k]
+        if parent is None:
+            joint_names.append(f"JOINT_YURERIG_{base}")
+            joint_object1.append(root_names[base])
+            joint_locations.append(heads[k])
+        else:
+            joint_names.append(f"JOINT_YURERIG_{parent}_{base}")
+            joint_object1.append(f"RIGIDBODY_YURERIG_{parent}")
+            joint_locations.append((tail_by_base[parent] + heads[k]) / 2)
+    joint_table = JointTable(
+        joint_names,
+        joint_object1,
+        [f"RIGIDBODY_YURERIG_{b}" for b in base_names],
+        np.array(joint_locations).reshape(-1, 3),
+    )
+
+    # Constraints and drivers
+    constraints: List[ConstraintRecord] = [
+        ConstraintRecord(slider, True, "LIMIT_LOCATION")
+    ]
+    drivers: List[DriverRecord] = []
+    for def_name, base in zip(def_names, base_names):
+        if settings.topology == "LEAN":
+            constraints.append(
+                ConstraintRecord(
+                    def_name,
+                    True,
+                    "ARMATURE",
+                    name=DEF_BLEND_CONSTRAINT_NAME,
+                    subtargets=(f"PHYS_YURERIG_{base}", f"CTRL_YURERIG_{base}"),
+                )
+            )
+            for k, expression in enumerate(("locZ / maxLocZ", "1 - locZ / maxLocZ")):
+                drivers.append(
+                    DriverRecord(
+                        def_name,
+                        len(constraints) - 1,
+                        f"targets[{k}].weight",
+                        expression,
+                        use_max=True,
+                    )
+                )
+        else:
+            constraints.append(
+                ConstraintRecord(
+                    def_name, True, "COPY_TRANSFORMS", f"PHYS_YURERIG_{base}"
+                )
+            )
+            constraints.append(
+                ConstraintRecord(
+                    def_name, True, "COPY_TRANSFORMS", f"CTRL_YURERIG_{base}"
+                )
+            )
+            drivers.append(
+                DriverRecord(
+                    def_name,
+                    len(constraints) - 1,
+                    "influence",
+                    "1 - locZ / maxLocZ",
+                    use_max=True,
+                )
+            )
+        constraints.append(
+            ConstraintRecord(
+                f"PHYS_YURERIG_{base}",
+                True,
+                "COPY_ROTATION",
+                target_object=f"RIGIDBODY_YURERIG_{base}",
+            )
+        )
+    # Lean roots and goals are parented to their bones by the builder instead
+    for name, kind, parent_bone in zip(
+        body_table.names, body_table.kinds, body_table.parent_bones
+    ):
+        if kind == "ROOT" and settings.topology != "LEAN":
+            constraints.append(ConstraintRecord(name, False, "CHILD_OF", parent_bone))
+        elif kind == "GOAL":
+            if settings.topology != "LEAN":
+                constraints.append(
+                    ConstraintRecord(
+                        name, False, "COPY_LOCATION", parent_bone, head_tail=0.5
+                    )
+                )
+                constraints.append(
+                    ConstraintRecord(name, False, "COPY_ROTATION", parent_bone)
+                )
+            drivers.append(
+                DriverRecord(name, -1, "rigid_body_constraint.enabled", "locZ == 0")
+            )
+    if settings.reset_mode == "KINEMATIC":
+        for base in base_names:
+            body = f"RIGIDBODY_YURERIG_{base}"
+            constraints.append(
+                ConstraintRecord(
+                    body,
+                    False,
+                    "COPY_TRANSFORMS",
+                    f"CTRL_YURERIG_{base}",
+                    head_tail=0.5,
+                    name=KINEMATIC_RESET_CONSTRAINT_NAME,
+                )
+            )
+            drivers.append(DriverRecord(body, -1, "rigid_body.kinematic", "locZ == 0"))
+            drivers.append(
+                DriverRecord(body, len(constraints) - 1, "influence", "locZ == 0")
+            )
+
+    return RigPlan(
+        settings,
+        active,
+        slider_index,
+        renames,
+        def_names,
+        bone_table,
+        body_table,
+        joint_table,
+        constraints,
+        drivers,
+    )
+
+
+def mirror_plan(rig_plan: RigPlan, slider_index: int) -> RigPlan:
+    """
+    Plan of the opposite side of `rig_plan`, reflected across the armature X
+    axis and driven by the physics influence slider `slider_index`.
+    Names are flipped with `flip_side_name` and the mirrored rigid bodies reuse
+    the meshes of their originals.
+    """
+
+    active = flip_side_name(rig_plan.active)
+    bases = [d[12:] for d in rig_plan.def_names]
+    flipped = {b: flip_side_name(b) for b in bases}
+
+    names: Dict[str, str] = {
+        rig_plan.active: active,
+        rig_plan.slider_name: slider_bone_name(slider_index),
+        rig_plan.slider_root_name: slider_root_bone_name(slider_index),
+        f"RIGIDBODY_YURERIG_{rig_plan.active}_Shared_Root": (
+            f"RIGIDBODY_YURERIG_{active}_Shared_Root"
+        ),
+    }
+    for base, other in flipped.items():
+        for prefix in (
+            "DEF_YURERIG_",
+            "CTRL_YURERIG_",
+            "PHYS_YURERIG_",
+            "RIGIDBODY_YURERIG_",
+            "GOAL_YURERIG_",
+        ):
+            names[prefix + base] = prefix + other
+        names[f"RIGIDBODY_YURERIG_{base}_Root"] = f"RIGIDBODY_YURERIG_{other}_Root"
+
+    # Joint names are built from the bone names and can not be split at "_",
+    # so they are rebuilt from the bodies they join
+    base_of_body = {f"RIGIDBODY_YURERIG_{b}": b for b in bases}
+    for name, object1, object2 in zip(
+        rig_plan.joints.names, rig_plan.joints.object1, rig_plan.joints.object2
+    ):
+        child = flipped[base_of_body[object2]]
+        parent = base_of_body.get(object1)
+        if parent is None:
+            names[name] = f"JOINT_YURERIG_{child}"
+        else:
+            names[name] = f"JOINT_YURERIG_{flipped[parent]}_{child}"
+
+    def flip(name: str) -> str:
+        return names.get(name, name)
+
+    def flip_optional(name: Optional[str]) -> Optional[str]:
+        return None if name is None else flip(name)
+
+    # Reflect positions and directions with M = diag(-1, 1, 1). Bone X axes are
+    # negated as well, so that mirrored frames stay right handed, which makes a
+    # rest matrix R into M R M and a pose rotation (w, x, y, z) into
+    # (w, x, -y, -z).
+    bones = rig_plan.bones
+    heads = bones.heads.copy()
+    tails = bones.tails.copy()
+    z_axes = bones.z_axes.copy()
+    heads[:, 0] *= -1
+    tails[:, 0] *= -1
+    z_axes[:, 0] *= -1
+    slider_rows = [
+        i for i, kind in enumerate(bones.kinds) if kind in ("DECO", "SLIDER")
+    ]
+    heads[slider_rows], tails[slider_rows], z_axes[slider_rows] = slider_placement(
+        rig_plan.settings, slider_index
+    )
+    rotations = bones.rotations * (1.0, 1.0, -1.0, -1.0)
+    bone_table = BoneTable(
+        [flip(n) for n in bones.names],
+        bones.kinds,
+        [flip_optional(p) for p in bones.parents],
+        heads,
+        tails,
+        z_axes,
+        rotations,
+        bones.connects,
+        bones.layers,
+    )
+
+    bodies = rig_plan.bodies
+    matrices = bodies.matrices.copy()
+    matrices[:, 0, :] *= -1
+    matrices[:, :, 0] *= -1
+    body_names = [flip(n) for n in bodies.names]
+    body_table = BodyTable(
+        body_names,
+        bodies.kinds,
+        matrices,
+        bodies.sizes.copy(),
+        [flip(n) for n in bodies.parent_bones],
+        [flip(n) for n in bodies.targets],
+    )
+
+    locations = rig_plan.joints.locations.copy()
+    locations[:, 0] *= -1
+    joint_table = JointTable(
+        [flip(n) for n in rig_plan.joints.names],
+        [flip(n) for n in rig_plan.joints.object1],
+        [flip(n) for n in rig_plan.joints.object2],
+        locations,
+    )
+
+    return RigPlan(
+        rig_plan.settings,
+        active,
+        slider_index,
+        [(flip_side_name(old), flip(new)) for old, new in rig_plan.renames],
+        [flip(n) for n in rig_plan.def_names],
+        bone_table,
+        body_table,
+        joint_table,
+        [
+            ConstraintRecord(
+                flip(c.owner),
+                c.on_bone,
+                c.type,
+                flip(c.subtarget),
+                flip_optional(c.target_object),
+                c.head_tail,
+                c.name,
+                [flip(n) for n in c.subtargets],
+            )
+            for c in rig_plan.constraints
+        ],
+        [
+            DriverRecord(
+                flip(d.owner), d.constraint, d.data_path, d.expression, d.use_max
+            )
+            for d in rig_plan.drivers
+        ],
+        {
+            mirrored: name
+            for name, mirrored in zip(bodies.names, body_names)
+            if mirrored != name
+        },
+    )
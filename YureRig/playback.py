@@ -0,0 +1,227 @@
+import re
+from typing import Dict, List, Optional, Tuple
+
+import bpy
+import numpy as np
+from bpy.app.handlers import persistent
+
+from . import bake_cache
+
+is_phys_bone_pattern = re.compile(r"^PHYS_YURERIG_(.+)")
+
+
+# Baked playback switches the PHYS_YURERIG_ bones to quaternion rotations,
+# mutes the constraints copying the rotation of their rigid bodies and
+# disables the chain rigid bodies. What to put back is stored on the armature
+# in `PLAYBACK_STATE_PROPERTY`, so a file saved during playback is restored
+# when it is loaded again.
+PLAYBACK_STATE_PROPERTY = "YureRig Playback"
+
+
+class CachedArmature:
+    """
+    Baked cache of an armature which is played back instead of simulated.
+    """
+
+    def __init__(self, armature: bpy.types.Object, reader: bake_cache.BakeCacheReader):
+        self.armature_name = armature.name
+        self.reader = reader
+
+        pose_bone_indices = {b.name: i for i, b in enumerate(armature.pose.bones)}
+        cache_rows: List[int] = []
+        pose_rows: List[int] = []
+        for row, name in enumerate(reader.header.bones):
+            if name in pose_bone_indices:
+                cache_rows.append(row)
+                pose_rows.append(pose_bone_indices[name])
+        self.cache_rows = np.array(cache_rows, dtype=np.int64)
+        self.pose_rows = np.array(pose_rows, dtype=np.int64)
+        self.rotations = np.zeros((len(pose_bone_indices), 4), dtype=np.float32)
+
+        self.bone_names = [reader.header.bones[row] for row in cache_rows]
+
+    def apply(self, scene: bpy.types.Scene, frame: int) -> None:
+        """
+        Write the cached rotations of `frame` to the PHYS_YURERIG_ bones in bulk.
+        """
+
+        armature = scene.objects.get(self.armature_name)
+        if armature is None:
+            return
+        pose_bones = armature.pose.bones
+        rotations = self.rotations
+        pose_bones.foreach_get("rotation_quaternion", rotations.ravel())
+        rotations[self.pose_rows] = self.reader.read_frame(frame)[self.cache_rows]
+        pose_bones.foreach_set("rotation_quaternion", rotations.ravel())
+        armature.update_tag()
+
+    def prepare(self, armature: bpy.types.Object) -> None:
+        """
+        Make the PHYS_YURERIG_ bones of `armature` play back and take the chain
+        rigid bodies out of the simulation, storing what to restore on
+        `armature`.
+        """
+
+        bones: Dict[str, Dict[str, object]] = {}
+        for name in self.bone_names:
+            pose_bone = armature.pose.bones[name]
+            muted: Dict[str, int] = {}
+            for constraint in pose_bone.constraints:
+                if constraint.type == "COPY_ROTATION" and not constraint.mute:
+                    constraint.mute = True
+                    muted[constraint.name] = 1
+            bones[name] = {
+                "rotation_mode": pose_bone.rotation_mode,
+                "rotation": [
+                    *pose_bone.rotation_quaternion,
+                    *pose_bone.rotation_euler,
+                    *pose_bone.rotation_axis_angle,
+                ],
+                "muted": muted,
+            }
+            pose_bone.rotation_mode = "QUATERNION"
+
+        rigidbodies: Dict[str, int] = {}
+        muted_activity: Dict[str, int] = {}
+        for bone_name in self.bone_names:
+            match = is_phys_bone_pattern.match(bone_name)
+            if match is None:
+                continue
+            obj = bpy.data.objects.get(f"RIGIDBODY_YURERIG_{match.groups()[0]}")
+            if obj is None or obj.rigid_body is None:
+                continue
+            fcurve = activity_fcurve(obj)
+            if fcurve is not None and not fcurve.mute:
+                fcurve.mute = True
+                muted_activity[obj.name] = 1
+            rigidbodies[obj.name] = int(obj.rigid_body.enabled)
+            obj.rigid_body.enabled = False
+
+        armature[PLAYBACK_STATE_PROPERTY] = {
+            "bones": bones,
+            "rigidbodies": rigidbodies,
+            "muted_activity": muted_activity,
+        }
+
+
+def restore(armature: bpy.types.Object) -> None:
+    """
+    Put back the rig state stored by `CachedArmature.prepare` on `armature`:
+    the constraints, rotation modes and rotations of the PHYS_YURERIG_ bones
+    and the chain rigid bodies.
+    """
+
+    if PLAYBACK_STATE_PROPERTY not in armature:
+        return
+    state = armature[PLAYBACK_STATE_PROPERTY].to_dict()
+    for name, bone in state["bones"].items():
+        pose_bone = armature.pose.bones.get(name)
+        if pose_bone is None:
+            continue
+        for constraint_name in bone["muted"]:
+            constraint = pose_bone.constraints.get(constraint_name)
+            if constraint is not None:
+                constraint.mute = False
+        # Changing the rotation mode converts the rotation, so the stored
+        # rotations are written afterwards
+        pose_bone.rotation_mode = bone["rotation_mode"]
+        rotation = list(bone["rotation"])
+        pose_bone.rotation_quaternion = rotation[0:4]
+        pose_bone.rotation_euler = rotation[4:7]
+        pose_bone.rotation_axis_angle = rotation[7:11]
+    for obj_name, enabled in state["rigidbodies"].items():
+        obj = bpy.data.objects.get(obj_name)
+        if obj is not None and obj.rigid_body is not None:
+            obj.rigid_body.enabled = bool(enabled)
+    for obj_name in state["muted_activity"]:
+        obj = bpy.data.objects.get(obj_name)
+        fcurve = activity_fcurve(obj) if obj is not None else None
+        if fcurve is not None:
+            fcurve.mute = False
+    del armature[PLAYBACK_STATE_PROPERTY]
+    armature.update_tag()
+
+
+def activity_fcurve(obj: bpy.types.Object) -> Optional[bpy.types.FCurve]:
+    """
+    F-Curve keying `rigid_body.enabled` from the chain activity schedule.
+    """
+
+    if obj.animation_data is None or obj.animation_data.action is None:
+        return None
+    return obj.animation_data.action.fcurves.find("rigid_body.enabled")
+
+
+cached_armatures: Dict[str, CachedArmature] = {}
+scene_name: Optional[str] = None
+# Simulation hash of the rig the played back caches were made for
+rig_hash: Optional[str] = None
+
+
+def is_active() -> bool:
+    return len(cached_armatures) > 0
+
+
+@persistent  # type: ignore
+def frame_change_pre(scene: bpy.types.Scene, *args: object) -> None:
+    if scene.name != scene_name:
+        return
+    frame = scene.frame_current
+    for cached in cached_armatures.values():
+        cached.apply(scene, frame)
+
+
+def activate(
+    scene: bpy.types.Scene,
+    caches: List[Tuple[bpy.types.Object, bake_cache.BakeCacheReader]],
+    cache_hash: Optional[str] = None,
+) -> None:
+    """
+    Play back `caches`, made for the rig of simulation hash `cache_hash`, on
+    `scene`.
+    The PHYS_YURERIG_ bones stop copying the rotation of their rigid bodies and
+    the chain rigid bodies are disabled, so seeking to any frame in either
+    direction never simulates the chains.
+    """
+
+    global scene_name, rig_hash
+
+    deactivate(scene)
+
+    scene_name = scene.name
+    rig_hash = cache_hash
+    for armature, reader in caches:
+        cached = CachedArmature(armature, reader)
+        cached.prepare(armature)
+        cached_armatures[armature.name] = cached
+
+    if frame_change_pre not in bpy.app.handlers.frame_change_pre:
+        bpy.app.handlers.frame_change_pre.append(frame_change_pre)
+    frame_change_pre(scene)
+
+
+def deactivate(scene: Optional[bpy.types.Scene] = None) -> None:
+    """
+    Stop playing back caches and restore the simulated rig, and the rigs of
+    `scene` saved during playback.
+    """
+
+    global scene_name, rig_hash
+
+    if frame_change_pre in bpy.app.handlers.frame_change_pre:
+        bpy.app.handlers.frame_change_pre.remove(frame_change_pre)
+
+    for cached in cached_armatures.values():
+        armature = bpy.data.objects.get(cached.armature_name)
+        if armature is not None:
+            restore(armature)
+    if scene is not None:
+        for obj in scene.objects:
+            if obj.type == "ARMATURE":
+                restore(obj)
+
+    for cached in cached_armatures.values():
+        cached.reader.close()
+    cached_armatures.clear()
+    scene_name = None
+    rig_hash = None
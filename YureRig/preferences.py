@@ -13,8 +13,60 @@ class YURERIG_Preferences(bpy.types.AddonPreferences):
     category: bpy.props.StringProperty(  # type: ignore
         default="YureRig", name="Addon Tab", update=panel_ui.update_panel
     )
+    auto_purge_orphans: bpy.props.BoolProperty(  # type: ignore
+        default=False,
+        name="Purge Orphans After Edits",
+        description="Remove the Yure Rig datablocks left without users after "
+        + "setting up, updating or removing a rig",
+    )
+    profile_operators: bpy.props.BoolProperty(  # type: ignore
+        default=False,
+        name="Profile Operators",
+        description="Append the phase timings of each Yure Rig operator run to a "
+        + "JSON lines log. Also enabled by the YURERIG_PROFILE environment variable",
+    )
+    profile_log_path: bpy.props.StringProperty(  # type: ignore
+        default="",
+        name="Profile Log",
+        description="JSON lines file the profile is appended to. "
+        + "Defaults to yurerig_profile.jsonl next to the .blend file",
+        subtype="FILE_PATH",
+    )
+    use_simulation_cache: bpy.props.BoolProperty(  # type: ignore
+        default=True,
+        name="Simulation Cache",
+        description="Keep baked simulations in a local cache keyed by the rig and "
+        + "animation hash, and reuse them instead of simulating identical shots",
+    )
+    simulation_cache_directory: bpy.props.StringProperty(  # type: ignore
+        default="",
+        name="Simulation Cache Directory",
+        description="Directory of the simulation cache. "
+        + "Defaults to yurerig_simulation_cache in the temporary directory",
+        subtype="DIR_PATH",
+    )
+    simulation_cache_size: bpy.props.IntProperty(  # type: ignore
+        default=4096,
+        min=1,
+        name="Simulation Cache Size (MB)",
+        description="The least recently used entries are removed above this size",
+    )
 
     def draw(self, context: bpy.types.Context) -> None:
         layout = self.layout
         col = layout.column()
         col.prop(self, "category")
+        col.prop(self, "auto_purge_orphans")
+        col.prop(self, "profile_operators")
+        sub = col.column()
+        sub.active = self.profile_operators
+        sub.prop(self, "profile_log_path")
+        col.prop(self, "use_simulation_cache")
+        sub = col.column()
+        sub.active = self.use_simulation_cache
+        sub.prop(self, "simulation_cache_directory")
+        sub.prop(self, "simulation_cache_size")
+        sub.operator("orito_itsuki.yurerig_clear_simulation_cache")
+
+
+classes = (YURERIG_Preferences,)
@@ -20,6 +20,29 @@ def unregister_props() -> None:
     del bpy.types.Scene.yurerig
 
 
+class YURERIG_CollisionGroup(bpy.types.PropertyGroup):
+    """
+    Chains and colliders sharing collision collections.
+    """
+
+    bl_idname = "YURERIG_CollisionGroup"
+    collider_collection: bpy.props.PointerProperty(  # type: ignore
+        type=bpy.types.Collection,
+        name="Colliders",
+        description="Rigid bodies which are put on the group collision collections",
+    )
+
+
+class YURERIG_CollisionInteraction(bpy.types.PropertyGroup):
+    """
+    Pair of collision groups colliding with each other.
+    """
+
+    bl_idname = "YURERIG_CollisionInteraction"
+    group_a: bpy.props.StringProperty(name="Group A")  # type: ignore
+    group_b: bpy.props.StringProperty(name="Group B")  # type: ignore
+
+
 class YURERIG_Props(bpy.types.PropertyGroup):
     """
     Addon-wide properties class.
@@ -44,6 +67,19 @@ class YURERIG_Props(bpy.types.PropertyGroup):
     rigidbody_gap: bpy.props.FloatProperty(  # type: ignore
         default=0.04, name="RigidBody Gap"
     )
+    rigidbody_auto_fit: bpy.props.BoolProperty(  # type: ignore
+        default=False,
+        name="Fit To Skin Weights",
+        description="Size the rigid bodies and goals along X and Z to the "
+        + "vertices weighted to their bones, instead of Size X and Size Z",
+    )
+    rigidbody_fit_weight: bpy.props.FloatProperty(  # type: ignore
+        default=0.5,
+        min=0,
+        max=1,
+        name="Fit Weight",
+        description="Smallest weight of a vertex counted by Fit To Skin Weights",
+    )
     rigidbody_mass: bpy.props.FloatProperty(  # type: ignore
         default=1, name="RigidBody Mass"
     )
@@ -179,6 +215,175 @@ class YURERIG_Props(bpy.types.PropertyGroup):
     physics_bone_color: bpy.props.FloatVectorProperty(  # type: ignore
         default=(1.0, 0.5, 0.5), name="Physics Bone Color", subtype="COLOR"
     )
+    farm_cache_directory: bpy.props.StringProperty(  # type: ignore
+        default="//yurerig_cache",
+        name="Farm Cache Directory",
+        subtype="DIR_PATH",
+    )
+    use_farm_cache: bpy.props.BoolProperty(  # type: ignore
+        default=False,
+        name="Use Farm Cache",
+        description="Render nodes play back the farm cache instead of simulating",
+    )
+    use_cached_playback: bpy.props.BoolProperty(  # type: ignore
+        default=True,
+        name="Use Simulation Cache",
+        description="Play back a matching entry of the simulation cache instead "
+        + "of simulating when playback or a command line render starts",
+    )
+    lod_camera: bpy.props.PointerProperty(  # type: ignore
+        type=bpy.types.Object,
+        name="LOD Camera",
+        description="Camera used for LOD. The scene camera is used when empty",
+        poll=lambda self, obj: obj.type == "CAMERA",
+    )
+    lod_fk_screen_size: bpy.props.FloatProperty(  # type: ignore
+        default=0.02,
+        min=0.0,
+        name="FK Screen Size",
+        description="Chains smaller than this on screen switch to FK",
+    )
+    lod_physics_screen_size: bpy.props.FloatProperty(  # type: ignore
+        default=0.04,
+        min=0.0,
+        name="Physics Screen Size",
+        description="Chains in FK switch back to physics at this size on screen",
+    )
+    lod_fade_frames: bpy.props.IntProperty(  # type: ignore
+        default=6, min=0, name="Fade Frames"
+    )
+    lod_settle_frames: bpy.props.IntProperty(  # type: ignore
+        default=12,
+        min=0,
+        name="Settle Frames",
+        description="Frames simulated before fading in so the chain settles",
+    )
+
+    reset_mode: bpy.props.EnumProperty(  # type: ignore
+        items=[
+            (
+                "GOAL",
+                "Reset Goal",
+                "Pin rigid bodies at FK with a goal body and a fixed joint per bone",
+            ),
+            (
+                "KINEMATIC",
+                "Kinematic",
+                "Make rigid bodies kinematic at FK and copy the FK pose, "
+                + "without extra bodies and joints",
+            ),
+        ],
+        default="GOAL",
+        name="Reset Mode",
+    )
+    share_root_body: bpy.props.BoolProperty(  # type: ignore
+        default=False,
+        name="Share Root Body",
+        description="Anchor all chains starting at the active bone to one "
+        + "kinematic root body",
+    )
+    mirror_setup: bpy.props.BoolProperty(  # type: ignore
+        default=False,
+        name="Mirror Setup",
+        description="Also set up the opposite side of the selected chains, "
+        + "named with .L/.R conventions, by mirroring them across the X axis",
+    )
+    constraint_topology: bpy.props.EnumProperty(  # type: ignore
+        items=[
+            (
+                "CLASSIC",
+                "Classic",
+                "Two Copy Transforms per deform bone and object constraints on "
+                + "goal and root bodies",
+            ),
+            (
+                "LEAN",
+                "Lean",
+                "One Armature constraint per deform bone and goal and root "
+                + "bodies parented to bones, detaching deform bones from their "
+                + "parents",
+            ),
+        ],
+        default="CLASSIC",
+        name="Constraint Topology",
+    )
+    cross_joint_max_distance: bpy.props.FloatProperty(  # type: ignore
+        default=0.1,
+        min=0.0,
+        name="Max Distance",
+        description="Bones farther apart than this are not joined",
+        subtype="DISTANCE",
+    )
+    cross_joint_max_degree: bpy.props.IntProperty(  # type: ignore
+        default=2,
+        min=1,
+        name="Max Joints per Bone",
+        description="Maximum number of cross joints of a rigid body",
+    )
+    collision_groups: bpy.props.CollectionProperty(  # type: ignore
+        type=YURERIG_CollisionGroup
+    )
+    collision_groups_index: bpy.props.IntProperty()  # type: ignore
+    collision_interactions: bpy.props.CollectionProperty(  # type: ignore
+        type=YURERIG_CollisionInteraction
+    )
+    collision_interactions_index: bpy.props.IntProperty()  # type: ignore
+
+    def update_use_live_lod(self, context: bpy.types.Context) -> None:
+        from . import lod
+
+        if self.use_live_lod:
+            lod.prepare_live(context.scene)
+        lod.set_live(self.use_live_lod, context.scene)
+
+    use_live_lod: bpy.props.BoolProperty(  # type: ignore
+        default=False,
+        name="Live LOD",
+        description="Switch chains between physics and FK while playing",
+        update=update_use_live_lod,
+    )
+
+    def update_slider_activity(self, context: bpy.types.Context) -> None:
+        from . import slider_activity
+
+        if self.use_slider_activity:
+            slider_activity.update_scene(context.scene)
+
+    use_slider_activity: bpy.props.BoolProperty(  # type: ignore
+        default=False,
+        name="Auto Slider Activity",
+        description="Disable the rigid bodies of chains where their physics "
+        + "influence slider is animated at FK, and reschedule them when the "
+        + "slider animation changes",
+        update=update_slider_activity,
+    )
+    slider_activity_settle_frames: bpy.props.IntProperty(  # type: ignore
+        default=12,
+        min=0,
+        name="Settle Frames",
+        description="Frames the rigid bodies are enabled before the slider "
+        + "leaves FK, so the chain settles",
+        update=update_slider_activity,
+    )
+    deactivation_rest_speed: bpy.props.FloatProperty(  # type: ignore
+        default=0.1,
+        min=0.0,
+        name="Rest Speed",
+        description="Speed in body lengths per second below which a rigid body "
+        + "of mass 1 may fall asleep. Heavier bodies sleep at lower speeds",
+    )
+    deactivation_wake_frames: bpy.props.IntProperty(  # type: ignore
+        default=2,
+        min=0,
+        name="Wake Frames",
+        description="Frames the rigid bodies are woken up before their chain "
+        + "is moved",
+    )
+    use_start_deactivated: bpy.props.BoolProperty(  # type: ignore
+        default=True,
+        name="Start Deactivated",
+        description="Start the chains at rest on the first frames asleep",
+    )
 
     def ctrl_bones(self, context: bpy.types.Context) -> List[Tuple[str, str, str]]:
         is_ctrl_bone_pattern = re.compile(r"^CTRL_.+")
@@ -197,3 +402,10 @@ class YURERIG_Props(bpy.types.PropertyGroup):
 
     selected_ctrl_bone1: bpy.props.EnumProperty(items=ctrl_bones)  # type: ignore
     selected_ctrl_bone2: bpy.props.EnumProperty(items=ctrl_bones)  # type: ignore
+
+
+classes = (
+    YURERIG_CollisionGroup,
+    YURERIG_CollisionInteraction,
+    YURERIG_Props,
+)
@@ -0,0 +1,107 @@
+from typing import Set, Tuple
+
+import bpy
+
+from . import builder, chains, lod, topology
+
+# Chains pin their rigid bodies to the FK pose while the physics influence
+# slider is at FK in one of two ways:
+#
+# - GOAL: a kinematic GOAL_YURERIG_ body per bone following the CTRL bone and
+#   a FIXED joint to the rigid body enabled at FK.
+#   Two Bullet bodies and two Bullet constraints per bone.
+# - KINEMATIC: the rigid body itself turns kinematic at FK and copies the
+#   transforms of the CTRL bone. One Bullet body and one Bullet constraint per
+#   bone.
+
+
+def remove_goal(obj: bpy.types.Object) -> None:
+    mesh = obj.data
+    bpy.data.objects.remove(obj)
+    if mesh is not None and mesh.users == 0:
+        bpy.data.meshes.remove(mesh)
+
+
+def convert_chain(
+    armature: bpy.types.Object, chain: chains.Chain, reset_mode: str
+) -> int:
+    """
+    Convert the reset mechanism of `chain` to `reset_mode`.
+    Return the number of converted bones.
+    """
+
+    count = 0
+    for name in chain.names:
+        rigidbody_obj = bpy.data.objects.get(f"RIGIDBODY_YURERIG_{name}")
+        if rigidbody_obj is None:
+            continue
+        goal_obj = bpy.data.objects.get(f"GOAL_YURERIG_{name}")
+        ctrl_bone_name = f"CTRL_YURERIG_{name}"
+        is_kinematic = (
+            rigidbody_obj.constraints.get(chains.KINEMATIC_RESET_CONSTRAINT_NAME)
+            is not None
+        )
+
+        if reset_mode == "KINEMATIC" and not is_kinematic:
+            if goal_obj is not None:
+                remove_goal(goal_obj)
+            builder.add_kinematic_reset(
+                rigidbody_obj, armature, ctrl_bone_name, chain.slider_name
+            )
+            count += 1
+        elif reset_mode == "GOAL" and goal_obj is None:
+            builder.remove_kinematic_reset(rigidbody_obj)
+            bone = armature.data.bones[ctrl_bone_name]
+            goal_obj = builder.make_rigidbody_reset_goal_object(
+                f"GOAL_YURERIG_{name}",
+                bone.head_local,
+                bone.tail_local,
+                bone.matrix_local.col[2].to_3d(),
+                chain.slider_name,
+                armature,
+                rigidbody_obj,
+            )
+            if topology.chain_topology(armature, chain) == "LEAN":
+                builder.parent_to_bone(goal_obj, armature, ctrl_bone_name)
+            else:
+                builder.add_reset_goal_constraints(goal_obj, armature, ctrl_bone_name)
+            count += 1
+
+    if count > 0 and lod.LOD_PROPERTY in armature.pose.bones[chain.slider_name]:
+        lod.ensure_lod_drivers(armature, chain)
+    return count
+
+
+def convert(armature: bpy.types.Object, reset_mode: str) -> Tuple[int, int]:
+    """
+    Convert all chains of `armature` to `reset_mode`.
+    Return the number of converted chains and bones.
+    """
+
+    chain_count = 0
+    bone_count = 0
+    for chain in chains.get_chains(armature):
+        count = convert_chain(armature, chain, reset_mode)
+        if count > 0:
+            chain_count += 1
+            bone_count += count
+    return chain_count, bone_count
+
+
+def convert_reset_mode(
+    operator: bpy.types.Operator, context: bpy.types.Context
+) -> Set[str]:
+    """
+    Implementation of `YURERIG_OT_ConvertResetModeOperator`.
+    """
+
+    builder.init_collection()
+
+    reset_mode = context.scene.yurerig.reset_mode
+    chain_count, bone_count = convert(context.active_object, reset_mode)
+    operator.report(
+        {"INFO"},
+        f"Success Convert Reset Mode to {reset_mode}: "
+        + f"{chain_count} chains, {bone_count} bones",
+    )
+    return {"FINISHED"}
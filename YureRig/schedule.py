@@ -0,0 +1,166 @@
+from typing import Callable, Dict, List, Sequence, Tuple
+
+import bpy
+
+from . import chains
+
+# Several features take chains out of the simulation over frame ranges.
+# Each of them stores its inactive frame ranges under its own key in the
+# `ACTIVITY_PROPERTY` custom property of the chain slider bone, and the chain
+# rigid bodies are keyed from the union of all sources: a chain is simulated
+# on a frame only when no source disables it.
+
+ACTIVITY_PROPERTY = "YureRig Activity"
+ENABLED_DATA_PATH = "rigid_body.enabled"
+
+Ranges = List[Tuple[int, int]]
+
+
+def ranges_from_flags(flags: Sequence[bool], frame_start: int) -> Ranges:
+    """
+    Convert per frame flags starting at `frame_start` to inclusive ranges of
+    the frames where the flag is set.
+    """
+
+    ranges: Ranges = []
+    start = None
+    for i, flag in enumerate(flags):
+        if flag and start is None:
+            start = i
+        elif not flag and start is not None:
+            ranges.append((frame_start + start, frame_start + i - 1))
+            start = None
+    if start is not None:
+        ranges.append((frame_start + start, frame_start + len(flags) - 1))
+    return ranges
+
+
+def merge_ranges(ranges: Ranges) -> Ranges:
+    merged: Ranges = []
+    for start, end in sorted(ranges):
+        if len(merged) > 0 and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def get_sources(armature: bpy.types.Object, chain: chains.Chain) -> Dict[str, Ranges]:
+    slider = armature.pose.bones.get(chain.slider_name)
+    if slider is None or ACTIVITY_PROPERTY not in slider:
+        return {}
+    sources = slider[ACTIVITY_PROPERTY].to_dict()
+    return {
+        key: [(int(v[i]), int(v[i + 1])) for i in range(0, len(v), 2)]
+        for key, v in sources.items()
+    }
+
+
+def set_source(
+    armature: bpy.types.Object, chain: chains.Chain, source: str, inactive: Ranges
+) -> None:
+    """
+    Store the inactive frame ranges of `source` for `chain` and rekey the chain
+    rigid bodies.
+    """
+
+    slider = armature.pose.bones[chain.slider_name]
+    sources = get_sources(armature, chain)
+    if len(inactive) > 0:
+        sources[source] = inactive
+    else:
+        sources.pop(source, None)
+    slider[ACTIVITY_PROPERTY] = {
+        key: [frame for r in ranges for frame in r] for key, ranges in sources.items()
+    }
+    apply(armature, chain)
+
+
+def inactive_ranges(armature: bpy.types.Object, chain: chains.Chain) -> Ranges:
+    return merge_ranges(
+        [r for ranges in get_sources(armature, chain).values() for r in ranges]
+    )
+
+
+def apply(armature: bpy.types.Object, chain: chains.Chain) -> None:
+    """
+    Key `rigid_body.enabled` of the chain rigid bodies from the union of the
+    inactive ranges of all sources. Keys are only set at transitions.
+    """
+
+    ranges = inactive_ranges(armature, chain)
+    keys: List[Tuple[int, bool]] = []
+    for start, end in ranges:
+        keys.append((start, False))
+        keys.append((end + 1, True))
+
+    for obj in chain.rigidbodies():
+        key_steps(obj, ENABLED_DATA_PATH, keys, True)
+        if len(keys) == 0:
+            obj.rigid_body.enabled = True
+
+
+def key_steps(
+    obj: bpy.types.Object,
+    data_path: str,
+    keys: Sequence[Tuple[int, bool]],
+    before: bool,
+) -> None:
+    """
+    Replace the keys of the boolean `data_path` of `obj` with constant steps
+    from `before` to the values of `keys` at their frames.
+    """
+
+    clear_keys(obj, data_path)
+    if len(keys) == 0:
+        return
+    if obj.animation_data is None:
+        obj.animation_data_create()
+    if obj.animation_data.action is None:
+        obj.animation_data.action = bpy.data.actions.new(f"{obj.name}_Activity")
+    fcurve = obj.animation_data.action.fcurves.new(data_path)
+    fcurve.keyframe_points.add(len(keys) + 1)
+    values = [(keys[0][0] - 1, float(before))] + [(f, float(v)) for f, v in keys]
+    fcurve.keyframe_points.foreach_set(
+        "co", [c for frame, value in values for c in (frame, value)]
+    )
+    for point in fcurve.keyframe_points:
+        point.interpolation = "CONSTANT"
+    fcurve.update()
+
+
+def clear_keys(obj: bpy.types.Object, data_path: str = ENABLED_DATA_PATH) -> None:
+    if obj.animation_data is None or obj.animation_data.action is None:
+        return
+    action = obj.animation_data.action
+    fcurve = action.fcurves.find(data_path)
+    if fcurve is not None:
+        action.fcurves.remove(fcurve)
+
+
+# Sampling
+#################################################
+
+
+def sample_frames(
+    scene: bpy.types.Scene,
+    frame_start: int,
+    frame_end: int,
+    sample: Callable[[int], None],
+) -> None:
+    """
+    Step `scene` through the frames from `frame_end` back to `frame_start`,
+    call `sample` with each frame and go back to the current frame.
+
+    Blender only simulates a frame directly following the last simulated one,
+    so stepping backwards at most reads the rigid body point cache, which is
+    kept as is. Disabling the rigid body world instead would free the cache.
+    """
+
+    frame_current = scene.frame_current
+    try:
+        for frame in range(frame_end, frame_start - 1, -1):
+            scene.frame_set(frame)
+            sample(frame)
+    finally:
+        scene.frame_set(frame_current)
@@ -0,0 +1,202 @@
+import json
+import os
+import shutil
+import tempfile
+import time
+from typing import List, Optional, Set, Tuple
+
+import bpy
+
+from . import bake_cache
+
+# Local content-addressed store of simulation results.
+#
+# An entry holds the baked caches of every rigged armature of a scene, stored
+# under the simulation hash of `farm.compute_simulation_hash`, which covers the
+# rig topology, rigid body and joint parameters, the rigid body world and the
+# CTRL and slider animation over the frame range:
+#
+#   <root>/<hash[:2]>/<hash>/ENTRY_FILE
+#   <root>/<hash[:2]>/<hash>/<armature>.yrc
+#
+# Identical shots share an entry, so baking, preparing for the farm or starting
+# playback copies or loads it instead of simulating again. The modification
+# time of ENTRY_FILE is the last use, and the least recently used entries are
+# evicted once the store grows over its size limit.
+
+ENTRY_FILE = "entry.json"
+DEFAULT_DIRECTORY_NAME = "yurerig_simulation_cache"
+
+
+class CacheSettings:
+    """
+    Store location and size limit from the addon preferences.
+    """
+
+    __slots__ = ("root", "max_bytes")
+
+    def __init__(self, root: str, max_bytes: int) -> None:
+        self.root = root
+        self.max_bytes = max_bytes
+
+
+def settings() -> Optional[CacheSettings]:
+    """
+    Settings of the store, or None when it is disabled.
+    """
+
+    addon = bpy.context.preferences.addons.get(__package__)
+    if addon is None or addon.preferences is None:
+        return None
+    preferences = addon.preferences
+    if not preferences.use_simulation_cache:
+        return None
+    root = bpy.path.abspath(preferences.simulation_cache_directory)
+    if root == "":
+        root = os.path.join(tempfile.gettempdir(), DEFAULT_DIRECTORY_NAME)
+    return CacheSettings(root, preferences.simulation_cache_size * 1024 * 1024)
+
+
+def entry_directory(root: str, key: str) -> str:
+    return os.path.join(root, key[:2], key)
+
+
+def lookup(root: str, key: str) -> Optional[str]:
+    """
+    Directory of the entry of `key`, marked as used, or None.
+    """
+
+    directory = entry_directory(root, key)
+    entry_file = os.path.join(directory, ENTRY_FILE)
+    if not os.path.isfile(entry_file):
+        return None
+    os.utime(entry_file)
+    return directory
+
+
+def cache_files(directory: str) -> List[str]:
+    return sorted(
+        name
+        for name in os.listdir(directory)
+        if name.endswith(bake_cache.FILE_EXTENSION)
+    )
+
+
+def store(settings: CacheSettings, key: str, paths: List[str]) -> Optional[str]:
+    """
+    Copy the cache files `paths` into the entry of `key` and evict the least
+    recently used entries over the size limit.
+    Return the entry directory, or None when it could not be written.
+    """
+
+    final = entry_directory(settings.root, key)
+    if os.path.isfile(os.path.join(final, ENTRY_FILE)):
+        return final
+    os.makedirs(os.path.dirname(final), exist_ok=True)
+    staging = tempfile.mkdtemp(prefix=".staging-", dir=os.path.dirname(final))
+    try:
+        size = 0
+        names: List[str] = []
+        for path in paths:
+            name = os.path.basename(path)
+            shutil.copyfile(path, os.path.join(staging, name))
+            size += os.path.getsize(path)
+            names.append(name)
+        with open(os.path.join(staging, ENTRY_FILE), "w", encoding="utf-8") as f:
+            json.dump({"key": key, "files": names, "size": size}, f)
+        os.replace(staging, final)
+    except OSError as e:
+        shutil.rmtree(staging, ignore_errors=True)
+        print(f"YureRig: simulation cache entry not stored: {e}")
+        return None
+    evict(settings, keep=final)
+    return final
+
+
+def fetch(settings: CacheSettings, key: str, directory: str) -> Optional[List[str]]:
+    """
+    Copy the caches of the entry of `key` to `directory`.
+    Return the copied paths, or None when there is no entry.
+    """
+
+    entry = lookup(settings.root, key)
+    if entry is None:
+        return None
+    os.makedirs(directory, exist_ok=True)
+    paths: List[str] = []
+    for name in cache_files(entry):
+        path = os.path.join(directory, name)
+        if os.path.abspath(path) != os.path.abspath(os.path.join(entry, name)):
+            shutil.copyfile(os.path.join(entry, name), path)
+        paths.append(path)
+    return paths
+
+
+def entries(root: str) -> List[Tuple[float, int, str]]:
+    """
+    (last use, size in bytes, directory) of the entries under `root`.
+    """
+
+    result: List[Tuple[float, int, str]] = []
+    if not os.path.isdir(root):
+        return result
+    for prefix in os.listdir(root):
+        prefix_directory = os.path.join(root, prefix)
+        if not os.path.isdir(prefix_directory):
+            continue
+        for name in os.listdir(prefix_directory):
+            directory = os.path.join(prefix_directory, name)
+            entry_file = os.path.join(directory, ENTRY_FILE)
+            try:
+                with open(entry_file, encoding="utf-8") as f:
+                    size = int(json.load(f)["size"])
+                result.append((os.path.getmtime(entry_file), size, directory))
+            except (OSError, ValueError, KeyError):
+                # Staging directories of interrupted stores
+                if name.startswith(".staging-") and (
+                    time.time() - os.path.getmtime(directory) > 24 * 60 * 60
+                ):
+                    shutil.rmtree(directory, ignore_errors=True)
+    return result
+
+
+def evict(settings: CacheSettings, keep: Optional[str] = None) -> int:
+    """
+    Remove the least recently used entries until the store fits in its size
+    limit. Return the number of removed entries.
+    """
+
+    listed = sorted(entries(settings.root))
+    total = sum(size for _, size, _ in listed)
+    removed = 0
+    for _, size, directory in listed:
+        if total <= settings.max_bytes:
+            break
+        if directory == keep:
+            continue
+        shutil.rmtree(directory, ignore_errors=True)
+        total -= size
+        removed += 1
+    return removed
+
+
+def clear_simulation_cache(
+    operator: bpy.types.Operator, context: bpy.types.Context
+) -> Set[str]:
+    """
+    Implementation of `YURERIG_OT_ClearSimulationCacheOperator`.
+    """
+
+    cache_settings = settings()
+    if cache_settings is None:
+        operator.report({"ERROR"}, "Simulation cache is disabled")
+        return {"CANCELLED"}
+    listed = entries(cache_settings.root)
+    for _, _, directory in listed:
+        shutil.rmtree(directory, ignore_errors=True)
+    size = sum(size for _, size, _ in listed) / (1024 * 1024)
+    operator.report(
+        {"INFO"},
+        f"Success Clear Simulation Cache: {len(listed)} entries, {size:.1f} MB",
+    )
+    return {"FINISHED"}
@@ -0,0 +1,211 @@
+import hashlib
+from typing import List, Optional, Set, Tuple
+
+import bpy
+import numpy as np
+
+from . import chains, schedule
+
+# Chains take no part in the simulation while their physics influence slider
+# is animated at FK. The slider F-curve is sampled over the scene frame range
+# and every range where it stays at zero is an inactive range of the
+# `SCHEDULE_SOURCE` source of `schedule.py`, which keys `rigid_body.enabled`
+# of the chain rigid bodies so Bullet skips them there.
+#
+# Bodies are enabled again `slider_activity_settle_frames` before the slider
+# leaves zero, so they settle on the FK pose they are pinned to, and zero
+# ranges not longer than that are left simulated. Sliders without animation
+# are left simulated on every frame.
+#
+# With "Auto Slider Activity", a depsgraph handler reschedules the chains
+# whose slider animation changed. The signature of the F-curve the schedule
+# was computed from is kept on the slider bone, so unchanged chains are not
+# rekeyed, also after reloading the file.
+
+SCHEDULE_SOURCE = "slider"
+SIGNATURE_PROPERTY = "YureRig Slider Signature"
+# Slider values up to this count as FK
+ZERO_EPSILON = 1e-6
+
+
+def slider_fcurve(
+    armature: bpy.types.Object, chain: chains.Chain
+) -> Optional[bpy.types.FCurve]:
+    """
+    F-curve of the Z location of the slider of `chain`, which the physics
+    influence drivers read.
+    """
+
+    if armature.animation_data is None or armature.animation_data.action is None:
+        return None
+    return armature.animation_data.action.fcurves.find(
+        f'pose.bones["{chain.slider_name}"].location', index=2
+    )
+
+
+def signature(
+    fcurve: Optional[bpy.types.FCurve],
+    frame_start: int,
+    frame_end: int,
+    settle_frames: int,
+) -> str:
+    """
+    Hash of everything the schedule of a chain is computed from.
+    """
+
+    digest = hashlib.sha1(f"{frame_start} {frame_end} {settle_frames}".encode())
+    if fcurve is None:
+        return digest.hexdigest()
+    digest.update(f"{fcurve.mute} {len(fcurve.modifiers)}".encode())
+    count = len(fcurve.keyframe_points) * 2
+    for attribute in ("co", "handle_left", "handle_right"):
+        values = np.empty(count, dtype=np.float32)
+        fcurve.keyframe_points.foreach_get(attribute, values)
+        digest.update(values.tobytes())
+    digest.update(" ".join(p.interpolation for p in fcurve.keyframe_points).encode())
+    return digest.hexdigest()
+
+
+def zero_flags(
+    fcurve: bpy.types.FCurve, frame_start: int, frame_end: int
+) -> List[bool]:
+    """
+    Per frame from `frame_start` to `frame_end`, whether the slider is at FK.
+    """
+
+    return [
+        fcurve.evaluate(frame) <= ZERO_EPSILON
+        for frame in range(frame_start, frame_end + 1)
+    ]
+
+
+def inactive_ranges(
+    flags: List[bool], frame_start: int, settle_frames: int
+) -> schedule.Ranges:
+    """
+    Frame ranges where the chain bodies are disabled: the zero ranges of the
+    slider, ended `settle_frames` early unless they reach the last frame.
+    """
+
+    frame_end = frame_start + len(flags) - 1
+    inactive: schedule.Ranges = []
+    for start, end in schedule.ranges_from_flags(flags, frame_start):
+        if end < frame_end:
+            end -= settle_frames
+        if end >= start:
+            inactive.append((start, end))
+    return inactive
+
+
+def update_chain(
+    scene: bpy.types.Scene,
+    armature: bpy.types.Object,
+    chain: chains.Chain,
+    force: bool = False,
+) -> Optional[int]:
+    """
+    Reschedule `chain` when its slider animation changed since the last time,
+    or always with `force`. Return the number of inactive frames, or None when
+    the chain was left as is.
+    """
+
+    slider = armature.pose.bones.get(chain.slider_name)
+    if slider is None:
+        return None
+    settle_frames = scene.yurerig.slider_activity_settle_frames
+    fcurve = slider_fcurve(armature, chain)
+    current = signature(fcurve, scene.frame_start, scene.frame_end, settle_frames)
+    if not force and slider.get(SIGNATURE_PROPERTY) == current:
+        return None
+
+    inactive: schedule.Ranges = []
+    if fcurve is not None and not fcurve.mute:
+        flags = zero_flags(fcurve, scene.frame_start, scene.frame_end)
+        inactive = inactive_ranges(flags, scene.frame_start, settle_frames)
+    schedule.set_source(armature, chain, SCHEDULE_SOURCE, inactive)
+    slider[SIGNATURE_PROPERTY] = current
+    return sum(end - start + 1 for start, end in inactive)
+
+
+def update_scene(scene: bpy.types.Scene, force: bool = False) -> Tuple[int, int]:
+    """
+    Reschedule the chains of `scene`. Return the number of rescheduled chains
+    and of their inactive chain frames.
+    """
+
+    chain_count = 0
+    inactive_frames = 0
+    for armature in chains.rigged_armatures(scene):
+        for chain in chains.get_chains(armature):
+            frames = update_chain(scene, armature, chain, force)
+            if frames is not None:
+                chain_count += 1
+                inactive_frames += frames
+    return chain_count, inactive_frames
+
+
+def clear_scene(scene: bpy.types.Scene) -> int:
+    count = 0
+    for armature in chains.rigged_armatures(scene):
+        for chain in chains.get_chains(armature):
+            schedule.set_source(armature, chain, SCHEDULE_SOURCE, [])
+            slider = armature.pose.bones.get(chain.slider_name)
+            if slider is not None and SIGNATURE_PROPERTY in slider:
+                del slider[SIGNATURE_PROPERTY]
+            count += 1
+    return count
+
+
+def update_changed(scene: bpy.types.Scene, depsgraph: bpy.types.Depsgraph) -> None:
+    """
+    Reschedule the chains of the armatures whose action was updated in
+    `depsgraph`. Keying the rigid bodies updates their own actions only, so
+    this does not retrigger itself.
+    """
+
+    actions: Set[bpy.types.Action] = {
+        update.id.original
+        for update in depsgraph.updates
+        if isinstance(update.id, bpy.types.Action)
+    }
+    if len(actions) == 0:
+        return
+    for armature in chains.rigged_armatures(scene):
+        animation_data = armature.animation_data
+        if animation_data is None or animation_data.action not in actions:
+            continue
+        for chain in chains.get_chains(armature):
+            update_chain(scene, armature, chain)
+
+
+# Operators
+#################################################
+
+
+def update_slider_activity(
+    operator: bpy.types.Operator, context: bpy.types.Context
+) -> Set[str]:
+    """
+    Implementation of `YURERIG_OT_UpdateSliderActivityOperator`.
+    """
+
+    chain_count, inactive_frames = update_scene(context.scene, force=True)
+    operator.report(
+        {"INFO"},
+        f"Success Update Slider Activity: {chain_count} chains, "
+        + f"{inactive_frames} chain frames disabled",
+    )
+    return {"FINISHED"}
+
+
+def clear_slider_activity(
+    operator: bpy.types.Operator, context: bpy.types.Context
+) -> Set[str]:
+    """
+    Implementation of `YURERIG_OT_ClearSliderActivityOperator`.
+    """
+
+    context.scene.yurerig.use_slider_activity = False
+    count = clear_scene(context.scene)
+    operator.report({"INFO"}, f"Success Clear Slider Activity: {count} chains")
+    return {"FINISHED"}
@@ -0,0 +1,269 @@
+import argparse
+import json
+import time
+from typing import Dict, List, Sequence, Set, Tuple
+
+import bpy
+from mathutils import Vector
+
+from . import builder, farm, playback
+from .chains import slider_bone_pattern
+
+# Parameter sweeps for look-dev. `scripts/sweep_parameters.py` starts several
+# background Blender processes running `scripts/yurerig_sweep.py`, each of
+# which applies its share of parameter sets to every chain of the shot, with
+# the same code as "Update Yure Rig Parameters", simulates the frame range and
+# appends the metrics of each run to a JSON lines file:
+#
+# - overshoot: largest distance between a PHYS_YURERIG_ chain tip and its
+#   CTRL_YURERIG_ tip,
+# - settle_time: seconds from the last movement of the CTRL_YURERIG_ tips
+#   until every PHYS_YURERIG_ tip stays within the settle tolerance,
+# - jitter_energy: mean squared second difference per frame of the tip
+#   offsets, which is large for shaking and small for smooth follow through,
+# - step_ms: mean wall time of one simulated frame.
+#
+# The best parameter set is written as a profile, which the "Apply Sweep
+# Profile" operator puts back into the scene parameters and onto the rig.
+
+# Rigid body parameters of `YURERIG_Props` a sweep can vary, besides the joint
+# parameters of `builder.JOINT_PROPERTIES`
+BODY_PARAMETERS = (
+    "rigidbody_mass",
+    "rigidbody_size_x",
+    "rigidbody_size_z",
+    "rigidbody_gap",
+    "rigidbody_root_size",
+)
+PARAMETERS = BODY_PARAMETERS + tuple(prop for _, prop in builder.JOINT_PROPERTIES)
+
+DEFAULT_SETTLE_TOLERANCE = 0.005
+# Distance per frame below which a CTRL_YURERIG_ tip counts as still
+MOTION_EPSILON = 1e-5
+
+
+class SweepError(Exception):
+    pass
+
+
+def apply_parameters(scene: bpy.types.Scene, parameters: Dict[str, object]) -> int:
+    """
+    Set the scene parameters and update the rigid bodies and joints of every
+    chain of `scene` to them. Return the number of updated chains' bones.
+    """
+
+    unknown = [name for name in parameters if name not in PARAMETERS]
+    if len(unknown) > 0:
+        raise SweepError("Unknown parameters: " + ", ".join(sorted(unknown)))
+    props = scene.yurerig
+    for name, value in parameters.items():
+        current = getattr(props, name)
+        setattr(props, name, type(current)(value))
+
+    builder.init_collection()
+    count = 0
+    for armature in farm.rigged_armatures(scene):
+        bone_names = [
+            b.name
+            for b in armature.pose.bones
+            if b.name.startswith("CTRL_YURERIG_")
+            and slider_bone_pattern.match(b.name) is None
+        ]
+        counts = {"rigidbodies": 0, "joints": 0}
+        steps = builder.update_parameters_steps(
+            armature, bone_names, builder.ParameterSnapshot(), counts
+        )
+        for _ in steps:
+            pass
+        count += len(bone_names)
+    return count
+
+
+def chain_tips(armature: bpy.types.Object) -> List[str]:
+    """
+    Names without prefix of the PHYS_YURERIG_ bones ending a chain.
+    """
+
+    bones = armature.data.bones
+    tips: List[str] = []
+    for bone in bones:
+        if not bone.name.startswith("PHYS_YURERIG_"):
+            continue
+        if not any(c.name.startswith("PHYS_YURERIG_") for c in bone.children):
+            tips.append(bone.name[13:])
+    return tips
+
+
+def measure(
+    scene: bpy.types.Scene,
+    frame_start: int,
+    frame_end: int,
+    settle_tolerance: float = DEFAULT_SETTLE_TOLERANCE,
+) -> Dict[str, object]:
+    """
+    Simulate `scene` from the simulation start to `frame_end` and return the
+    metrics of the chain tips between `frame_start` and `frame_end`.
+    """
+
+    if scene.rigidbody_world is None:
+        raise SweepError("Scene has no rigid body world")
+    tips: List[Tuple[bpy.types.Object, str]] = [
+        (armature, name)
+        for armature in farm.rigged_armatures(scene)
+        for name in chain_tips(armature)
+    ]
+    if len(tips) == 0:
+        raise SweepError("No YureRig chain in scene")
+
+    # Offsets of the PHYS_YURERIG_ tips from the CTRL_YURERIG_ tips per frame,
+    # and the CTRL_YURERIG_ tips
+    offsets: List[List[Vector]] = []
+    targets: List[List[Vector]] = []
+    sim_start = min(farm.simulation_start(scene), frame_start)
+    scene.frame_set(sim_start)
+    step_seconds = 0.0
+    for frame in range(sim_start, frame_end + 1):
+        started = time.perf_counter()
+        scene.frame_set(frame)
+        depsgraph = bpy.context.evaluated_depsgraph_get()
+        step_seconds += time.perf_counter() - started
+        if frame < frame_start:
+            continue
+        frame_offsets: List[Vector] = []
+        frame_targets: List[Vector] = []
+        for armature, name in tips:
+            evaluated = armature.evaluated_get(depsgraph)
+            pose_bones = evaluated.pose.bones
+            target = evaluated.matrix_world @ pose_bones[f"CTRL_YURERIG_{name}"].tail
+            tip = evaluated.matrix_world @ pose_bones[f"PHYS_YURERIG_{name}"].tail
+            frame_offsets.append(tip - target)
+            frame_targets.append(target)
+        offsets.append(frame_offsets)
+        targets.append(frame_targets)
+
+    frames = len(offsets)
+    overshoot = max(o.length for frame_offsets in offsets for o in frame_offsets)
+
+    last_motion = 0
+    for f in range(1, frames):
+        if any(
+            (a - b).length > MOTION_EPSILON for a, b in zip(targets[f], targets[f - 1])
+        ):
+            last_motion = f
+    settled_at = frames
+    for f in range(frames - 1, last_motion - 1, -1):
+        if any(o.length > settle_tolerance for o in offsets[f]):
+            break
+        settled_at = f
+    fps = scene.render.fps / scene.render.fps_base
+
+    jitter = 0.0
+    for f in range(1, frames - 1):
+        for a, b, c in zip(offsets[f - 1], offsets[f], offsets[f + 1]):
+            jitter += (a - 2 * b + c).length_squared
+    jitter /= max(frames - 2, 1) * len(tips)
+
+    return {
+        "overshoot": overshoot,
+        "settle_time": max(settled_at - last_motion, 0) / fps,
+        "settled": settled_at < frames,
+        "jitter_energy": jitter,
+        "step_ms": step_seconds * 1000 / (frame_end - sim_start + 1),
+        "tips": len(tips),
+        "frames": frames,
+    }
+
+
+def prepare_scene(scene: bpy.types.Scene) -> None:
+    """
+    Make the scene simulate live: no baked playback and no baked rigid body
+    cache.
+    """
+
+    playback.deactivate(scene)
+    if scene.rigidbody_world is not None and scene.rigidbody_world.point_cache.is_baked:
+        bpy.ops.ptcache.free_bake_all()
+
+
+def read_profile(path: str) -> Dict[str, object]:
+    with open(path, encoding="utf-8") as f:
+        profile = json.load(f)
+    parameters = profile.get("parameters") if isinstance(profile, dict) else None
+    if not isinstance(parameters, dict):
+        raise SweepError(f"{path} is not a sweep profile")
+    return parameters
+
+
+# Headless command
+#################################################
+
+
+def parse_args(argv: Sequence[str], scene: bpy.types.Scene) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="yurerig_sweep",
+        description="Simulate YureRig parameter sets and record their metrics.",
+    )
+    parser.add_argument(
+        "--runs", required=True, help="JSON list of {id, parameters} to run."
+    )
+    parser.add_argument(
+        "--output", required=True, help="JSON lines file the results are added to."
+    )
+    parser.add_argument("--frame-start", type=int, default=scene.frame_start)
+    parser.add_argument("--frame-end", type=int, default=scene.frame_end)
+    parser.add_argument(
+        "--settle-tolerance", type=float, default=DEFAULT_SETTLE_TOLERANCE
+    )
+    return parser.parse_args(argv)
+
+
+def command(args: argparse.Namespace, scene: bpy.types.Scene) -> None:
+    """
+    Simulate the parameter sets of a sweep worker.
+    """
+
+    with open(args.runs, encoding="utf-8") as f:
+        runs = json.load(f)
+
+    prepare_scene(scene)
+    for run in runs:
+        result: Dict[str, object] = {
+            "id": run["id"],
+            "parameters": run["parameters"],
+        }
+        try:
+            apply_parameters(scene, run["parameters"])
+            result["metrics"] = measure(
+                scene, args.frame_start, args.frame_end, args.settle_tolerance
+            )
+        except SweepError as e:
+            result["error"] = str(e)
+        with open(args.output, "a", encoding="utf-8") as f:
+            f.write(json.dumps(result) + "\n")
+        print(f"YureRig: sweep run {run['id']} done")
+
+
+# Operators
+#################################################
+
+
+def apply_sweep_profile(
+    operator: bpy.types.Operator, context: bpy.types.Context
+) -> Set[str]:
+    """
+    Implementation of `YURERIG_OT_ApplySweepProfileOperator`.
+    """
+
+    try:
+        parameters = read_profile(bpy.path.abspath(operator.filepath))
+        count = apply_parameters(context.scene, parameters)
+    except (OSError, ValueError, SweepError) as e:
+        operator.report({"ERROR"}, str(e))
+        return {"CANCELLED"}
+
+    operator.report(
+        {"INFO"},
+        f"Success Apply Sweep Profile: {len(parameters)} parameters "
+        + f"on {count} bones",
+    )
+    return {"FINISHED"}
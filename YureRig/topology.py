@@ -0,0 +1,318 @@
+import argparse
+import statistics
+import time
+from typing import Dict, List, Sequence, Set, Tuple
+
+import bpy
+from mathutils import Matrix
+
+from . import builder, chains, lod
+
+# Chains route the FK and physics poses to their DEF_YURERIG_ bones, goals and
+# roots in one of two constraint topologies:
+#
+# - CLASSIC: two COPY_TRANSFORMS per DEF bone, the one to the CTRL bone with a
+#   driven influence, COPY_LOCATION and COPY_ROTATION per goal body and a
+#   CHILD_OF per root body. Four to five constraints per bone.
+# - LEAN: one ARMATURE constraint per DEF bone blending the PHYS and CTRL
+#   bones with driven weights, and goal and root bodies parented to their
+#   bones. One constraint per bone.
+#
+# The ARMATURE constraint applies on top of the parent transform, so lean DEF
+# bones are detached from their parents, which are kept in custom properties
+# and restored when converting back or removing the rig.
+
+
+def chain_topology(armature: bpy.types.Object, chain: chains.Chain) -> str:
+    for name in chain.names:
+        pose_bone = armature.pose.bones.get(f"DEF_YURERIG_{name}")
+        if pose_bone is None:
+            continue
+        if pose_bone.constraints.get(chains.DEF_BLEND_CONSTRAINT_NAME) is not None:
+            return "LEAN"
+    return "CLASSIC"
+
+
+def is_bone_parented(obj: bpy.types.Object, armature: bpy.types.Object) -> bool:
+    return bool(obj.parent == armature and obj.parent_type == "BONE")
+
+
+def convert_goal(
+    armature: bpy.types.Object, obj: bpy.types.Object, topology: str
+) -> None:
+    copies = [
+        c
+        for c in obj.constraints
+        if c.type in ("COPY_LOCATION", "COPY_ROTATION") and c.target == armature
+    ]
+    if topology == "LEAN" and len(copies) > 0:
+        bone = armature.data.bones[copies[0].subtarget]
+        for constraint in copies:
+            obj.constraints.remove(constraint)
+        builder.parent_to_bone(obj, armature, bone.name)
+        obj.matrix_basis = bone.matrix_local @ Matrix.Translation(
+            (0, bone.length / 2, 0)
+        )
+    elif topology == "CLASSIC" and is_bone_parented(obj, armature):
+        bone_name = obj.parent_bone
+        builder.clear_bone_parent(obj)
+        builder.add_reset_goal_constraints(obj, armature, bone_name)
+
+
+def convert_root(
+    armature: bpy.types.Object, obj: bpy.types.Object, topology: str
+) -> None:
+    """
+    Swap the CHILD_OF constraint of a root body and its bone parent, keeping
+    the world matrix of the body in every pose.
+    """
+
+    child_of = next(
+        (c for c in obj.constraints if c.type == "CHILD_OF" and c.target == armature),
+        None,
+    )
+    matrix_basis = obj.matrix_basis.copy()
+    if topology == "LEAN" and child_of is not None:
+        # CHILD_OF follows the bone head and a bone parent the bone tail
+        bone = armature.data.bones[child_of.subtarget]
+        inverse = Matrix.Translation((0, -bone.length, 0)) @ child_of.inverse_matrix
+        obj.constraints.remove(child_of)
+        obj.parent = armature
+        obj.parent_type = "BONE"
+        obj.parent_bone = bone.name
+        obj.matrix_parent_inverse = inverse
+        obj.matrix_basis = matrix_basis
+    elif topology == "CLASSIC" and child_of is None and is_bone_parented(obj, armature):
+        bone = armature.data.bones[obj.parent_bone]
+        inverse = Matrix.Translation((0, bone.length, 0)) @ obj.matrix_parent_inverse
+        builder.clear_bone_parent(obj)
+        obj.matrix_basis = matrix_basis
+        child_of = obj.constraints.new("CHILD_OF")
+        child_of.target = armature
+        child_of.subtarget = bone.name
+        child_of.inverse_matrix = inverse
+        child_of.set_inverse_pending = False
+
+
+def convert_chain(
+    armature: bpy.types.Object, chain: chains.Chain, topology: str
+) -> int:
+    """
+    Convert the constraints of `chain` to `topology`. The DEF_YURERIG_ bone
+    parents are left to `convert`, which needs EDIT mode.
+    Return the number of converted bones.
+    """
+
+    count = 0
+    for name in chain.names:
+        pose_bone = armature.pose.bones.get(f"DEF_YURERIG_{name}")
+        if pose_bone is None:
+            continue
+        types = [c.type for c in builder.def_constraints(armature, pose_bone)]
+        if ("ARMATURE" in types) == (topology == "LEAN"):
+            continue
+        builder.remove_def_constraints(armature, pose_bone)
+        builder.add_def_constraints(armature, name, chain.slider_name, topology)
+        count += 1
+    for goal in chain.goals():
+        convert_goal(armature, goal, topology)
+    for root in dict.fromkeys(chain.roots()):
+        convert_root(armature, root, topology)
+
+    if count > 0 and lod.LOD_PROPERTY in armature.pose.bones[chain.slider_name]:
+        lod.ensure_lod_drivers(armature, chain)
+    return count
+
+
+def convert(armature: bpy.types.Object, topology: str) -> Tuple[int, int]:
+    """
+    Convert all chains of `armature` to `topology`. `armature` must be the
+    active object. Return the number of converted chains and bones.
+    """
+
+    chain_count = 0
+    bone_count = 0
+    def_names: List[str] = []
+    for chain in chains.get_chains(armature):
+        count = convert_chain(armature, chain, topology)
+        if count > 0:
+            chain_count += 1
+            bone_count += count
+        def_names.extend(chain.def_bone_names())
+
+    bones = armature.data.bones
+    detached = [
+        name
+        for name in def_names
+        if name in bones and chains.DEF_PARENT_PROPERTY in bones[name]
+    ]
+    if (topology == "LEAN" and len(detached) < len(def_names)) or (
+        topology == "CLASSIC" and len(detached) > 0
+    ):
+        mode = armature.mode
+        builder.set_mode("EDIT")
+        edit_bones = armature.data.edit_bones
+        for name in def_names:
+            if topology == "LEAN":
+                builder.unparent_def_bone(edit_bones[name])
+            else:
+                builder.restore_def_parent(edit_bones, name)
+        builder.set_mode(mode)
+    return chain_count, bone_count
+
+
+def convert_topology(
+    operator: bpy.types.Operator, context: bpy.types.Context
+) -> Set[str]:
+    """
+    Implementation of `YURERIG_OT_ConvertTopologyOperator`.
+    """
+
+    topology = context.scene.yurerig.constraint_topology
+    chain_count, bone_count = convert(context.active_object, topology)
+    operator.report(
+        {"INFO"},
+        f"Success Convert Constraint Topology to {topology}: "
+        + f"{chain_count} chains, {bone_count} bones",
+    )
+    return {"FINISHED"}
+
+
+# Evaluation benchmark
+#################################################
+
+
+def count_constraints(armature: bpy.types.Object) -> Tuple[int, int]:
+    """
+    Number of bone constraints of `armature` and of object constraints on the
+    rigid bodies, roots and goals of its chains.
+    """
+
+    bone_count = sum(len(b.constraints) for b in armature.pose.bones)
+    objects: Set[bpy.types.Object] = set()
+    for chain in chains.get_chains(armature):
+        objects.update(chain.rigidbodies())
+        objects.update(chain.roots())
+        objects.update(chain.goals())
+    return bone_count, sum(len(obj.constraints) for obj in objects)
+
+
+def benchmark(scene: bpy.types.Scene, frames: int) -> Dict[str, float]:
+    """
+    Time the dependency graph evaluation of `frames` frames of `scene` from
+    its start frame, with the rigid body world disabled so that the time is
+    spent on the rig poses, constraints, drivers and parents. The rigged
+    armatures are tagged each frame, so their poses are evaluated even
+    without animation. Return milliseconds per frame.
+    """
+
+    armatures = chains.rigged_armatures(scene)
+    world = scene.rigidbody_world
+    world_enabled = world.enabled if world is not None else False
+    frame_current = scene.frame_current
+    times: List[float] = []
+    try:
+        if world is not None:
+            world.enabled = False
+        for frame in range(scene.frame_start, scene.frame_start + frames):
+            for armature in armatures:
+                armature.update_tag(refresh={"DATA"})
+            started = time.perf_counter()
+            scene.frame_set(frame)
+            times.append((time.perf_counter() - started) * 1000)
+    finally:
+        if world is not None:
+            world.enabled = world_enabled
+        scene.frame_set(frame_current)
+    return {
+        "mean_ms": statistics.mean(times),
+        "median_ms": statistics.median(times),
+        "max_ms": max(times),
+    }
+
+
+def report(scene: bpy.types.Scene, label: str, frames: int) -> None:
+    bone_count = 0
+    object_count = 0
+    for armature in chains.rigged_armatures(scene):
+        counts = count_constraints(armature)
+        bone_count += counts[0]
+        object_count += counts[1]
+    result = benchmark(scene, frames)
+    print(
+        f"YureRig: {label}: {bone_count} bone and {object_count} object "
+        + f"constraints, {result['median_ms']:.3f} ms per frame "
+        + f"(mean {result['mean_ms']:.3f}, max {result['max_ms']:.3f})"
+    )
+
+
+def convert_scene(context: bpy.types.Context, topology: str) -> Tuple[int, int]:
+    chain_count = 0
+    bone_count = 0
+    for armature in chains.rigged_armatures(context.scene):
+        if context.mode != "OBJECT":
+            builder.set_mode("OBJECT")
+        context.view_layer.objects.active = armature
+        counts = convert(armature, topology)
+        chain_count += counts[0]
+        bone_count += counts[1]
+    return chain_count, bone_count
+
+
+# Headless command
+#################################################
+
+
+def parse_args(argv: Sequence[str], scene: bpy.types.Scene) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="yurerig_topology",
+        description="Convert or benchmark the YureRig constraint topology.",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    convert_parser = subparsers.add_parser(
+        "convert", help="Convert all chains of the scene."
+    )
+    convert_parser.add_argument("topology", choices=("CLASSIC", "LEAN"))
+    convert_parser.add_argument(
+        "--save", action="store_true", help="Save the .blend file afterwards."
+    )
+
+    benchmark_parser = subparsers.add_parser(
+        "benchmark", help="Time the evaluation of each frame without physics."
+    )
+    benchmark_parser.add_argument("--frames", type=int, default=100)
+    benchmark_parser.add_argument(
+        "--compare",
+        action="store_true",
+        help="Also convert to the other topology and time it. "
+        + "The .blend file is not saved.",
+    )
+    return parser.parse_args(argv)
+
+
+def command(args: argparse.Namespace, scene: bpy.types.Scene) -> None:
+    context = bpy.context
+
+    if args.command == "convert":
+        chain_count, bone_count = convert_scene(context, args.topology)
+        print(
+            f"YureRig: converted {chain_count} chains, {bone_count} bones "
+            + f"to {args.topology}"
+        )
+        if args.save:
+            bpy.ops.wm.save_mainfile()
+        return
+
+    topologies = {
+        chain_topology(armature, chain)
+        for armature in chains.rigged_armatures(scene)
+        for chain in chains.get_chains(armature)
+    }
+    current = topologies.pop() if len(topologies) == 1 else "MIXED"
+    report(scene, current, args.frames)
+    if args.compare:
+        for topology in ("CLASSIC", "LEAN"):
+            if topology != current:
+                convert_scene(context, topology)
+                report(scene, topology, args.frames)
@@ -0,0 +1,114 @@
+"""
+Measure the time to plan a YureRig setup, without Blender.
+
+Run with plain CPython and NumPy from the repository root:
+
+    python scripts/benchmark_planner.py --strands 32 --depth 8 --repeat 20
+
+The planner module is loaded by path because the YureRig package imports bpy.
+A skirt of `--strands` chains of `--depth` bones around a hip bone is planned
+`--repeat` times, and the plan is validated once. With `--mirror` the strands
+are named as a left side and the plan of the right side is mirrored from it.
+"""
+
+import argparse
+import importlib.util
+import math
+import statistics
+import time
+from pathlib import Path
+from typing import List
+
+REPOSITORY_ROOT = Path(__file__).resolve().parent.parent
+PLANNER_PATH = REPOSITORY_ROOT / "YureRig" / "planner.py"
+
+
+def load_planner():
+    spec = importlib.util.spec_from_file_location("yurerig_planner", PLANNER_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)  # type: ignore
+    return module
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--strands", type=int, default=32)
+    parser.add_argument("--depth", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--reset-mode", choices=("GOAL", "KINEMATIC"), default="GOAL")
+    parser.add_argument("--topology", choices=("CLASSIC", "LEAN"), default="CLASSIC")
+    parser.add_argument("--share-root-body", action="store_true")
+    parser.add_argument("--mirror", action="store_true")
+    return parser.parse_args()
+
+
+def skirt(planner, strands: int, depth: int, side: str = ""):
+    names: List[str] = ["Hips"]
+    parents: List[int] = [-1]
+    heads = [(0.0, 0.0, 1.1)]
+    tails = [(0.0, 0.0, 1.0)]
+    z_axes = [(0.0, 1.0, 0.0)]
+    for s in range(strands):
+        angle = 2 * math.pi * s / strands
+        x, y = math.cos(angle), math.sin(angle)
+        for d in range(depth):
+            names.append(f"Skirt{s}.{d}{side}")
+            parents.append(0 if d == 0 else len(names) - 2)
+            radius = 0.15 + 0.02 * d
+            heads.append((x * radius, y * radius, 1.0 - 0.05 * d))
+            tails.append((x * (radius + 0.02), y * (radius + 0.02), 0.95 - 0.05 * d))
+            z_axes.append((-y, x, 0.0))
+    return planner.SelectedBones(names, parents, 0, heads, tails, z_axes)
+
+
+def main() -> None:
+    args = parse_args()
+    planner = load_planner()
+    bones = skirt(planner, args.strands, args.depth, "_L" if args.mirror else "")
+    settings = planner.SetupSettings(
+        reset_mode=args.reset_mode,
+        share_root_body=args.share_root_body,
+        topology=args.topology,
+    )
+
+    timings: List[float] = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        rig_plan = planner.plan(bones, settings, 0)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    mirror_timings: List[float] = []
+    if args.mirror:
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            mirrored = planner.mirror_plan(rig_plan, 1)
+            mirror_timings.append((time.perf_counter() - start) * 1000)
+
+    problems = rig_plan.validate()
+    if args.mirror:
+        problems += mirrored.validate()
+    print(
+        f"{len(rig_plan.bones)} bones, {len(rig_plan.bodies)} rigid bodies, "
+        f"{len(rig_plan.joints)} joints, {len(rig_plan.constraints)} constraints, "
+        f"{len(rig_plan.drivers)} drivers"
+    )
+    print(f"plan over {args.repeat} rounds (ms)")
+    print(f"{'min':>10}{'median':>10}{'max':>10}")
+    print(
+        f"{min(timings):>10.3f}{statistics.median(timings):>10.3f}"
+        f"{max(timings):>10.3f}"
+    )
+    if args.mirror:
+        print(f"mirror_plan over {args.repeat} rounds (ms)")
+        print(
+            f"{min(mirror_timings):>10.3f}{statistics.median(mirror_timings):>10.3f}"
+            f"{max(mirror_timings):>10.3f}"
+        )
+    if len(problems) > 0:
+        print("invalid plan:")
+        for problem in problems:
+            print(f"  {problem}")
+        raise SystemExit(1)
+
+
+main()
@@ -0,0 +1,78 @@
+"""
+Measure import and register time of the YureRig addon.
+
+Run inside Blender from the repository root:
+
+    blender --background --factory-startup \\
+        --python scripts/measure_register.py -- --repeat 20
+
+Each round drops the addon modules from `sys.modules`, then times a fresh
+import, `register()` and `unregister()`. The first `execute` of an operator
+additionally imports `YureRig.builder`; that cost is reported separately.
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import bpy  # noqa: F401
+
+REPOSITORY_ROOT = Path(__file__).resolve().parent.parent
+PACKAGE_NAME = "YureRig"
+
+
+def parse_args() -> argparse.Namespace:
+    argv = sys.argv[sys.argv.index("--") + 1 :] if "--" in sys.argv else []
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=10)
+    return parser.parse_args(argv)
+
+
+def purge_modules() -> None:
+    for name in list(sys.modules):
+        if name == PACKAGE_NAME or name.startswith(PACKAGE_NAME + "."):
+            del sys.modules[name]
+
+
+def timed(func: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    func()
+    return (time.perf_counter() - start) * 1000
+
+
+def measure_round() -> Dict[str, float]:
+    purge_modules()
+    result: Dict[str, float] = {}
+    module = None
+
+    def do_import() -> None:
+        nonlocal module
+        module = __import__(PACKAGE_NAME)
+
+    result["import"] = timed(do_import)
+    result["register"] = timed(lambda: module.register())  # type: ignore
+    result["builder import"] = timed(lambda: __import__(PACKAGE_NAME + ".builder"))
+    result["unregister"] = timed(lambda: module.unregister())  # type: ignore
+    return result
+
+
+def main() -> None:
+    args = parse_args()
+    sys.path.insert(0, str(REPOSITORY_ROOT))
+
+    rounds: List[Dict[str, float]] = [measure_round() for _ in range(args.repeat)]
+
+    print(f"YureRig registration timings over {args.repeat} rounds (ms)")
+    print(f"{'phase':<16}{'min':>10}{'median':>10}{'max':>10}")
+    for phase in rounds[0]:
+        values = [r[phase] for r in rounds]
+        print(
+            f"{phase:<16}{min(values):>10.3f}"
+            f"{statistics.median(values):>10.3f}{max(values):>10.3f}"
+        )
+
+
+main()
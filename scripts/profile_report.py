@@ -0,0 +1,62 @@
+"""
+Summarize a YureRig profile log, without Blender.
+
+Run with plain CPython from the repository root:
+
+    python scripts/profile_report.py yurerig_profile.jsonl
+
+The log is written by the addon when "Profile Operators" is enabled in the
+addon preferences or the `YURERIG_PROFILE` environment variable is set.
+The median wall time, phase times and RNA write estimates are printed per
+addon version and operator, so runs of different versions can be compared.
+"""
+
+import argparse
+import json
+import statistics
+from typing import Dict, List, Tuple
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("log", help="JSON lines profile log")
+    parser.add_argument(
+        "--operator", default=None, help="Only report this operator bl_idname"
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    runs: Dict[Tuple[str, str], List[dict]] = {}
+    with open(args.log, encoding="utf-8") as f:
+        for line in f:
+            if line.strip() == "":
+                continue
+            entry = json.loads(line)
+            if args.operator is not None and entry["operator"] != args.operator:
+                continue
+            key = (entry.get("addon_version", ""), entry["operator"])
+            runs.setdefault(key, []).append(entry)
+
+    for (version, operator), entries in sorted(runs.items()):
+        walls = [e["wall_seconds"] * 1000 for e in entries]
+        writes = [e["rna_writes"] for e in entries]
+        print(f"{operator} (version {version or '?'}, {len(entries)} runs)")
+        print(
+            f"  wall median {statistics.median(walls):.1f} ms, "
+            f"max {max(walls):.1f} ms, "
+            f"rna writes median {statistics.median(writes):.0f}"
+        )
+        phases: Dict[str, List[float]] = {}
+        for e in entries:
+            for name, seconds in e["phases"].items():
+                phases.setdefault(name, []).append(seconds * 1000)
+        for name, times in sorted(
+            phases.items(), key=lambda item: -statistics.median(item[1])
+        ):
+            print(f"  {name:<24}{statistics.median(times):>10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+"""
+Sweep YureRig rigid body and joint parameters over a shot, in parallel
+background Blender processes.
+
+Run with plain CPython from the repository root, on a grid:
+
+    python scripts/sweep_parameters.py shot.blend --workers 4 \\
+        --grid rigidbody_joint_angular_spring_stiffness_x=5,10,20 \\
+        --grid rigidbody_joint_angular_spring_damping_x=0.1,0.5
+
+or on random samples:
+
+    python scripts/sweep_parameters.py shot.blend --workers 4 --samples 32 \\
+        --random rigidbody_mass=0.2:2 \\
+        --random rigidbody_joint_angular_spring_damping_x=0.05:1
+
+Parameters are property names of the YureRig scene settings (see
+`YureRig/sweep.py`). Each worker runs `scripts/yurerig_sweep.py` on its share
+of the parameter sets. The metrics of all runs are written to `results.csv`
+in the output directory and printed sorted by `--sort`, and the parameter
+set with the best score is written to `best_profile.json`, which "Apply Sweep
+Profile" in the Setup panel puts back onto the rig.
+"""
+
+import argparse
+import csv
+import itertools
+import json
+import os
+import random
+import subprocess
+import sys
+from pathlib import Path
+from typing import IO, Dict, List, Tuple
+
+WORKER_PATH = Path(__file__).resolve().parent / "yurerig_sweep.py"
+
+# Metrics adding up to the score, each scaled to 0 (best run) to 1 (worst run)
+SCORED_METRICS = ("overshoot", "settle_time", "jitter_energy")
+METRICS = SCORED_METRICS + ("step_ms",)
+
+
+def parse_value(text: str) -> object:
+    if text.lower() in ("true", "false"):
+        return text.lower() == "true"
+    return float(text)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("blend", help=".blend file of the shot")
+    parser.add_argument(
+        "--blender", default=os.environ.get("BLENDER", "blender"), help="Blender"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2)
+    )
+    parser.add_argument(
+        "--grid",
+        action="append",
+        default=[],
+        metavar="NAME=V1,V2,...",
+        help="Values of a parameter, combined with all other grid parameters",
+    )
+    parser.add_argument(
+        "--random",
+        action="append",
+        default=[],
+        metavar="NAME=MIN:MAX",
+        help="Uniform range of a parameter, sampled --samples times",
+    )
+    parser.add_argument("--samples", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--frame-start", type=int)
+    parser.add_argument("--frame-end", type=int)
+    parser.add_argument("--settle-tolerance", type=float)
+    parser.add_argument(
+        "--output", default=None, help="Output directory (default: next to .blend)"
+    )
+    parser.add_argument("--sort", default="score", choices=("score", "id") + METRICS)
+    parser.add_argument("--top", type=int, default=20, help="Rows to print")
+    return parser.parse_args()
+
+
+def parameter_sets(args: argparse.Namespace) -> List[Dict[str, object]]:
+    """
+    Every combination of the grid values, each combined with `--samples`
+    random draws when random ranges are given.
+    """
+
+    grid: List[Tuple[str, List[object]]] = []
+    for item in args.grid:
+        name, values = item.split("=", 1)
+        grid.append((name, [parse_value(v) for v in values.split(",")]))
+    ranges: List[Tuple[str, float, float]] = []
+    for item in args.random:
+        name, bounds = item.split("=", 1)
+        low, high = bounds.split(":", 1)
+        ranges.append((name, float(low), float(high)))
+
+    rng = random.Random(args.seed)
+    sets: List[Dict[str, object]] = []
+    for combination in itertools.product(*(values for _, values in grid)):
+        base = {name: value for (name, _), value in zip(grid, combination)}
+        if len(ranges) == 0:
+            sets.append(base)
+            continue
+        for _ in range(args.samples):
+            sample = dict(base)
+            for name, low, high in ranges:
+                sample[name] = rng.uniform(low, high)
+            sets.append(sample)
+    return sets
+
+
+def run_workers(args: argparse.Namespace, runs: List[dict], output: Path) -> List[dict]:
+    """
+    Split `runs` over the workers, wait for all of them and return their
+    results.
+    """
+
+    worker_count = max(1, min(args.workers, len(runs)))
+    processes: List[Tuple[subprocess.Popen, IO[str]]] = []
+    for w in range(worker_count):
+        runs_path = output / f"runs_{w}.json"
+        results_path = output / f"results_{w}.jsonl"
+        runs_path.write_text(json.dumps(runs[w::worker_count]), encoding="utf-8")
+        if results_path.exists():
+            results_path.unlink()
+        command = [
+            args.blender,
+            "--background",
+            args.blend,
+            "--python",
+            str(WORKER_PATH),
+            "--",
+            "--runs",
+            str(runs_path),
+            "--output",
+            str(results_path),
+        ]
+        for option in ("frame_start", "frame_end", "settle_tolerance"):
+            value = getattr(args, option)
+            if value is not None:
+                command += [f"--{option.replace('_', '-')}", str(value)]
+        log = open(output / f"worker_{w}.log", "w", encoding="utf-8")
+        processes.append(
+            (subprocess.Popen(command, stdout=log, stderr=subprocess.STDOUT), log)
+        )
+
+    results: List[dict] = []
+    for w, (process, log) in enumerate(processes):
+        code = process.wait()
+        log.close()
+        if code != 0:
+            print(f"worker {w} exited with {code}, see {output}/worker_{w}.log")
+        results_path = output / f"results_{w}.jsonl"
+        if results_path.exists():
+            with open(results_path, encoding="utf-8") as f:
+                results.extend(json.loads(line) for line in f if line.strip())
+    return results
+
+
+def score(results: List[dict]) -> None:
+    """
+    Add the score of each successful run: the sum of its scored metrics, each
+    scaled by the range of that metric over all runs.
+    """
+
+    done = [r for r in results if "metrics" in r]
+    for metric in SCORED_METRICS:
+        values = [r["metrics"][metric] for r in done]
+        if len(values) == 0:
+            return
+        low, high = min(values), max(values)
+        for r in done:
+            scaled = (r["metrics"][metric] - low) / (high - low) if high > low else 0
+            r["score"] = r.get("score", 0.0) + scaled
+
+
+def main() -> None:
+    args = parse_args()
+    blend = Path(args.blend).resolve()
+    output = (
+        Path(args.output) if args.output is not None else blend.parent / "yurerig_sweep"
+    )
+    output.mkdir(parents=True, exist_ok=True)
+
+    sets = parameter_sets(args)
+    if len(sets) == 0 or sets == [{}]:
+        sys.exit("nothing to sweep, give --grid or --random parameters")
+    runs = [{"id": i, "parameters": p} for i, p in enumerate(sets)]
+    print(f"{len(runs)} runs on {min(args.workers, len(runs))} workers")
+    results = run_workers(args, runs, output)
+    score(results)
+
+    failed = [r for r in results if "metrics" not in r]
+    for r in failed:
+        print(f"run {r['id']} failed: {r.get('error')}")
+    done = [r for r in results if "metrics" in r]
+    if len(done) == 0:
+        sys.exit("no run finished")
+    if args.sort == "score":
+        done.sort(key=lambda r: r["score"])
+    elif args.sort == "id":
+        done.sort(key=lambda r: r["id"])
+    else:
+        done.sort(key=lambda r: r["metrics"][args.sort])
+
+    names = sorted({name for r in done for name in r["parameters"]})
+    columns = ["id", "score"] + list(METRICS) + ["settled"] + names
+    with open(output / "results.csv", "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        for r in done:
+            writer.writerow(
+                [r["id"], r["score"]]
+                + [r["metrics"][m] for m in METRICS]
+                + [r["metrics"]["settled"]]
+                + [r["parameters"].get(name, "") for name in names]
+            )
+
+    print(
+        f"{'id':>5}{'score':>8}{'overshoot':>11}{'settle s':>10}"
+        f"{'jitter':>12}{'step ms':>9}"
+    )
+    for r in done[: args.top]:
+        m = r["metrics"]
+        settle = f"{m['settle_time']:.2f}" + ("" if m["settled"] else "+")
+        print(
+            f"{r['id']:>5}{r['score']:>8.3f}{m['overshoot']:>11.4f}{settle:>10}"
+            f"{m['jitter_energy']:>12.3e}{m['step_ms']:>9.2f}"
+        )
+
+    best = min(done, key=lambda r: r["score"])
+    profile = {
+        "source": str(blend),
+        "id": best["id"],
+        "score": best["score"],
+        "metrics": best["metrics"],
+        "parameters": best["parameters"],
+    }
+    (output / "best_profile.json").write_text(
+        json.dumps(profile, indent=2), encoding="utf-8"
+    )
+    print(f"best run {best['id']}, profile written to {output / 'best_profile.json'}")
+
+
+if __name__ == "__main__":
+    main()
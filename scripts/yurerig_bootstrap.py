@@ -0,0 +1,25 @@
+"""
+Startup shared by the headless `scripts/yurerig_*.py` scripts.
+
+Enable the YureRig addon, from the installed addons or else from this
+repository, and run the headless command of one of its modules with the
+arguments after `--` on the Blender command line (see `YureRig/headless.py`).
+"""
+
+import importlib
+import sys
+from pathlib import Path
+
+import addon_utils
+
+PACKAGE_NAME = "YureRig"
+
+
+def run(module_name: str) -> None:
+    if addon_utils.enable(PACKAGE_NAME, default_set=False) is None:
+        sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+        __import__(PACKAGE_NAME).register()
+
+    headless = importlib.import_module(f"{PACKAGE_NAME}.headless")
+    module = importlib.import_module(f"{PACKAGE_NAME}.{module_name}")
+    headless.run(module.parse_args, module.command)
@@ -0,0 +1,21 @@
+"""
+Headless entry point for the YureRig rigid body deactivation.
+
+Tune the deactivation of the chains of a shot and save it, then compare the
+simulation time per frame with and without it on an idle heavy shot:
+
+    blender --background shot.blend \\
+        --python scripts/yurerig_deactivation.py -- tune --save
+
+    blender --background shot.blend \\
+        --python scripts/yurerig_deactivation.py -- benchmark --compare
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import yurerig_bootstrap  # noqa: E402
+
+yurerig_bootstrap.run("deactivation")
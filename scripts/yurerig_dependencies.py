@@ -0,0 +1,21 @@
+"""
+Headless entry point for the YureRig dependency analysis.
+
+Write the dependency report of a shot as JSON and exit with status 1 when the
+rigs have dependency cycles, to gate rigs in a pipeline:
+
+    blender --background shot.blend \\
+        --python scripts/yurerig_dependencies.py -- --output deps.json
+
+    blender --background shot.blend \\
+        --python scripts/yurerig_dependencies.py -- --fail-on cycles,redundant_edges
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import yurerig_bootstrap  # noqa: E402
+
+yurerig_bootstrap.run("dependencies")
@@ -0,0 +1,24 @@
+"""
+Headless entry point for YureRig farm caches.
+
+Simulate once on a workstation or a dedicated node, next to the .blend file:
+
+    blender --background shot.blend \\
+        --python scripts/yurerig_farm.py -- prepare --save
+
+Render nodes then play the cache back. Files saved after `prepare` do this
+automatically when the addon is enabled; otherwise load it explicitly before
+rendering:
+
+    blender --background shot.blend \\
+        --python scripts/yurerig_farm.py -f 120 -- load
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import yurerig_bootstrap  # noqa: E402
+
+yurerig_bootstrap.run("farm")
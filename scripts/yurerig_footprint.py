@@ -0,0 +1,23 @@
+"""
+Headless entry point for the YureRig footprint report.
+
+Write the footprint of the rigs of a shot as JSON, or add it as one line to a
+JSON lines file to track the footprint of a whole show:
+
+    blender --background shot.blend \\
+        --python scripts/yurerig_footprint.py -- --output footprint.json
+
+    for f in shots/*.blend; do
+        blender --background "$f" \\
+            --python scripts/yurerig_footprint.py -- --append footprint.jsonl
+    done
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import yurerig_bootstrap  # noqa: E402
+
+yurerig_bootstrap.run("footprint")
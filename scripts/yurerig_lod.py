@@ -0,0 +1,22 @@
+"""
+Headless entry point for the YureRig camera LOD schedule.
+
+Key the chains far from or outside of the camera to FK for the scene frame
+range and disable their rigid bodies there:
+
+    blender --background shot.blend \\
+        --python scripts/yurerig_lod.py -- --save
+
+    blender --background shot.blend \\
+        --python scripts/yurerig_lod.py -- --camera CAM_close \\
+        --frame-start 1 --frame-end 240 --fk-screen-size 0.03 --save
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import yurerig_bootstrap  # noqa: E402
+
+yurerig_bootstrap.run("lod")
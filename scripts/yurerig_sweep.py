@@ -0,0 +1,21 @@
+"""
+Headless worker of a YureRig parameter sweep.
+
+Started by `scripts/sweep_parameters.py`, which writes the parameter sets of
+each worker to a JSON file:
+
+    blender --background shot.blend \\
+        --python scripts/yurerig_sweep.py -- --runs runs_0.json \\
+        --output results_0.jsonl
+
+The .blend file is not saved.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import yurerig_bootstrap  # noqa: E402
+
+yurerig_bootstrap.run("sweep")
@@ -0,0 +1,23 @@
+"""
+Headless entry point for the YureRig constraint topology.
+
+Convert all chains of a shot to the lean topology:
+
+    blender --background shot.blend \\
+        --python scripts/yurerig_topology.py -- convert LEAN --save
+
+Time the evaluation of each frame without physics, in the current topology
+and, with --compare, in the other one (the .blend file is not saved):
+
+    blender --background shot.blend \\
+        --python scripts/yurerig_topology.py -- benchmark --frames 200 --compare
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import yurerig_bootstrap  # noqa: E402
+
+yurerig_bootstrap.run("topology")
@@ -0,0 +1,120 @@
+"""
+Tests of the dependency checks of `YureRig/dependency_graph.py` on the graph
+of planned rigs, run with plain CPython:
+
+    python -m pytest tests
+
+The modules are loaded by path because the YureRig package imports bpy.
+"""
+
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+from test_planner import planner, strands
+
+GRAPH_PATH = Path(__file__).resolve().parent.parent / "YureRig" / "dependency_graph.py"
+
+spec = importlib.util.spec_from_file_location("yurerig_dependency_graph", GRAPH_PATH)
+dependency_graph = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(dependency_graph)  # type: ignore
+
+ARMATURE = "Armature"
+WORLD = "world:Scene"
+
+
+def plan_graph(rig_plan, selected):
+    """
+    The graph `dependencies.build_graph` reads from the rig `builder` creates
+    for `rig_plan` on the bones `selected`.
+    """
+
+    graph = dependency_graph.DependencyGraph()
+    renames = dict(rig_plan.renames)
+    bodies = rig_plan.bodies
+    active = {n for n, k in zip(bodies.names, bodies.kinds) if k == "ACTIVE"}
+    kinematic = {d.owner for d in rig_plan.drivers if d.data_path.endswith("kinematic")}
+
+    def bone(name):
+        return f"bone:{ARMATURE}/{name}"
+
+    def body(name):
+        return f"sim:{name}" if name in active else f"object:{name}"
+
+    for name, parent in zip(selected.names, selected.parents):
+        if parent >= 0:
+            parent_name = selected.names[parent]
+            graph.add(
+                bone(renames.get(parent_name, parent_name)),
+                bone(renames.get(name, name)),
+                "parent",
+            )
+    for name, parent in zip(rig_plan.bones.names, rig_plan.bones.parents):
+        if parent is not None:
+            graph.add(bone(parent), bone(name), "parent")
+
+    for c in rig_plan.constraints:
+        owner = bone(c.owner) if c.on_bone else f"object:{c.owner}"
+        kind = f"constraint:{c.type}"
+        for subtarget in c.subtargets:
+            graph.add(bone(subtarget), owner, kind)
+        if c.target_object is not None:
+            graph.add(body(c.target_object), owner, kind)
+        elif c.subtarget != "":
+            graph.add(bone(c.subtarget), owner, kind)
+    driven = {}
+    for d in rig_plan.drivers:
+        on_bone = d.constraint >= 0 and rig_plan.constraints[d.constraint].on_bone
+        driven[bone(d.owner) if on_bone else f"object:{d.owner}"] = None
+    for owner in driven:
+        graph.add(bone(rig_plan.slider_name), owner, "driver")
+
+    lean = rig_plan.settings.topology == "LEAN"
+    for name, kind, parent_bone in zip(bodies.names, bodies.kinds, bodies.parent_bones):
+        if lean and kind in ("ROOT", "GOAL"):
+            graph.add(bone(parent_bone), f"object:{name}", "parent")
+        if kind != "ACTIVE" or name in kinematic:
+            graph.add(f"object:{name}", WORLD, "rigid_body")
+        if kind == "ACTIVE":
+            graph.add(WORLD, f"sim:{name}", "simulation")
+        if kind == "GOAL":
+            graph.add(f"object:{name}", WORLD, "joint")
+    for name in rig_plan.joints.names:
+        graph.add(f"object:{name}", WORLD, "joint")
+    return graph
+
+
+@pytest.mark.parametrize("reset_mode", ["GOAL", "KINEMATIC"])
+@pytest.mark.parametrize("topology", ["CLASSIC", "LEAN"])
+def test_generated_chain_has_no_findings(reset_mode, topology):
+    selected = strands(depth=3)
+    settings = planner.SetupSettings(reset_mode=reset_mode, topology=topology)
+    graph = plan_graph(planner.plan(selected, settings, 0), selected)
+
+    assert dependency_graph.strongly_connected_components(graph) == []
+    assert dependency_graph.round_trips(graph) == []
+    assert dependency_graph.redundant_edges(graph) == []
+
+
+def test_findings():
+    selected = strands()
+    graph = plan_graph(planner.plan(selected, planner.SetupSettings(), 0), selected)
+    hips = f"bone:{ARMATURE}/Hips"
+    tip = f"bone:{ARMATURE}/PHYS_YURERIG_Hair0.1_L"
+    graph.add(hips, tip, "parent")
+    graph.add(hips, f"object:{ARMATURE}_Extra", "parent")
+    graph.add(hips, f"object:{ARMATURE}_Extra", "parent")
+
+    redundant = dependency_graph.redundant_edges(graph)
+    assert [(r["reason"], r["target"]) for r in redundant] == [
+        ("duplicate", f"object:{ARMATURE}_Extra"),
+        ("implied", tip),
+    ]
+
+    # A goal following a PHYS bone makes the chain depend on its own output
+    graph.add(tip, "object:GOAL_YURERIG_Hair1.1_L", "constraint:COPY_LOCATION")
+    trips = dependency_graph.round_trips(graph)
+    assert len(trips) == 1
+    assert tip in trips[0]["exit_bones"]
+    assert dependency_graph.strongly_connected_components(graph) != []
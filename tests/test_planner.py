@@ -0,0 +1,189 @@
+"""
+Tests of the records planned by `YureRig/planner.py`, run with plain CPython:
+
+    python -m pytest tests
+
+The planner module is loaded by path because the YureRig package imports bpy.
+"""
+
+import importlib.util
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
+import pytest
+
+PLANNER_PATH = Path(__file__).resolve().parent.parent / "YureRig" / "planner.py"
+
+spec = importlib.util.spec_from_file_location("yurerig_planner", PLANNER_PATH)
+planner = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(planner)  # type: ignore
+
+
+def strands(count: int = 2, depth: int = 2, side: str = "_L"):
+    """
+    `count` chains of `depth` bones hanging from a hip bone on the +X side.
+    """
+
+    names: List[str] = ["Hips"]
+    parents: List[int] = [-1]
+    heads: List[Tuple[float, float, float]] = [(0.0, 0.0, 1.1)]
+    tails: List[Tuple[float, float, float]] = [(0.0, 0.0, 1.0)]
+    z_axes: List[Tuple[float, float, float]] = [(0.0, 1.0, 0.0)]
+    for s in range(count):
+        y = 0.1 * s
+        for d in range(depth):
+            names.append(f"Hair{s}.{d}{side}")
+            parents.append(0 if d == 0 else len(names) - 2)
+            heads.append((0.2, y, 1.0 - 0.1 * d))
+            tails.append((0.2, y, 0.9 - 0.1 * d))
+            z_axes.append((0.0, 1.0, 0.0))
+    return planner.SelectedBones(names, parents, 0, heads, tails, z_axes)
+
+
+def test_flip_side_name():
+    assert planner.flip_side_name("Hair.L") == "Hair.R"
+    assert planner.flip_side_name("Hair_R.001") == "Hair_L.001"
+    assert planner.flip_side_name("l-Hair") == "r-Hair"
+    assert planner.flip_side_name("LeftHair") == "RightHair"
+    assert planner.flip_side_name("hair_right") == "hair_left"
+    assert planner.flip_side_name("Hair") == "Hair"
+
+
+def test_plan_records():
+    rig_plan = planner.plan(strands(), planner.SetupSettings(), 0)
+
+    assert rig_plan.validate() == []
+    assert rig_plan.active == "Hips"
+    assert rig_plan.def_names == (
+        "DEF_YURERIG_Hair0.0_L",
+        "DEF_YURERIG_Hair1.0_L",
+        "DEF_YURERIG_Hair0.1_L",
+        "DEF_YURERIG_Hair1.1_L",
+    )
+    assert rig_plan.renames[0] == ("Hair0.0_L", "DEF_YURERIG_Hair0.0_L")
+
+    bones = rig_plan.bones
+    assert len(bones) == 2 + 2 * 4
+    assert bones.names[:2] == (rig_plan.slider_root_name, rig_plan.slider_name)
+    assert bones.kinds == ("DECO", "SLIDER") + ("PHYS",) * 4 + ("CTRL",) * 4
+    index = {name: i for i, name in enumerate(bones.names)}
+    assert bones.parents[index["PHYS_YURERIG_Hair0.0_L"]] == "Hips"
+    assert bones.parents[index["CTRL_YURERIG_Hair0.1_L"]] == "CTRL_YURERIG_Hair0.0_L"
+    np.testing.assert_allclose(
+        bones.heads[index["PHYS_YURERIG_Hair1.1_L"]], (0.2, 0.1, 0.9)
+    )
+
+    bodies = rig_plan.bodies
+    assert bodies.kinds == ("ROOT",) * 2 + ("ACTIVE",) * 4 + ("GOAL",) * 4
+    assert bodies.vertices().shape == (len(bodies), 8, 3)
+    active = bodies.names.index("RIGIDBODY_YURERIG_Hair0.0_L")
+    np.testing.assert_allclose(bodies.matrices[active][:3, 3], (0.2, 0.0, 0.95))
+    np.testing.assert_allclose(bodies.sizes[active], (0.05, 0.09, 0.05))
+
+    joints = rig_plan.joints
+    assert joints.names == (
+        "JOINT_YURERIG_Hair0.0_L",
+        "JOINT_YURERIG_Hair1.0_L",
+        "JOINT_YURERIG_Hair0.0_L_Hair0.1_L",
+        "JOINT_YURERIG_Hair1.0_L_Hair1.1_L",
+    )
+    assert joints.object1[0] == "RIGIDBODY_YURERIG_Hair0.0_L_Root"
+    np.testing.assert_allclose(joints.locations[2], (0.2, 0.0, 0.9))
+
+    constraints = rig_plan.constraints
+    assert constraints[0].type == "LIMIT_LOCATION"
+    assert constraints[0].owner == rig_plan.slider_name
+    for driver in rig_plan.drivers:
+        if driver.constraint >= 0:
+            assert driver.owner == constraints[driver.constraint].owner
+    copy_rotations = [c for c in constraints if c.on_bone and c.type == "COPY_ROTATION"]
+    assert [c.target_object for c in copy_rotations] == [
+        f"RIGIDBODY_YURERIG_{d[12:]}" for d in rig_plan.def_names
+    ]
+
+
+def test_plan_lean_kinematic_shared_root():
+    settings = planner.SetupSettings(
+        reset_mode="KINEMATIC",
+        share_root_body=True,
+        topology="LEAN",
+        fitted_sizes={"Hair0.0_L": (0.2, 0.3)},
+    )
+    rig_plan = planner.plan(strands(), settings, 1)
+
+    assert rig_plan.validate() == []
+    assert rig_plan.bodies.kinds == ("ROOT",) + ("ACTIVE",) * 4
+    shared_root = "RIGIDBODY_YURERIG_Hips_Shared_Root"
+    assert rig_plan.bodies.names[0] == shared_root
+    assert rig_plan.joints.object1[:2] == (shared_root, shared_root)
+    np.testing.assert_allclose(rig_plan.bodies.sizes[1], (0.2, 0.09, 0.3))
+
+    blends = [c for c in rig_plan.constraints if c.type == "ARMATURE"]
+    assert len(blends) == 4
+    assert blends[0].subtargets == (
+        "PHYS_YURERIG_Hair0.0_L",
+        "CTRL_YURERIG_Hair0.0_L",
+    )
+    assert not any(c.type == "CHILD_OF" for c in rig_plan.constraints)
+    kinematic = [d for d in rig_plan.drivers if d.data_path == "rigid_body.kinematic"]
+    assert [d.owner for d in kinematic] == [
+        f"RIGIDBODY_YURERIG_{d[12:]}" for d in rig_plan.def_names
+    ]
+
+
+@pytest.mark.parametrize("reset_mode", ["GOAL", "KINEMATIC"])
+@pytest.mark.parametrize("topology", ["CLASSIC", "LEAN"])
+def test_mirror_plan(reset_mode, topology):
+    settings = planner.SetupSettings(reset_mode=reset_mode, topology=topology)
+    rig_plan = planner.plan(strands(), settings, 0)
+    mirrored = planner.mirror_plan(rig_plan, 1)
+
+    assert mirrored.validate() == []
+    assert mirrored.slider_index == 1
+    assert mirrored.def_names == tuple(
+        d.replace("_L", "_R") for d in rig_plan.def_names
+    )
+    assert mirrored.bones.names[:2] == (
+        mirrored.slider_root_name,
+        mirrored.slider_name,
+    )
+    for name, mirrored_name in zip(rig_plan.bones.names[2:], mirrored.bones.names[2:]):
+        assert mirrored_name == name.replace("_L", "_R")
+    assert mirrored.bones.parents[2] == "Hips"
+
+    expected = planner.plan(strands(side="_R"), settings, 1)
+    assert mirrored.joints.names == expected.joints.names
+    assert mirrored.bodies.names == expected.bodies.names
+
+    heads = rig_plan.bones.heads[2:] * (-1.0, 1.0, 1.0)
+    np.testing.assert_allclose(mirrored.bones.heads[2:], heads)
+    np.testing.assert_allclose(
+        mirrored.bodies.matrices[:, :3, 3],
+        rig_plan.bodies.matrices[:, :3, 3] * (-1.0, 1.0, 1.0),
+    )
+    np.testing.assert_allclose(np.linalg.det(mirrored.bodies.matrices[:, :3, :3]), 1.0)
+    np.testing.assert_allclose(
+        mirrored.joints.locations,
+        rig_plan.joints.locations * (-1.0, 1.0, 1.0),
+    )
+    assert mirrored.mesh_sources == dict(
+        zip(mirrored.bodies.names, rig_plan.bodies.names)
+    )
+
+    assert len(mirrored.constraints) == len(rig_plan.constraints)
+    for constraint, original in zip(mirrored.constraints, rig_plan.constraints):
+        assert constraint.type == original.type
+        if original.owner == rig_plan.slider_name:
+            assert constraint.owner == mirrored.slider_name
+        else:
+            assert constraint.owner == original.owner.replace("_L", "_R")
+        if original.target_object is None:
+            assert constraint.target_object is None
+        else:
+            assert constraint.target_object == original.target_object.replace(
+                "_L", "_R"
+            )
+    assert [d.constraint for d in mirrored.drivers] == [
+        d.constraint for d in rig_plan.drivers
+    ]